@@ -1,105 +1,213 @@
+import asyncio
 import threading
 import time
 import os
-import pyttsx3
 import speech_recognition as sr
-from transformers import pipeline, logging
+from async_runtime import AsyncRuntime
+from audio_stream import open_audio_source
 from gesture import gesture_recognition
-from config import (CANDIDATE_INTENTS, SYSTEM_COMMANDS, APP_PATHS, 
-                   WEB_URLS, SPECIAL_FOLDERS, DEFAULT_GESTURE_STATE)
-
-# Suppress transformer warnings
-logging.set_verbosity_error()
+from gesture_events import GestureEventBus
+from intent_classifier import IntentClassifier
+from lazy_import import print_import_times
+from jarvis_commands import adjust_volume, execute_specific_command, handlers, validate_handlers
+from model_registry import get_speech_queue, registry
+from speech_backends import create_backend
+from speech_output import NORMAL
+from speculative import SpeculativeClassifier
+from wake_word import WakeWordDetector
+from config import (load_user_config, CANDIDATE_INTENTS, SYSTEM_COMMANDS, APP_PATHS, 
+                   WEB_URLS, SPECIAL_FOLDERS, DEFAULT_GESTURE_STATE,
+                   INTENT_CONFIDENCE_THRESHOLD, WAKE_WORD_MIN_COMMAND_SECONDS, WAKE_WORD_SEARCH_SECONDS,
+                   RUNTIME_MODE,
+                   GESTURE_TRACE_PATH, GESTURE_DEBOUNCE_SECONDS, GESTURE_VOLUME_INTERVAL)
 
 class JarvisAssistant:
-    def __init__(self):
-        self.classifier = self._initialize_classifier()
-        self.engine = self._initialize_speech_engine()
-        self.recognizer = sr.Recognizer()
+    def __init__(self, warmup=True):
+        # Models load in the background when warmup is on, keyword commands work right away
+        self.intent_classifier = IntentClassifier(warmup=warmup)
+        # Speech runs on its own thread, speak() returns as soon as the message is queued
+        self.speech = get_speech_queue()
+        # Recognizer backend and audio source come from the "speech" section of jarvis_config.json
+        speech_settings = load_user_config()["speech"]
+        self.speech_backend = create_backend(speech_settings)
+        # One microphone for the session, calibrated in the background
+        self.microphone = open_audio_source(speech_settings).start()
+        # Streaming backends transcribe while the user speaks, partials are classified speculatively
+        self.streaming = speech_settings["streaming"] and self.speech_backend.streaming
+        if speech_settings["streaming"] and not self.streaming:
+            print(f"The {self.speech_backend.name} speech backend cannot stream, using full-phrase recognition")
+        self.speculative = SpeculativeClassifier(self.intent_classifier) if self.streaming else None
+        self.last_speculation = None
+        # Phrases in run() must start with the wake word once it has been enrolled
+        self.wake_word = WakeWordDetector.load()
+        if self.wake_word is None:
+            print("No wake word enrolled, every phrase is recognized (run 'python wake_word.py --enroll 5')")
+        # Talking over the assistant cuts it off, only safe when the microphone does not hear the speakers
+        if speech_settings["barge_in"]:
+            self.microphone.on_barge_in = self.speech.interrupt
+        # Handler prompts and the async capture stage take turns on the microphone
+        self.listen_lock = threading.Lock()
+        self.prompt_waiting = threading.Event()
+        self.runtime = None
         self.gesture_state = DEFAULT_GESTURE_STATE.copy()
+        # Gestures are pushed to a dispatcher thread and handled as soon as they are detected
+        self.gesture_events = GestureEventBus()
         self.running = True
         self.setup_gesture_control()
-        
-    def _initialize_classifier(self):
-        try:
-            return pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-        except Exception as e:
-            print(f"Model loading error: {e}")
-            return None
+        validate_handlers(CANDIDATE_INTENTS)
             
-    def _initialize_speech_engine(self):
-        engine = pyttsx3.init()
-        voices = engine.getProperty('voices')
-        engine.setProperty('voice', voices[1].id)  # Change index for different voices
-        engine.setProperty('rate', 160)
-        engine.setProperty('volume', 1.0)
-        return engine
-        
     def setup_gesture_control(self):
         """Initialize gesture control in a separate thread"""
+        # Swipes, scrolling and the mouse are actuated by the gesture thread itself
+        for gesture in ("thumbs_up", "thumbs_down"):
+            self.gesture_events.subscribe(gesture, self.handle_gestures, debounce=GESTURE_DEBOUNCE_SECONDS)
+        # The newest palm height wins, applied at most every GESTURE_VOLUME_INTERVAL seconds
+        self.gesture_events.subscribe("volume_control", self.handle_gestures,
+                                      debounce=GESTURE_VOLUME_INTERVAL, trailing=True)
+        self.gesture_events.start()
         self.gesture_thread = threading.Thread(
             target=gesture_recognition,
-            args=(self.gesture_state,),
+            args=(self.gesture_state, GESTURE_TRACE_PATH, self.gesture_events),
             daemon=True
         )
         self.gesture_thread.start()
         
-    def speak(self, text):
-        """Convert text to speech with error handling"""
+    def speak(self, text, priority=NORMAL, wait=False):
+        """Queue text for speech, returns an Event set once it has been spoken"""
         print(f"Jarvis: {text}")
-        try:
-            self.engine.say(text)
-            self.engine.runAndWait()
-        except Exception as e:
-            print(f"Speech error: {e}")
+        done = self.speech.say(text, priority)
+        if wait:
+            done.wait()
+        return done
     
-    def listen(self, timeout=5):
+    def listen(self, timeout=5, wake_word=False):
         """Improved listening with continuous monitoring"""
-        with sr.Microphone() as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
-            print("Listening...")
-            try:
-                audio = self.recognizer.listen(source, timeout=timeout)
-                text = self.recognizer.recognize_google(audio).lower()
-                print(f"You said: {text}")
-                return text
-            except sr.WaitTimeoutError:
-                return None
-            except sr.UnknownValueError:
-                self.speak("I didn't catch that. Could you repeat?")
-                return None
-            except sr.RequestError:
-                self.speak("Speech service unavailable. Please check your internet connection.")
-                return None
-            except Exception as e:
-                print(f"Listening error: {e}")
-                return None
+        print("Listening...")
+        gated = wake_word and self.wake_word is not None
+        self.prompt_waiting.set()
+        if not gated:
+            # Without the wake word filter the assistant would hear its own prompts
+            self.speech.wait_until_idle()
+        try:
+            with self.listen_lock:
+                self.prompt_waiting.clear()
+                audio, transcript, self.last_speculation, wake = self.capture(timeout, gated)
+        except sr.WaitTimeoutError:
+            return None
+        except Exception as e:
+            print(f"Listening error: {e}")
+            return None
+        finally:
+            self.prompt_waiting.clear()
+
+        text = self.recognize(audio, gated, transcript, wake)
+        if text == "":
+            # Wake word on its own, the command follows in the next phrase
+            self.speak("Yes?")
+            return self.listen(timeout)
+        return text
+
+    def capture(self, timeout, gated=False):
+        """Record one phrase, returns (audio, transcript, speculation, wake).
+
+        transcript and speculation are None unless the backend streams, in
+        which case the phrase is transcribed and speculatively classified
+        while it is being spoken. A gated phrase only reaches the streaming
+        recognizer once its first WAKE_WORD_SEARCH_SECONDS held the wake
+        word; wake is that (accepted, wake_end) check, None if the phrase
+        ended before it could run.
+        """
+        if not self.streaming:
+            return self.microphone.listen(timeout=timeout), None, None, None
+
+        session = None
+        wake = None
+        held = []  # Start of a gated phrase, waiting for the wake word check
+        held_seconds = 0.0
+        speculation = self.speculative.begin()
+
+        def feed(data):
+            nonlocal session
+            if session is None:
+                session = self.speech_backend.stream(self.microphone.sample_rate)
+            partial = session.feed(data)
+            if partial:
+                self.speculative.on_partial(speculation, partial)
+
+        def on_frame(data):
+            nonlocal wake, held_seconds
+            speculation.last_frame = time.perf_counter()
+            if not gated or (wake is not None and wake[0]):
+                feed(data)
+                return
+            if wake is not None:
+                return  # No wake word, the rest of the phrase is never recognized
+            held.append(data)
+            sample_width = self.microphone.sample_width
+            held_seconds += len(data) / (self.microphone.sample_rate * sample_width)
+            if held_seconds >= WAKE_WORD_SEARCH_SECONDS:
+                wake = self.wake_word.detect(sr.AudioData(b"".join(held), self.microphone.sample_rate,
+                                                          sample_width))
+                if wake[0]:
+                    for chunk in held:
+                        feed(chunk)
+                held.clear()
+
+        audio = self.microphone.listen(timeout=timeout, on_frame=on_frame)
+        return audio, session.finish() if session else None, speculation, wake
+
+    def recognize(self, audio, gated=False, transcript=None, wake=None):
+        """Turn a recorded phrase into text, None if it was rejected or not understood.
+
+        Gated phrases must start with the wake word, a wake word said on its
+        own gives an empty string. wake is a wake word check capture() has
+        already run. A transcript from streaming recognition is used instead
+        of running the recognizer again.
+        """
+        try:
+            if gated:
+                # Cheap check first, phrases without the wake word never reach the recognizer
+                accepted, wake_end = wake if wake is not None else self.wake_word.detect(audio)
+                if not accepted:
+                    return None
+                duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+                if duration - wake_end < WAKE_WORD_MIN_COMMAND_SECONDS:
+                    return ""
+
+            if transcript is None:
+                text = self.speech_backend.recognize(audio).lower()
+            elif transcript:
+                text = transcript.lower()
+            else:
+                raise sr.UnknownValueError()
+            if gated:
+                self.wake_word.report_transcript(text)
+                text = text.split(self.wake_word.word, 1)[-1].strip()
+            print(f"You said: {text}")
+            return text
+        except sr.UnknownValueError:
+            self.speak("I didn't catch that. Could you repeat?")
+            return None
+        except sr.RequestError:
+            self.speak("Speech service unavailable. Please check your internet connection.")
+            return None
+        except Exception as e:
+            print(f"Recognition error: {e}")
+            return None
     
-    def handle_gestures(self):
-        """Process detected gestures"""
+    def handle_gestures(self, event):
+        """Act on a gesture event, called on the gesture event dispatcher thread"""
         if not self.gesture_state['active']:
             return
         
-        gesture = self.gesture_state.get('detected')
-        if not gesture:
-            return
-        
+        gesture = event.name
         try:
-            if gesture == "volume_up":
-                self.adjust_volume("increase")
-            elif gesture == "volume_down":
-                self.adjust_volume("decrease")
+            if gesture == "volume_control":
+                adjust_volume(self, level=event.value, quiet=True)
             elif gesture == "thumbs_up":
                 self.speak("Gesture confirmed!")
             elif gesture == "thumbs_down":
                 self.speak("Gesture rejected!")
-            elif gesture == "brightness_up":
-                self.adjust_brightness(delta=25)
-            elif gesture == "brightness_down":
-                self.adjust_brightness(delta=25)
-            
-            # Reset gesture after handling
-            self.gesture_state['detected'] = None
         except Exception as e:
             print(f"Gesture handling error: {e}")
     
@@ -109,43 +217,32 @@ class JarvisAssistant:
         status = "enabled" if enable else "disabled"
         self.speak(f"Gesture control {status}")
     
-    def execute_command(self, command):
+    def execute_command(self, command, speculation=None):
         """Execute commands with improved handling"""
         if not command:
             return
         
-        # Handle gesture commands first
-        self.handle_gestures()
-        
-        # Special case for volume set commands
-        if "set volume to" in command:
-            try:
-                level = int(''.join(filter(str.isdigit, command))) / 100
-                self.adjust_volume(level=level)
-                return
-            except:
-                self.speak("Please specify a volume level between 0 and 100")
-                return
-        
         # Classify the intent
-        intent, confidence = None, 0
-        for possible_intent in CANDIDATE_INTENTS:
-            if possible_intent in command:
-                intent = possible_intent
-                confidence = 1.0
-                break
-        
-        if not intent and self.classifier:
-            try:
-                result = self.classifier(command, CANDIDATE_INTENTS)
-                intent, confidence = result['labels'][0], result['scores'][0]
-            except Exception as e:
-                print(f"Classification error: {e}")
+        intent, confidence = self.classify(command, speculation)
+        self.act(command, intent, confidence)
+
+    def classify(self, command, speculation=None):
+        """Return (intent, confidence), reusing the guess made on partial transcripts if it holds"""
+        if speculation is not None:
+            result = self.speculative.commit(speculation, command)
+            if result:
+                return result.intent, result.score
+        return self.intent_classifier.classify(command)
+
+    def act(self, command, intent, confidence):
+        """Run the handler for a classified command"""
+        if not intent and not self.intent_classifier.is_ready:
+            self.speak("I'm still loading my language model. Please try again in a moment.")
+            return
         
         print(f"Detected intent: {intent} (confidence: {confidence:.2f})")
         
-        if confidence > 0.5:
-            from jarvis_commands import execute_specific_command
+        if confidence > INTENT_CONFIDENCE_THRESHOLD:
             execute_specific_command(self, intent, command)
         else:
             self.speak("I didn't understand.")
@@ -156,27 +253,55 @@ class JarvisAssistant:
         print("Say 'exit' to quit or 'help' for commands list")
         
         try:
-            while self.running:
-                command = self.listen()
-                
-                if command:
-                    if "exit" in command or "quit" in command:
-                        self.running = False
-                        break
-                    
-                    self.execute_command(command)
-                
-                # Small delay to prevent CPU overuse
-                time.sleep(0.1)
-                
+            if RUNTIME_MODE == "async":
+                # Capture, recognition, classification and execution overlap, see async_runtime.py
+                self.runtime = AsyncRuntime(self)
+                asyncio.run(self.runtime.run())
+            else:
+                self.run_serial()
         except KeyboardInterrupt:
             self.running = False
         finally:
             self.gesture_state['active'] = False
+            self.gesture_events.close()
+            self.gesture_events.print_stats()
+            if self.runtime:
+                self.runtime.print_stats()
+            self.intent_classifier.close()
+            registry.print_report()
+            print_import_times()
+            handlers.print_stats()
+            if self.wake_word:
+                self.wake_word.print_stats()
+            if self.speculative:
+                self.speculative.print_stats()
+                self.speculative.close()
             self.speak("Goodbye!")
+            self.speech.close()
+            self.speech.print_stats()
+            self.microphone.close()
+            self.speech_backend.close()
             if self.gesture_thread.is_alive():
                 self.gesture_thread.join(timeout=1)
 
+    def run_serial(self):
+        """One command at a time: listen, recognize, classify, execute"""
+        while self.running:
+            command = self.listen(wake_word=True)
+            
+            if command:
+                if "exit" in command or "quit" in command:
+                    self.running = False
+                    break
+                
+                self.execute_command(command, self.last_speculation)
+            elif self.microphone.exhausted:
+                # Replayed recordings have all been played
+                break
+            
+            # Small delay to prevent CPU overuse
+            time.sleep(0.1)
+
 if __name__ == "__main__":
     assistant = JarvisAssistant()
     assistant.run()
\ No newline at end of file
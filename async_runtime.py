@@ -0,0 +1,245 @@
+# async_runtime.py - Staged asyncio main loop: capture -> recognize -> classify -> execute
+
+import asyncio
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+
+import speech_recognition as sr
+
+from benchmark_utils import LatencyStats
+from config import STAGE_QUEUE_SIZE, CAPTURE_POLL_SECONDS, RUNTIME_STATS_INTERVAL
+
+_STOP = object()
+
+
+class Turn:
+    """One utterance on its way through the stages"""
+
+    __slots__ = ("audio", "transcript", "speculation", "wake", "gated", "captured", "text", "intent", "confidence")
+
+    def __init__(self, audio, transcript=None, speculation=None, wake=None, gated=False):
+        self.audio = audio
+        self.transcript = transcript
+        self.speculation = speculation
+        self.wake = wake
+        self.gated = gated  # Whether the phrase had to start with the wake word, decided at capture
+        self.captured = time.perf_counter()
+        self.text = None
+        self.intent = None
+        self.confidence = 0.0
+
+
+class StageStats(LatencyStats):
+    COUNTERS = ("processed", "dropped", "errors", "max_depth")
+
+    def summary(self, depth):
+        return {"depth": depth, **super().summary()}
+
+
+class StageExecutor(Executor):
+    """One daemon worker thread running submitted calls in order.
+
+    Unlike ThreadPoolExecutor its thread does not keep the process alive,
+    so a handler still blocking the execute stage cannot hold up exit or
+    Ctrl+C.
+    """
+
+    def __init__(self, name):
+        self._calls = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._work, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        self._calls.put((future, fn, args, kwargs))
+        return future
+
+    def _work(self):
+        while True:
+            call = self._calls.get()
+            if call is None:
+                return
+            future, fn, args, kwargs = call
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self._calls.put(None)
+        if wait:
+            self._thread.join()
+
+
+class AsyncRuntime:
+    """Runs the assistant as stages joined by bounded asyncio queues.
+
+    Every stage does its blocking work (microphone, recognizer, models,
+    handlers) on its own single-thread executor, so stages overlap while
+    each one still handles turns in order: the next phrase is captured while
+    the previous one is being recognized or classified. With a streaming
+    backend the capture stage also transcribes, and classification of a
+    turn is often settled by speculation before it reaches that stage. Speech output is the
+    assistant's SpeechQueue thread, which already works as the last stage.
+    A full queue makes the stage before it wait instead of piling up work.
+    """
+
+    STAGES = ("capture", "recognize", "classify", "execute")
+
+    def __init__(self, assistant):
+        self.assistant = assistant
+        self.executors = {name: StageExecutor(f"stage-{name}") for name in self.STAGES}
+        self.queues = {}
+        self.stats = {name: StageStats() for name in self.STAGES}
+        self.turn_times = deque(maxlen=200)
+        # Set by a wake word said on its own, the next captured phrase is then ungated
+        self.awake = False
+        self.loop = None
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        # Created here so they belong to this event loop
+        self.queues = {name: asyncio.Queue(maxsize=STAGE_QUEUE_SIZE) for name in self.STAGES[1:]}
+        tasks = [asyncio.create_task(self._capture()),
+                 asyncio.create_task(self._stage("recognize", self._recognize, "classify")),
+                 asyncio.create_task(self._stage("classify", self._classify, "execute")),
+                 asyncio.create_task(self._stage("execute", self._execute, None))]
+        reporter = asyncio.create_task(self._report()) if RUNTIME_STATS_INTERVAL else None
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            if reporter:
+                reporter.cancel()
+            for executor in self.executors.values():
+                executor.shutdown(wait=False)
+
+    async def _capture(self):
+        stats = self.stats["capture"]
+        while self.assistant.running:
+            if self.assistant.prompt_waiting.is_set():
+                # A handler is asking the user something, let it have the next phrase
+                await asyncio.sleep(0.05)
+                continue
+            start = time.perf_counter()
+            try:
+                captured = await self.loop.run_in_executor(self.executors["capture"], self._listen_once)
+            except Exception as e:
+                stats.errors += 1
+                print(f"Capture error: {e}")
+                await asyncio.sleep(0.1)
+                continue
+            if captured is None:
+                if self.assistant.microphone.exhausted:
+                    # Replayed recordings have all been played, let the queued turns finish
+                    break
+                continue
+            stats.processed += 1
+            stats.latencies.append(time.perf_counter() - start)
+            await self._put("recognize", Turn(*captured))
+        await self.queues["recognize"].put(_STOP)
+
+    def _listen_once(self):
+        """Capture one phrase as (audio, transcript, speculation, wake, gated), None if nobody spoke"""
+        gated = self.assistant.wake_word is not None and not self.awake
+        if not gated:
+            # Ungated turns would hear the assistant's own replies, so wait them out like listen() does
+            if not self.assistant.speech.wait_until_idle(CAPTURE_POLL_SECONDS):
+                return None
+        with self.assistant.listen_lock:
+            try:
+                captured = self.assistant.capture(CAPTURE_POLL_SECONDS, gated)
+            except sr.WaitTimeoutError:
+                return None
+        # The gate is decided here once and travels with the turn, recognition may run much later.
+        # An ungated phrase used up the wake word said on its own
+        if not gated:
+            self.awake = False
+        return (*captured, gated)
+
+    async def _put(self, name, item):
+        queue = self.queues[name]
+        await queue.put(item)
+        stats = self.stats[name]
+        stats.max_depth = max(stats.max_depth, queue.qsize())
+
+    async def _stage(self, name, work, next_stage):
+        """Feed each turn to work() on the stage executor, pass non-None results on"""
+        stats = self.stats[name]
+        queue = self.queues[name]
+        while True:
+            turn = await queue.get()
+            if turn is _STOP:
+                if next_stage:
+                    await self.queues[next_stage].put(_STOP)
+                return
+            start = time.perf_counter()
+            try:
+                result = await self.loop.run_in_executor(self.executors[name], work, turn)
+            except Exception as e:
+                stats.errors += 1
+                print(f"{name.capitalize()} stage error: {e}")
+                continue
+            stats.latencies.append(time.perf_counter() - start)
+            stats.processed += 1
+            if result is None:
+                stats.dropped += 1
+            elif next_stage:
+                await self._put(next_stage, result)
+
+    def _recognize(self, turn):
+        text = self.assistant.recognize(turn.audio, turn.gated, turn.transcript, turn.wake)
+        if text == "":
+            # Wake word on its own, the next phrase needs no wake word
+            self.awake = True
+            self.assistant.speak("Yes?")
+            return None
+        if text is None:
+            return None
+        turn.text = text
+        return turn
+
+    def _classify(self, turn):
+        if not turn.text:
+            return None
+        turn.intent, turn.confidence = self.assistant.classify(turn.text, turn.speculation)
+        return turn
+
+    def _execute(self, turn):
+        if not self.assistant.running:
+            return None
+        if "exit" in turn.text or "quit" in turn.text:
+            self.assistant.running = False
+            return None
+        self.assistant.act(turn.text, turn.intent, turn.confidence)
+        self.turn_times.append(time.perf_counter() - turn.captured)
+        return turn
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(RUNTIME_STATS_INTERVAL)
+            self.print_stats()
+
+    def stage_stats(self):
+        """Queue depth and latency of every stage, plus capture-to-handled turn time"""
+        report = {name: self.stats[name].summary(self.queues[name].qsize() if name in self.queues else 0)
+                  for name in self.STAGES}
+        speech = self.assistant.speech.stats()
+        report["speak"] = {"depth": speech["pending"], "processed": speech["syntheses"],
+                           "mean_ms": speech["mean_latency"] * 1000}
+        turns = sorted(self.turn_times)
+        report["turn_ms"] = statistics.mean(turns) * 1000 if turns else 0.0
+        return report
+
+    def print_stats(self):
+        report = self.stage_stats()
+        for name in self.STAGES + ("speak",):
+            row = report[name]
+            print(f"{name:<10} depth {row['depth']:>2} processed {row['processed']:>5} "
+                  f"{row['mean_ms']:>9.1f} ms avg")
+        print(f"Turn time (captured -> handled): {report['turn_ms']:.1f} ms avg")
@@ -0,0 +1,268 @@
+# audio_stream.py - Long-lived microphone capture with background noise calibration
+
+import json
+import os
+import threading
+import time
+import wave
+from collections import deque
+
+import numpy as np
+import speech_recognition as sr
+
+from config import (MIC_SAMPLE_RATE, MIC_CHUNK_SIZE, MIC_BUFFER_SECONDS, MIC_PRE_ROLL,
+                    MIC_PAUSE_THRESHOLD, MIC_ENERGY_THRESHOLD, MIC_CALIBRATION_SECONDS,
+                    MIC_DYNAMIC_ENERGY_RATIO, MIC_DYNAMIC_ENERGY_DAMPING, MIC_PHRASE_TIME_LIMIT,
+                    MIC_BARGE_IN_RATIO, MIC_BARGE_IN_SECONDS)
+
+# Maps WAV file names in a replay directory to their reference transcripts
+REPLAY_MANIFEST = "transcripts.json"
+
+
+def frame_energy(data):
+    """RMS energy of a chunk of 16-bit PCM audio"""
+    samples = np.frombuffer(data, dtype=np.int16)
+    if not samples.size:
+        return 0.0
+    return float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+
+
+class MicrophoneStream:
+    """Microphone that stays open for the whole session.
+
+    start() calibrates the energy threshold on a second of background
+    noise. After that a capture thread reads the device continuously into
+    a ring buffer and keeps adapting the threshold, up or down, on every
+    frame nobody is recording, so listen() can start recording immediately
+    instead of calibrating first. Each
+    listen() call reads the buffer through its own cursor and keeps a short
+    pre-roll so the first syllable is not clipped.
+    """
+
+    def __init__(self, device_index=None, sample_rate=MIC_SAMPLE_RATE, chunk_size=MIC_CHUNK_SIZE):
+        self.microphone = sr.Microphone(device_index=device_index, sample_rate=sample_rate,
+                                        chunk_size=chunk_size)
+        self.energy_threshold = MIC_ENERGY_THRESHOLD
+        self.pause_threshold = MIC_PAUSE_THRESHOLD
+        self.sample_rate = sample_rate
+        self.sample_width = 2
+        self.seconds_per_buffer = chunk_size / sample_rate
+
+        self._frames = deque(maxlen=max(1, int(MIC_BUFFER_SECONDS / self.seconds_per_buffer)))
+        self._newest = -1
+        self._condition = threading.Condition()
+        self._recording = 0
+        self._source = None
+        self._loud_frames = 0
+        # Called from the capture thread when someone starts talking loudly, e.g. over the assistant
+        self.on_barge_in = None
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self._source = self.microphone.__enter__()
+        self.sample_rate = self._source.SAMPLE_RATE
+        self.sample_width = self._source.SAMPLE_WIDTH
+        self.seconds_per_buffer = self._source.CHUNK / self.sample_rate
+        self._calibrate(MIC_CALIBRATION_SECONDS)
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+        if self._source:
+            self.microphone.__exit__(None, None, None)
+            self._source = None
+
+    def _adapt(self, energy, damping):
+        """Move the threshold toward the noise level, as adjust_for_ambient_noise does"""
+        target = energy * MIC_DYNAMIC_ENERGY_RATIO
+        self.energy_threshold = self.energy_threshold * damping + target * (1 - damping)
+
+    def _calibrate(self, duration):
+        damping = MIC_DYNAMIC_ENERGY_DAMPING ** self.seconds_per_buffer
+        for _ in range(max(1, int(duration / self.seconds_per_buffer))):
+            try:
+                data = self._source.stream.read(self._source.CHUNK)
+            except Exception as e:
+                print(f"Microphone read error: {e}")
+                return
+            self._adapt(frame_energy(data), damping)
+
+    def _capture_loop(self):
+        damping = MIC_DYNAMIC_ENERGY_DAMPING ** self.seconds_per_buffer
+        barge_in_frames = max(1, int(MIC_BARGE_IN_SECONDS / self.seconds_per_buffer))
+        while self.running:
+            try:
+                data = self._source.stream.read(self._source.CHUNK)
+            except Exception as e:
+                print(f"Microphone read error: {e}")
+                time.sleep(self.seconds_per_buffer)
+                continue
+
+            energy = frame_energy(data)
+            with self._condition:
+                self._newest += 1
+                self._frames.append((self._newest, data, energy))
+                # Track background noise only while nobody is recording a phrase
+                if not self._recording:
+                    self._adapt(energy, damping)
+                self._condition.notify_all()
+                threshold = self.energy_threshold
+
+            self._loud_frames = self._loud_frames + 1 if energy > threshold * MIC_BARGE_IN_RATIO else 0
+            if self._loud_frames == barge_in_frames and self.on_barge_in:
+                self.on_barge_in()
+
+    def _read_after(self, cursor, deadline):
+        """Frames newer than cursor, waiting until the deadline for at least one"""
+        with self._condition:
+            while self._newest <= cursor and self.running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return []
+                self._condition.wait(remaining)
+            return [frame for frame in self._frames if frame[0] > cursor]
+
+    def listen(self, timeout=None, phrase_time_limit=MIC_PHRASE_TIME_LIMIT, on_frame=None):
+        """Record one phrase from the stream and return it as sr.AudioData.
+
+        on_frame, if given, receives every chunk of the phrase as it is
+        recorded, for streaming recognition. Raises sr.WaitTimeoutError if no
+        speech starts within timeout seconds. The phrase ends after
+        phrase_time_limit seconds even without a pause.
+        """
+        if not self.running:
+            raise RuntimeError("Microphone stream is not started")
+
+        pre_roll_count = max(1, int(MIC_PRE_ROLL / self.seconds_per_buffer))
+        pause_count_limit = int(self.pause_threshold / self.seconds_per_buffer)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            # Frames captured just before the call may already hold the onset
+            cursor = self._newest - pre_roll_count
+        pre_roll = deque(maxlen=pre_roll_count)
+        phrase = None
+        pause_count = 0
+        phrase_frames = 0
+
+        try:
+            while True:
+                frames = self._read_after(cursor, deadline if phrase is None else None)
+                if not frames:
+                    if not self.running:
+                        raise RuntimeError("Microphone stream stopped")
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+
+                for seq, data, energy in frames:
+                    cursor = seq
+                    if phrase is None:
+                        if energy <= self.energy_threshold:
+                            pre_roll.append(data)
+                            continue
+                        phrase = list(pre_roll)
+                        with self._condition:
+                            self._recording += 1
+                        if on_frame:
+                            for chunk in phrase:
+                                on_frame(chunk)
+
+                    phrase.append(data)
+                    if on_frame:
+                        on_frame(data)
+                    phrase_frames += 1
+                    pause_count = 0 if energy > self.energy_threshold else pause_count + 1
+                    limit_reached = (phrase_time_limit and
+                                     phrase_frames * self.seconds_per_buffer > phrase_time_limit)
+                    if pause_count > pause_count_limit or limit_reached:
+                        return sr.AudioData(b"".join(phrase), self.sample_rate, self.sample_width)
+        finally:
+            if phrase is not None:
+                with self._condition:
+                    self._recording -= 1
+
+    @property
+    def exhausted(self):
+        return False
+
+
+def read_wav(path):
+    """Load a PCM WAV file as sr.AudioData"""
+    with wave.open(path, "rb") as f:
+        return sr.AudioData(f.readframes(f.getnframes()), f.getframerate(), f.getsampwidth())
+
+
+def load_transcripts(directory):
+    """Reference transcripts of a replay directory, {} if it has no manifest"""
+    path = os.path.join(directory, REPLAY_MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class WavReplayStream:
+    """Drop-in for MicrophoneStream that plays back recorded WAV files.
+
+    Each listen() returns the next file in name order. With realtime on,
+    listen() also takes as long as the recording lasts, like a live
+    microphone would.
+    """
+
+    def __init__(self, directory, realtime=False):
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.lower().endswith(".wav"))
+        self.realtime = realtime
+        self.position = 0
+        self.current = None
+        self.sample_rate = None
+        self.sample_width = None
+        self.on_barge_in = None
+
+    def start(self):
+        return self
+
+    def close(self):
+        pass
+
+    @property
+    def exhausted(self):
+        return self.position >= len(self.paths)
+
+    def listen(self, timeout=None, phrase_time_limit=None, on_frame=None):
+        if self.exhausted:
+            raise sr.WaitTimeoutError("replay finished")
+
+        self.current = self.paths[self.position]
+        self.position += 1
+        audio = read_wav(self.current)
+        self.sample_rate = audio.sample_rate
+        self.sample_width = audio.sample_width
+        duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        if phrase_time_limit and duration > phrase_time_limit:
+            keep = int(phrase_time_limit * audio.sample_rate) * audio.sample_width
+            audio = sr.AudioData(audio.frame_data[:keep], audio.sample_rate, audio.sample_width)
+            duration = phrase_time_limit
+        if on_frame:
+            chunk = MIC_CHUNK_SIZE * audio.sample_width
+            for offset in range(0, len(audio.frame_data), chunk):
+                on_frame(audio.frame_data[offset:offset + chunk])
+                if self.realtime:
+                    time.sleep(MIC_CHUNK_SIZE / audio.sample_rate)
+        elif self.realtime:
+            time.sleep(duration)
+        return audio
+
+
+def open_audio_source(settings):
+    """Audio source selected by the "speech" section of jarvis_config.json"""
+    if settings["source"] == "replay":
+        return WavReplayStream(settings["replay_directory"])
+    if settings["source"] != "microphone":
+        raise ValueError(f"Unknown audio source '{settings['source']}'")
+    return MicrophoneStream()
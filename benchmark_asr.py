@@ -0,0 +1,151 @@
+# benchmark_asr.py - Reproducible speech recognition latency and turn-time benchmark on recorded WAVs
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+
+from benchmark_utils import peak_rss_mb, percentile, run_worker
+from config import DEFAULT_SPEECH_SETTINGS, load_user_config
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level edit distance divided by the reference length"""
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref) if ref else float(bool(hyp))
+
+
+def _run_backend(name, settings, classify, results):
+    """Load one recognizer, transcribe every recording and report latency, WER and turn time"""
+    import speech_recognition as sr
+    from audio_stream import WavReplayStream, load_transcripts
+    from speech_backends import create_backend
+
+    try:
+        start = time.perf_counter()
+        backend = create_backend({**settings, "backend": name})
+        load_time = time.perf_counter() - start
+
+        classifier = None
+        if classify:
+            from intent_classifier import IntentClassifier
+            classifier = IntentClassifier(warmup=True)
+            classifier.wait_until_ready(timeout=None)
+
+        transcripts = load_transcripts(settings["replay_directory"])
+        source = WavReplayStream(settings["replay_directory"])
+        latencies, factors, turn_times, error_rates, samples = [], [], [], [], []
+        while not source.exhausted:
+            audio = source.listen()
+            file_name = os.path.basename(source.current)
+            duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+
+            start = time.perf_counter()
+            try:
+                text = backend.recognize(audio).lower()
+            except sr.UnknownValueError:
+                text = ""
+            recognize_time = time.perf_counter() - start
+
+            classify_time = 0.0
+            intent = None
+            if classifier and text:
+                start = time.perf_counter()
+                # The intent cache is bypassed so every turn pays for a real classification
+                intent = next(classifier.classify_many([text], use_cache=False)).intent
+                classify_time = time.perf_counter() - start
+
+            latencies.append(recognize_time * 1000)
+            factors.append(recognize_time / duration if duration else 0.0)
+            # A live turn waits for the utterance to be spoken before recognition starts
+            turn_times.append((duration + recognize_time + classify_time) * 1000)
+            sample = {"file": file_name, "text": text, "latency_ms": round(recognize_time * 1000, 3)}
+            if file_name in transcripts:
+                sample["wer"] = round(word_error_rate(transcripts[file_name], text), 4)
+                error_rates.append(sample["wer"])
+            if classifier:
+                sample["intent"] = intent
+            samples.append(sample)
+
+        if classifier:
+            # A benchmark run must not leave entries in the assistant's persistent intent cache
+            classifier.close(save_cache=False)
+        backend.close()
+        if not samples:
+            raise RuntimeError(f"No WAV files in {settings['replay_directory']}")
+
+        results.put({
+            "backend": name,
+            "samples": len(samples),
+            "load_time_s": round(load_time, 3),
+            "latency_ms": {
+                "mean": round(statistics.mean(latencies), 3),
+                "p50": round(percentile(latencies, 0.50), 3),
+                "p95": round(percentile(latencies, 0.95), 3)
+            },
+            "real_time_factor": round(statistics.mean(factors), 4),
+            "turn_time_ms": {
+                "mean": round(statistics.mean(turn_times), 3),
+                "p95": round(percentile(turn_times, 0.95), 3)
+            },
+            "wer": round(statistics.mean(error_rates), 4) if error_rates else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "utterances": samples
+        })
+    except Exception as e:
+        results.put({"backend": name, "error": str(e)})
+
+
+def run_benchmark(backends, directory, classify=False):
+    from speech_backends import BACKENDS
+
+    settings = {**load_user_config()["speech"], "replay_directory": directory}
+    reports = []
+    for name in backends:
+        if name not in BACKENDS:
+            reports.append({"backend": name, "error": "unknown backend"})
+            continue
+        try:
+            reports.append(run_worker(_run_backend, (name, settings, classify)))
+        except RuntimeError as e:
+            reports.append({"backend": name, "error": str(e)})
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"platform": platform.platform(), "processor": platform.processor(),
+                    "cpus": os.cpu_count()},
+        "recordings": directory,
+        "classify": classify,
+        "results": reports
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark speech recognition backends on recorded WAVs")
+    parser.add_argument("--backends", nargs="+", default=["replay", "sphinx", "vosk", "whisper", "google"])
+    parser.add_argument("--recordings", default=DEFAULT_SPEECH_SETTINGS["replay_directory"],
+                        help="Directory of WAV files with an optional transcripts.json manifest")
+    parser.add_argument("--classify", action="store_true",
+                        help="Include intent classification in the end-to-end turn time")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run_benchmark(args.backends, args.recordings, args.classify), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
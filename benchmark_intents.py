@@ -0,0 +1,172 @@
+# benchmark_intents.py - Offline latency and accuracy benchmark for intent classification
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+
+from benchmark_utils import peak_rss_mb, percentile, run_worker
+from config import INTENT_CONFIDENCE_THRESHOLD
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_corpus.json")
+# Utterances written independently of the corpus and of INTENT_SYNONYMS, for prefilter recall
+HELDOUT_CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_corpus_heldout.json")
+
+# Benchmarked paths: (zero-shot model or None for the keyword matcher, acceptance threshold,
+# whether the lexical prefilter narrows the labels). The roberta threshold mirrors commands.py
+PATHS = {
+    "keyword": (None, 1.0, False),
+    "bart": ("facebook/bart-large-mnli", INTENT_CONFIDENCE_THRESHOLD, False),
+    "bart-prefilter": ("facebook/bart-large-mnli", INTENT_CONFIDENCE_THRESHOLD, True),
+    "roberta": ("roberta-large-mnli", 0.3, False)
+}
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _build_classifier(model_name, use_prefilter=False):
+    """Return a callable mapping an utterance to (intent, score)"""
+    from config import CANDIDATE_INTENTS, INTENT_ALIASES
+
+    if model_name is None:
+        from intent_matcher import IntentMatcher
+        matcher = IntentMatcher(CANDIDATE_INTENTS, INTENT_ALIASES)
+
+        def classify(utterance):
+            intent = matcher.match(utterance)
+            return intent, 1.0 if intent else 0.0
+        return classify
+
+    from transformers import pipeline
+    classifier = pipeline("zero-shot-classification", model=model_name)
+    prefilter = None
+    if use_prefilter:
+        from intent_prefilter import IntentPrefilter
+        prefilter = IntentPrefilter(CANDIDATE_INTENTS)
+
+    def classify(utterance):
+        labels = prefilter.candidates(utterance) if prefilter else CANDIDATE_INTENTS
+        result = classifier(utterance, labels)
+        return result['labels'][0], result['scores'][0]
+    return classify
+
+
+def prefilter_recall(corpus):
+    """How often the prefilter keeps the expected intent, and how often it gives up"""
+    from config import CANDIDATE_INTENTS
+    from intent_prefilter import IntentPrefilter
+
+    prefilter = IntentPrefilter(CANDIDATE_INTENTS)
+    kept, fallbacks, sizes = 0, 0, []
+    for sample in corpus:
+        candidates = prefilter.candidates(sample["utterance"])
+        kept += sample["intent"] in candidates
+        fallbacks += len(candidates) == len(CANDIDATE_INTENTS)
+        sizes.append(len(candidates))
+    return {
+        "recall": round(kept / len(corpus), 4),
+        "fallback_rate": round(fallbacks / len(corpus), 4),
+        "mean_candidates": round(statistics.mean(sizes), 2)
+    }
+
+
+def _run_path(name, corpus, results):
+    """Classify the corpus on one path and report load time, latency percentiles, accuracy and memory"""
+    # Only locally cached models may be used
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+    model_name, threshold, use_prefilter = PATHS[name]
+
+    try:
+        start = time.perf_counter()
+        classify = _build_classifier(model_name, use_prefilter)
+        load_time = time.perf_counter() - start
+
+        classify(corpus[0]["utterance"])  # Warm-up pass
+        latencies, correct, accepted, accepted_correct = [], 0, 0, 0
+        errors = []
+        run_start = time.perf_counter()
+        for sample in corpus:
+            start = time.perf_counter()
+            intent, score = classify(sample["utterance"])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            hit = intent == sample["intent"]
+            correct += hit
+            if score >= threshold:
+                accepted += 1
+                accepted_correct += hit
+            if not hit:
+                errors.append({"utterance": sample["utterance"], "expected": sample["intent"],
+                               "predicted": intent, "score": round(score, 4)})
+        total_time = time.perf_counter() - run_start
+
+        report = {
+            "path": name,
+            "model": model_name,
+            "prefilter": use_prefilter,
+            "threshold": threshold,
+            "samples": len(corpus),
+            "load_time_s": round(load_time, 3),
+            "latency_ms": {
+                "mean": round(statistics.mean(latencies), 3),
+                "p50": round(percentile(latencies, 0.50), 3),
+                "p95": round(percentile(latencies, 0.95), 3),
+                "p99": round(percentile(latencies, 0.99), 3)
+            },
+            "throughput_per_s": round(len(corpus) / total_time, 2),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "top1_accuracy": round(correct / len(corpus), 4),
+            "accepted_rate": round(accepted / len(corpus), 4),
+            "accepted_accuracy": round(accepted_correct / accepted, 4) if accepted else 0.0,
+            "errors": errors
+        }
+        if use_prefilter:
+            report["prefilter_stats"] = prefilter_recall(corpus)
+        results.put(report)
+    except Exception as e:
+        results.put({"path": name, "model": model_name, "error": str(e)})
+
+
+def run_benchmark(paths=tuple(PATHS), corpus_path=CORPUS_PATH):
+    corpus = load_corpus(corpus_path)
+    reports = []
+    for name in paths:
+        try:
+            reports.append(run_worker(_run_path, (name, corpus)))
+        except RuntimeError as e:
+            reports.append({"path": name, "model": PATHS[name][0], "error": str(e)})
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"platform": platform.platform(), "processor": platform.processor(),
+                    "cpus": os.cpu_count()},
+        "corpus": os.path.basename(corpus_path),
+        "results": reports
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark intent classification paths offline")
+    parser.add_argument("--paths", nargs="+", choices=list(PATHS), default=list(PATHS))
+    parser.add_argument("--corpus", default=CORPUS_PATH,
+                        help=f"Labeled utterances, use {os.path.basename(HELDOUT_CORPUS_PATH)} "
+                             "for prefilter recall on text the synonyms were not written from")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run_benchmark(args.paths, args.corpus), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmark_utils.py - Helpers shared by the benchmark and report scripts
+
+import multiprocessing
+import queue
+import statistics
+import sys
+import time
+from collections import deque
+
+from config import BENCHMARK_WORKER_TIMEOUT
+
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB"""
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes on Linux
+        return usage / (1024 ** 2) if sys.platform == "darwin" else usage / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 ** 2)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class LatencyStats:
+    """Event counters plus the most recent latencies in seconds, for live runtime reports.
+
+    Subclasses list their counters in COUNTERS; each starts at zero and is
+    incremented directly by the code being measured.
+    """
+
+    COUNTERS = ()
+
+    def __init__(self, window=200):
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.latencies = deque(maxlen=window)
+
+    def summary(self):
+        latencies = list(self.latencies)
+        row = {name: getattr(self, name) for name in self.COUNTERS}
+        row["mean_ms"] = statistics.mean(latencies) * 1000 if latencies else 0.0
+        row["p95_ms"] = percentile(latencies, 0.95) * 1000 if latencies else 0.0
+        return row
+
+
+def run_worker(target, args, timeout=BENCHMARK_WORKER_TIMEOUT):
+    """Run target(*args, results) in a spawned process and return what it puts on results.
+
+    Every run starts from a fresh interpreter, so imports, model load
+    times and peak memory are never shared between measurements. Raises RuntimeError when the worker dies without reporting (a model
+    load running out of memory, say) or is still busy after timeout seconds.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    worker = context.Process(target=target, args=(*args, results))
+    worker.start()
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                return results.get(timeout=1.0)
+            except queue.Empty:
+                pass
+            if worker.exitcode is not None:
+                # The result may still be in flight from a worker that just exited
+                try:
+                    return results.get(timeout=1.0)
+                except queue.Empty:
+                    raise RuntimeError(f"worker exited with code {worker.exitcode} without a result")
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"worker gave no result within {timeout:.0f} s")
+    finally:
+        worker.join(timeout=5)
+        if worker.is_alive():
+            worker.terminate()
+            worker.join()
@@ -0,0 +1,151 @@
+# camera_capture.py - Camera reader thread with a latest-frame slot
+
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from lazy_import import lazy_import
+from config import GESTURE_CAMERA_SOURCE, GESTURE_FRAME_WIDTH, GESTURE_FRAME_HEIGHT, GESTURE_CAMERA_FPS
+
+cv2 = lazy_import("cv2")
+
+# seq counts every frame read from the source, timestamp is time.time() right after the read
+Frame = namedtuple("Frame", ["image", "seq", "timestamp"])
+
+
+class SyntheticSource:
+    """cv2.VideoCapture stand-in producing a moving square at a fixed frame rate"""
+
+    def __init__(self, width=GESTURE_FRAME_WIDTH, height=GESTURE_FRAME_HEIGHT, fps=GESTURE_CAMERA_FPS):
+        self.width, self.height, self.fps = width, height, fps
+        self.count = 0
+        self.next_time = time.monotonic()
+
+    def read(self):
+        delay = self.next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_time = max(self.next_time, time.monotonic() - 1 / self.fps) + 1 / self.fps
+
+        frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        x = int((self.count * 8) % max(1, self.width - 80))
+        frame[self.height // 2 - 40:self.height // 2 + 40, x:x + 80] = (200, 180, 160)
+        self.count += 1
+        return True, frame
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class VideoFileSource:
+    """Plays a video file in real time and in a loop, like a camera would deliver it"""
+
+    def __init__(self, path, loop=True):
+        self.capture = cv2.VideoCapture(path)
+        self.loop = loop
+        fps = self.capture.get(cv2.CAP_PROP_FPS)
+        self.interval = 1 / fps if fps and fps > 0 else 1 / GESTURE_CAMERA_FPS
+        self.next_time = time.monotonic()
+
+    def read(self):
+        delay = self.next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_time = max(self.next_time, time.monotonic() - self.interval) + self.interval
+
+        ret, frame = self.capture.read()
+        if not ret and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+        return ret, frame
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def release(self):
+        self.capture.release()
+
+
+def open_camera(source=GESTURE_CAMERA_SOURCE):
+    """Webcam index, video file path, or "synthetic" for a generated test pattern"""
+    if source == "synthetic":
+        return SyntheticSource()
+    if isinstance(source, str):
+        return VideoFileSource(source)
+
+    cap = cv2.VideoCapture(source, cv2.CAP_DSHOW)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, GESTURE_FRAME_WIDTH)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, GESTURE_FRAME_HEIGHT)
+    cap.set(cv2.CAP_PROP_FPS, GESTURE_CAMERA_FPS)   # Optimal balance between smoothness and performance
+    return cap
+
+
+class CameraCapture:
+    """Reads frames on a background thread and keeps only the newest one.
+
+    The reader never waits for the consumer: a frame the consumer has not
+    picked up yet is replaced by the next one and counted as dropped. The
+    consumer never waits for the camera beyond the arrival of the next
+    frame, and gets the newest frame available.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._frame = None
+        self._condition = threading.Condition()
+        self._consumed_seq = -1
+        self.captured = 0
+        self.dropped = 0
+        self.read_failures = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._read_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+        self.source.release()
+
+    def _read_loop(self):
+        seq = 0
+        while self.running:
+            ret, image = self.source.read()
+            if not ret:
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+            with self._condition:
+                if self._frame is not None and self._frame.seq > self._consumed_seq:
+                    self.dropped += 1
+                self._frame = Frame(image, seq, time.time())
+                self.captured += 1
+                self._condition.notify_all()
+            seq += 1
+
+    def latest(self, after_seq=-1, timeout=None):
+        """Newest frame with a sequence number above after_seq, None on timeout"""
+        with self._condition:
+            if not self._condition.wait_for(
+                    lambda: self._frame is not None and self._frame.seq > after_seq, timeout):
+                return None
+            self._consumed_seq = self._frame.seq
+            return self._frame
+
+    def stats(self):
+        return {
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "read_failures": self.read_failures,
+            "drop_rate": self.dropped / self.captured if self.captured else 0.0
+        }
@@ -0,0 +1,70 @@
+# command_registry.py - Intent -> handler registry with per-handler statistics
+
+import time
+
+from slots import extract_slots
+
+
+class Handler:
+    def __init__(self, func, slots, fixed):
+        self.func = func
+        self.slots = tuple(slots)
+        self.fixed = fixed
+        self.calls = 0
+        self.total_time = 0.0
+
+
+class CommandRegistry:
+    """Maps each intent to one handler and the slots it takes.
+
+    Handlers are called with the dispatch arguments, then their fixed
+    keyword arguments, then any declared slots found in the command.
+    Slot names double as the handler's keyword argument names.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+
+    def register(self, intent, func, slots=(), **fixed):
+        if intent in self.handlers:
+            raise ValueError(f"Duplicate handler for intent '{intent}'")
+        self.handlers[intent] = Handler(func, slots, fixed)
+
+    def handler(self, *intents, slots=(), **fixed):
+        """Decorator registering the function for one or more intents"""
+        def decorator(func):
+            for intent in intents:
+                self.register(intent, func, slots, **fixed)
+            return func
+        return decorator
+
+    def dispatch(self, intent, command, *args):
+        """Run the intent's handler, returns False if the intent has none"""
+        handler = self.handlers.get(intent)
+        if handler is None:
+            return False
+
+        slots = extract_slots(command, handler.slots) if handler.slots and command else {}
+        start = time.perf_counter()
+        try:
+            handler.func(*args, **handler.fixed, **slots)
+        finally:
+            handler.calls += 1
+            handler.total_time += time.perf_counter() - start
+        return True
+
+    def missing(self, intents):
+        """Intents from the list that have no handler"""
+        return [intent for intent in intents if intent not in self.handlers]
+
+    def stats(self):
+        """Call count and timing per intent that has been dispatched at least once"""
+        return {intent: {
+            "calls": handler.calls,
+            "total_time": handler.total_time,
+            "mean_time": handler.total_time / handler.calls
+        } for intent, handler in self.handlers.items() if handler.calls}
+
+    def print_stats(self):
+        for intent, row in sorted(self.stats().items(), key=lambda item: -item[1]["total_time"]):
+            print(f"{intent:<24} {row['calls']:>5} calls {row['mean_time'] * 1000:>9.1f} ms avg")
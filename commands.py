@@ -1,97 +1,114 @@
 import os
 import shutil
-import pyttsx3
 import webbrowser
-import psutil
-import pyautogui
-from transformers import pipeline
-import spacy
-import speech_recognition as sr
-import win32com.client
-import pygetwindow as gw
-from pycaw.pycaw import AudioUtilities, ISimpleAudioVolume
-from comtypes import CLSCTX_ALL
-
-
-# Initialize voice engine
-engine = pyttsx3.init()
-engine.setProperty('rate', 160)
-nlp = spacy.load("en_core_web_sm")
-classifier = pipeline("zero-shot-classification", model="roberta-large-mnli")
+import threading
+from lazy_import import lazy_import
+from config import CLASSIFIER_WAIT_TIMEOUT
+from model_registry import get_speech_queue, get_zero_shot_classifier
+from command_registry import CommandRegistry
+
+# Heavy dependencies are only imported when a command first uses them
+psutil = lazy_import("psutil")
+pyautogui = lazy_import("pyautogui")
+sr = lazy_import("speech_recognition")
+gw = lazy_import("pygetwindow")
+pycaw = lazy_import("pycaw.pycaw")
+
+# The shared NLI model loads on a background thread, see warm_up()
+_models = {}
+_models_ready = threading.Event()
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+_speech = None
+
+# Intent -> handler registry, filled in by the @handlers.handler decorators below
+handlers = CommandRegistry()
 
 # Candidate intents
 CANDIDATE_INTENTS = [
     "open browser", "search web", "play music", "monitor system",
     "control brightness", "restart wifi", "shutdown", "open file",
     "copy file", "move file", "extract text", "write in word", "exit",
-    "maximize window", "minimize window", "open calculator", "open settings", "take screenshot"
+    "maximize window", "minimize window", "open calculator", "open settings", "take screenshot",
     "increase volume", "decrease volume", "mute volume", "unmute volume"
 
 ]
 
+def _load_models():
+    try:
+        _models["classifier"] = get_zero_shot_classifier()
+    except Exception as e:
+        print(f"Model loading error: {e}")
+    finally:
+        _models_ready.set()
+
+def warm_up():
+    """Start loading the NLI model in the background (only once)."""
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_load_models, daemon=True)
+            _warmup_thread.start()
+
+def _get_model(name):
+    """Return a loaded model, or None if it is unavailable or still loading."""
+    warm_up()
+    if not _models_ready.wait(CLASSIFIER_WAIT_TIMEOUT):
+        print("Models are still loading.")
+        return None
+    return _models.get(name)
+
+def _speech_queue():
+    global _speech
+    with _warmup_lock:
+        if _speech is None:
+            _speech = get_speech_queue()
+    return _speech
+
 def speak(text):
-    """Speak out the provided text."""
-    engine.say(text)
-    engine.runAndWait()
+    """Queue the provided text for speech and return without waiting."""
+    return _speech_queue().say(text)
 
 def listen():
     """Listen for audio input using the microphone and return recognized text."""
     recognizer = sr.Recognizer()
+    # Don't record our own voice
+    _speech_queue().wait_until_idle()
     with sr.Microphone() as source:
         recognizer.adjust_for_ambient_noise(source)
-        speak("Listening...")
+        # The prompt must finish before recording starts
+        speak("Listening...").wait()
         try:
             audio = recognizer.listen(source, timeout=10)
             return recognizer.recognize_google(audio).lower()
         except:
             return ""
 
-def dependency_parse(command):
-    """Use spaCy to extract numerical parameters from the command."""
-    doc = nlp(command)
-    numbers = [int(token.text) for token in doc if token.like_num]
-    return {"numbers": numbers, "doc": doc}
-
 def classify_intent(command):
-    """Use RoBERTa zero-shot classification to determine intent."""
+    """Use the shared zero-shot classifier to determine intent."""
+    classifier = _get_model("classifier")
+    if classifier is None:
+        return None, 0
     result = classifier(command, CANDIDATE_INTENTS)
     return result['labels'][0], result['scores'][0]
 
 def execute_command(command):
     """Execute the command based on the user's intent."""
-    dep_info = dependency_parse(command)
     intent, score = classify_intent(command)
 
     if score < 0.3:
         speak("I'm not sure what you mean.")
         return
 
-    INTENT_FUNCTIONS = {
-        "open browser": open_browser,
-        "search web": lambda: search_web(command.replace("search", "").strip()),
-        "play music": lambda: play_music(command.replace("play", "").strip()),
-        "monitor system": monitor_system,
-        "control brightness": lambda: control_brightness(dep_info["numbers"][0] if dep_info["numbers"] else 50),
-        "restart wifi": restart_wifi,
-        "shutdown": lambda: control_system("shutdown"),
-        "maximize window": maximize_window,
-        "minimize window": minimize_window,
-        "open calculator": open_calculator,
-        "open settings": open_settings,
-        "take screenshot": take_screenshot,
-        "increase volume": increase_volume,
-        "decrease volume": decrease_volume,
-        "mute volume": mute_volume,
-        "unmute volume": unmute_volume
-    }
-
-    if intent in INTENT_FUNCTIONS:
-        INTENT_FUNCTIONS[intent]()
-    else:
+    if not handlers.dispatch(intent, command):
         speak("Command not supported.")
 
 def command_listener():
     """Listen and process commands."""
+    warm_up()
+    missing = handlers.missing(CANDIDATE_INTENTS)
+    if missing:
+        print(f"No handler for intents: {', '.join(missing)}")
     speak("Hello! How can I assist you?")
     while True:
         command = listen()
@@ -99,17 +116,20 @@ def command_listener():
             execute_command(command)
 
 # Individual Command Functions
+@handlers.handler("open browser")
 def open_browser():
     """Open a browser."""
     webbrowser.open("https://www.google.com")
     speak("Opening the browser.")
 
-def search_web(query):
+@handlers.handler("search web", slots=("query",))
+def search_web(query=""):
     """Search the web with a query."""
     webbrowser.open(f"https://www.google.com/search?q={query}")
     speak(f"Searching for {query}.")
 
-def play_music(song):
+@handlers.handler("play music", slots=("song",))
+def play_music(song=""):
     """Play music on YouTube."""
     try:
         import pywhatkit
@@ -118,17 +138,20 @@ def play_music(song):
     except ImportError:
         speak("Sorry, the required module to play music is not installed.")
 
+@handlers.handler("monitor system")
 def monitor_system():
     """Monitor the system's health."""
     cpu = psutil.cpu_percent(interval=1)
     ram = psutil.virtual_memory().percent
     speak(f"System health: CPU usage is at {cpu}% and RAM usage is at {ram}%.")
 
-def control_brightness(level):
+@handlers.handler("control brightness", slots=("percentage",))
+def control_brightness(percentage=50):
     """Control screen brightness."""
-    speak(f"Setting brightness to {level} percent.")
+    speak(f"Setting brightness to {percentage} percent.")
     # This requires specific OS-dependent implementations.
 
+@handlers.handler("restart wifi")
 def restart_wifi():
     """Restart WiFi connection."""
     speak("Restarting WiFi.")
@@ -136,6 +159,7 @@ def restart_wifi():
     os.system("netsh interface set interface name='Wi-Fi' admin=enable")
     speak("WiFi restarted.")
 
+@handlers.handler("shutdown", action="shutdown")
 def control_system(action):
     """Control the system (shutdown, restart, etc.)."""
     if action == "shutdown":
@@ -145,6 +169,7 @@ def control_system(action):
         speak("Restarting the system.")
         os.system("shutdown /r /t 1")
 
+@handlers.handler("maximize window")
 def maximize_window():
     """Maximize the active window."""
     try:
@@ -158,6 +183,7 @@ def maximize_window():
         print(e)
         speak("Unable to maximize the window.")
 
+@handlers.handler("minimize window")
 def minimize_window():
     """Minimize the active window."""
     try:
@@ -171,6 +197,7 @@ def minimize_window():
         print(e)
         speak("Unable to minimize the window.")
 
+@handlers.handler("open calculator")
 def open_calculator():
     """Open the calculator."""
     try:
@@ -183,6 +210,7 @@ def open_calculator():
         print(e)
         speak("Failed to open calculator.")
 
+@handlers.handler("open settings")
 def open_settings():
     """Open the system settings."""
     try:
@@ -195,6 +223,7 @@ def open_settings():
         print(e)
         speak("Failed to open settings.")
 
+@handlers.handler("take screenshot")
 def take_screenshot():
     """Take a screenshot."""
     try:
@@ -208,49 +237,53 @@ def take_screenshot():
 
 def set_volume(level):
     """Set volume to a specific level (0-100)."""
-    sessions = AudioUtilities.GetAllSessions()
+    sessions = pycaw.AudioUtilities.GetAllSessions()
     for session in sessions:
         if session.Process and session.Process.name() == "System":
-            volume = session._ctl.QueryInterface(ISimpleAudioVolume)
+            volume = session._ctl.QueryInterface(pycaw.ISimpleAudioVolume)
             volume.SetMasterVolume(level / 100.0, None)
     speak(f"Volume set to {level} percent.")
 
+@handlers.handler("increase volume")
 def increase_volume():
     """Increase system volume by 10%."""
-    sessions = AudioUtilities.GetAllSessions()
+    sessions = pycaw.AudioUtilities.GetAllSessions()
     for session in sessions:
         if session.Process and session.Process.name() == "System":
-            volume = session._ctl.QueryInterface(ISimpleAudioVolume)
+            volume = session._ctl.QueryInterface(pycaw.ISimpleAudioVolume)
             current_volume = volume.GetMasterVolume() * 100
             new_volume = min(100, current_volume + 10)
             volume.SetMasterVolume(new_volume / 100.0, None)
     speak("Volume increased.")
 
+@handlers.handler("decrease volume")
 def decrease_volume():
     """Decrease system volume by 10%."""
-    sessions = AudioUtilities.GetAllSessions()
+    sessions = pycaw.AudioUtilities.GetAllSessions()
     for session in sessions:
         if session.Process and session.Process.name() == "System":
-            volume = session._ctl.QueryInterface(ISimpleAudioVolume)
+            volume = session._ctl.QueryInterface(pycaw.ISimpleAudioVolume)
             current_volume = volume.GetMasterVolume() * 100
             new_volume = max(0, current_volume - 10)
             volume.SetMasterVolume(new_volume / 100.0, None)
     speak("Volume decreased.")
 
+@handlers.handler("mute volume")
 def mute_volume():
     """Mute the system volume."""
-    sessions = AudioUtilities.GetAllSessions()
+    sessions = pycaw.AudioUtilities.GetAllSessions()
     for session in sessions:
         if session.Process and session.Process.name() == "System":
-            volume = session._ctl.QueryInterface(ISimpleAudioVolume)
+            volume = session._ctl.QueryInterface(pycaw.ISimpleAudioVolume)
             volume.SetMasterVolume(0, None)
     speak("System volume muted.")
 
+@handlers.handler("unmute volume")
 def unmute_volume():
     """Unmute the system volume (set to 50%)."""
-    sessions = AudioUtilities.GetAllSessions()
+    sessions = pycaw.AudioUtilities.GetAllSessions()
     for session in sessions:
         if session.Process and session.Process.name() == "System":
-            volume = session._ctl.QueryInterface(ISimpleAudioVolume)
+            volume = session._ctl.QueryInterface(pycaw.ISimpleAudioVolume)
             volume.SetMasterVolume(0.5, None)
     speak("System volume unmuted.")
\ No newline at end of file
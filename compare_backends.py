@@ -0,0 +1,94 @@
+# compare_backends.py - Latency, memory and accuracy drift of the classifier backends
+
+import statistics
+import sys
+import time
+
+from benchmark_utils import peak_rss_mb, percentile, run_worker
+
+# Fixed utterances that miss the keyword matcher, so every one goes through the model
+UTTERANCES = [
+    "could you make the sound a bit louder",
+    "it's too loud turn it down",
+    "what's the weather like outside",
+    "i need to write something down",
+    "show me what's in this folder",
+    "how much charge is left on my laptop",
+    "put the computer to sleep",
+    "make a new directory for my project",
+    "crack me up with something funny",
+    "what is today",
+    "skip this song",
+    "go back to the last song",
+    "grab an image of my screen",
+    "how full is my hard drive",
+    "fire up the spreadsheet program",
+    "start capturing the screen",
+    "remind me to call mom",
+    "i want to check my inbox",
+    "what's my network address",
+    "start a countdown for ten minutes"
+]
+
+
+def _run_backend(backend, results):
+    """Load the zero-shot pipeline on one backend and time it on UTTERANCES, predictions kept for drift"""
+    from config import CANDIDATE_INTENTS
+    from inference_backends import load_zero_shot_pipeline
+
+    try:
+        start = time.perf_counter()
+        classifier = load_zero_shot_pipeline(backend=backend)
+        load_time = time.perf_counter() - start
+
+        classifier(UTTERANCES[0], CANDIDATE_INTENTS)  # Warm-up pass
+        latencies, predictions = [], []
+        for utterance in UTTERANCES:
+            start = time.perf_counter()
+            result = classifier(utterance, CANDIDATE_INTENTS)
+            latencies.append(time.perf_counter() - start)
+            predictions.append((result['labels'][0], result['scores'][0]))
+
+        results.put({
+            "backend": backend,
+            "load_time": load_time,
+            "latencies": latencies,
+            "predictions": predictions,
+            "peak_rss_mb": peak_rss_mb()
+        })
+    except Exception as e:
+        results.put({"backend": backend, "error": str(e)})
+
+
+def compare(backends=("fp32", "int8", "onnx")):
+    reports = []
+    for backend in backends:
+        try:
+            reports.append(run_worker(_run_backend, (backend,)))
+        except RuntimeError as e:
+            reports.append({"backend": backend, "error": str(e)})
+
+    reference = next((r for r in reports if r["backend"] == "fp32" and "error" not in r), None)
+
+    print(f"{'backend':<8} {'load (s)':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} "
+          f"{'peak RSS (MB)':>14} {'top-1 agree':>12} {'score drift':>12}")
+    for report in reports:
+        if "error" in report:
+            print(f"{report['backend']:<8} failed: {report['error']}")
+            continue
+
+        latencies = [latency * 1000 for latency in report["latencies"]]
+        agreement, drift = "-", "-"
+        if reference:
+            pairs = list(zip(reference["predictions"], report["predictions"]))
+            agreement = f"{sum(ref[0] == ours[0] for ref, ours in pairs) / len(pairs):.0%}"
+            drift = f"{statistics.mean(abs(ref[1] - ours[1]) for ref, ours in pairs):.4f}"
+
+        print(f"{report['backend']:<8} {report['load_time']:>9.2f} "
+              f"{statistics.median(latencies):>9.1f} {percentile(latencies, 0.95):>9.1f} "
+              f"{report['peak_rss_mb']:>14.0f} {agreement:>12} {drift:>12}")
+    return reports
+
+
+if __name__ == "__main__":
+    compare(tuple(sys.argv[1:]) or ("fp32", "int8", "onnx"))
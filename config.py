@@ -1,6 +1,7 @@
 # config.py - Complete configuration
 
 # System commands
+import json
 import os
 
 
@@ -32,13 +33,14 @@ APP_PATHS = {
 }
 
 # Special folders
+HOME_DIR = os.environ.get('USERPROFILE') or os.path.expanduser('~')
 SPECIAL_FOLDERS = {
-    "documents": os.path.join(os.environ['USERPROFILE'], 'Documents'),
-    "downloads": os.path.join(os.environ['USERPROFILE'], 'Downloads'),
-    "pictures": os.path.join(os.environ['USERPROFILE'], 'Pictures'),
-    "music": os.path.join(os.environ['USERPROFILE'], 'Music'),
-    "videos": os.path.join(os.environ['USERPROFILE'], 'Videos'),
-    "desktop": os.path.join(os.environ['USERPROFILE'], 'Desktop')
+    "documents": os.path.join(HOME_DIR, 'Documents'),
+    "downloads": os.path.join(HOME_DIR, 'Downloads'),
+    "pictures": os.path.join(HOME_DIR, 'Pictures'),
+    "music": os.path.join(HOME_DIR, 'Music'),
+    "videos": os.path.join(HOME_DIR, 'Videos'),
+    "desktop": os.path.join(HOME_DIR, 'Desktop')
 }
 
 # Website URLs
@@ -103,6 +105,257 @@ CANDIDATE_INTENTS = [
     "enable gestures", "disable gestures", "gesture help"
 ]
 
+# Extra phrases for the keyword matcher, alias -> intent
+INTENT_ALIASES = {
+    "what time is it": "current time",
+    "what's the time": "current time",
+    "what's the date": "current date",
+    "what day is it": "current date",
+    "volume up": "increase volume",
+    "volume down": "decrease volume",
+    "tell me a joke": "tell joke",
+    "take a screenshot": "take screenshot",
+    "my ip": "ip address"
+}
+
+# Extra words describing each intent for the lexical prefilter, intent -> synonyms. Written
+# without looking at intent_corpus.json, so the benchmark measures recall, not memorization
+INTENT_SYNONYMS = {
+    "shutdown": ["power down", "power off", "switch off computer"],
+    "restart": ["reboot", "restart computer", "boot again"],
+    "sleep": ["standby", "suspend"],
+    "lock": ["lock screen", "lock workstation"],
+    "logout": ["log out", "sign out", "log off"],
+    "hibernate": ["hibernate computer", "deep sleep"],
+    "system info": ["computer specs", "specifications", "operating system", "machine details"],
+    "battery status": ["battery level", "charging", "power left", "battery percentage"],
+    "disk usage": ["disk space", "storage", "free space", "drive capacity"],
+    "system diagnostics": ["diagnose", "troubleshoot", "scan for problems"],
+    "open calculator": ["calculate", "arithmetic", "calculator app"],
+    "open notepad": ["text editor", "plain text", "notepad app"],
+    "open command prompt": ["cmd", "shell", "console", "command line"],
+    "open task manager": ["running programs", "kill a process", "cpu usage"],
+    "open paint": ["drawing", "sketch", "paint program"],
+    "open word": ["document editor", "word processor", "write a letter"],
+    "open excel": ["microsoft excel", "spreadsheets", "worksheet"],
+    "open powerpoint": ["slides", "slideshow", "presentation"],
+    "open outlook": ["outlook app", "email client", "outlook mail"],
+    "open settings": ["configuration", "system settings", "options"],
+    "open control panel": ["classic settings", "system configuration"],
+    "open file explorer": ["file manager", "explore files", "browse folders"],
+    "open photos": ["images", "photo viewer", "my pictures app"],
+    "open camera": ["camera app", "take a photo", "selfie"],
+    "open calendar": ["agenda", "calendar app", "planner"],
+    "open mail": ["email", "mail app", "messages inbox"],
+    "open documents": ["my documents", "documents directory"],
+    "open downloads": ["downloaded files", "downloads directory"],
+    "open pictures": ["my pictures", "pictures directory"],
+    "open music": ["my music", "music directory"],
+    "open videos": ["my videos", "videos directory"],
+    "open desktop": ["desktop files", "desktop directory"],
+    "open youtube": ["video site", "youtube app"],
+    "open google": ["google search page", "google website"],
+    "open gmail": ["gmail inbox", "gmail account"],
+    "open facebook": ["facebook timeline", "facebook friends"],
+    "open twitter": ["tweets", "x app", "twitter timeline"],
+    "open instagram": ["instagram app", "instagram stories"],
+    "open whatsapp": ["whatsapp messages", "whatsapp chats"],
+    "open linkedin": ["professional network", "linkedin jobs"],
+    "open wikipedia": ["wikipedia article", "reference site"],
+    "open amazon": ["online store", "buy online", "amazon orders"],
+    "open netflix": ["series", "films", "streaming shows"],
+    "open spotify": ["spotify app", "spotify playlists"],
+    "open github": ["source code", "git hosting", "pull requests"],
+    "open stackoverflow": ["stackoverflow site", "programming questions"],
+    "search web": ["search online", "google it", "search the internet"],
+    "search youtube": ["video search", "youtube search"],
+    "play music": ["playback", "resume", "play a playlist"],
+    "pause music": ["halt playback", "hold", "pause playback"],
+    "next track": ["following track", "next song"],
+    "previous track": ["previous song", "prior track"],
+    "increase volume": ["turn up", "raise sound", "volume higher"],
+    "decrease volume": ["quieter", "softer", "volume lower"],
+    "mute volume": ["silent", "no sound", "mute audio"],
+    "unmute volume": ["restore sound", "audio on"],
+    "set volume to": ["volume level", "percent volume"],
+    "take screenshot": ["screen capture image", "snapshot", "screen grab"],
+    "record screen": ["screen video", "screencast"],
+    "start recording": ["begin capture", "begin recording"],
+    "stop recording": ["finish recording", "end recording"],
+    "list files": ["folder contents", "show files", "directory listing"],
+    "create folder": ["make folder", "make directory", "add a folder"],
+    "delete file": ["erase", "trash", "remove file"],
+    "copy file": ["make a copy", "clone file"],
+    "move file": ["relocate", "transfer file"],
+    "rename file": ["change file name", "retitle"],
+    "open file": ["load a file", "launch file"],
+    "show file info": ["file size", "file details", "file properties"],
+    "current time": ["clock", "hour", "time now"],
+    "current date": ["what day", "calendar date", "day of the month"],
+    "set alarm": ["alarm clock", "morning alarm"],
+    "set timer": ["minutes timer", "stopwatch"],
+    "check calendar": ["appointments", "events today", "my agenda"],
+    "create reminder": ["don't let me forget", "reminder note"],
+    "check weather": ["forecast", "temperature", "rain"],
+    "check news": ["news today", "current events", "news stories"],
+    "create note": ["write down", "take a note", "memo"],
+    "tell joke": ["make me laugh", "something humorous", "pun"],
+    "ip address": ["my ip", "ip number", "local address"],
+    "what can you do": ["abilities", "capabilities", "skills"],
+    "help": ["commands list", "how to use", "instructions"],
+    "thank you": ["appreciate", "cheers", "grateful"],
+    "who are you": ["your name", "identify yourself"],
+    "who made you": ["developer", "built you", "made by"],
+    "how are you": ["how do you feel", "are you okay"],
+    "enable gestures": ["turn on gestures", "hand control on"],
+    "disable gestures": ["turn off gestures", "hand control off"],
+    "gesture help": ["which gestures", "hand movements"]
+}
+
+# Intent routing
+# "zero-shot" sends every non-keyword command to the NLI pipeline,
+# "embedding" routes with a bi-encoder first and only falls back to NLI
+# when the top two labels are closer than ROUTER_MARGIN_THRESHOLD or the best label's
+# cosine similarity is at or below ROUTER_MIN_SIMILARITY
+ROUTER_MODE = "embedding"
+ZERO_SHOT_MODEL = "facebook/bart-large-mnli"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Zero-shot inference backend: "fp32" (PyTorch), "int8" (dynamic quantization)
+# or "onnx" (ONNX Runtime); exported ONNX graphs are cached under BACKEND_CACHE_DIR
+CLASSIFIER_BACKEND = "fp32"
+ROUTER_MARGIN_THRESHOLD = 0.05
+ROUTER_MIN_SIMILARITY = 0.35
+# Minimum confidence before a classified intent is executed
+INTENT_CONFIDENCE_THRESHOLD = 0.5
+# Lexical prefilter: only the top PREFILTER_TOP_K labels go to the NLI model,
+# the full list is used when the best label scores below PREFILTER_MIN_SCORE.
+# Off by default: at a min score of 0.15 it kept the right intent for only 76% of
+# intent_corpus_heldout.json. 0.35 keeps 98.9% but still sends the full list for 46% of
+# those utterances, and it was picked by looking at that set, so check recall on new
+# utterances ("python benchmark_intents.py --corpus ...", prefilter_stats) before enabling
+PREFILTER_ENABLED = False
+PREFILTER_TOP_K = 10
+PREFILTER_MIN_SCORE = 0.35
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+EMBEDDING_CACHE_DIR = os.path.join(CACHE_DIR, "embeddings")
+BACKEND_CACHE_DIR = os.path.join(CACHE_DIR, "backends")
+# Seconds a model-path command waits for background warm-up before giving up
+CLASSIFIER_WAIT_TIMEOUT = 10
+# Longest a benchmark worker process may run before it is killed and reported as failed
+BENCHMARK_WORKER_TIMEOUT = 1800
+# Seconds "import app" may take before import_profile.py reports a regression
+STARTUP_IMPORT_BUDGET = 2.0
+
+# Intent cache, keyed on utterances with case, punctuation and these words removed
+FILLER_WORDS = {"um", "uh", "er", "hmm", "please", "hey", "jarvis", "okay", "ok", "kindly"}
+INTENT_CACHE_PATH = os.path.join(CACHE_DIR, "intent_cache.json")
+INTENT_CACHE_SIZE = 512
+INTENT_CACHE_SAVE_EVERY = 10
+
+# Text-to-speech voice
+VOICE_INDEX = 1  # Change index for different voices
+VOICE_RATE = 160
+VOICE_VOLUME = 1.0
+SPEECH_COALESCE_WINDOW = 0.05  # Seconds to wait for more messages to merge into one synthesis
+# Pre-rendered responses, filled by "python phrase_cache.py --warmup" and by phrases said twice
+PHRASE_CACHE_ENABLED = True
+PHRASE_CACHE_DIR = os.path.join(CACHE_DIR, "phrases")
+PHRASE_CACHE_MAX_MB = 50
+PHRASE_CACHE_MAX_CHARS = 200  # Longer text is always synthesized live
+
+# Microphone stream: kept open for the session, background noise is tracked continuously
+MIC_SAMPLE_RATE = 16000
+MIC_CHUNK_SIZE = 1024
+MIC_BUFFER_SECONDS = 10  # Ring buffer length
+MIC_PRE_ROLL = 0.3  # Seconds of audio kept before the detected speech onset
+MIC_PAUSE_THRESHOLD = 0.8  # Seconds of silence that end a phrase
+MIC_ENERGY_THRESHOLD = 300  # Starting point, adapted from background noise
+MIC_CALIBRATION_SECONDS = 1.0  # Background noise sampled when the stream opens
+MIC_DYNAMIC_ENERGY_RATIO = 1.5
+MIC_DYNAMIC_ENERGY_DAMPING = 0.15
+MIC_PHRASE_TIME_LIMIT = 15  # Seconds, ends a phrase even if the room never gets quiet enough
+# With "barge_in" enabled, sustained audio this many times louder than the noise threshold stops
+# the assistant mid-sentence. Raise it if the assistant's own voice from the speakers cuts it off
+MIC_BARGE_IN_RATIO = 3.0
+MIC_BARGE_IN_SECONDS = 0.3
+
+# Wake word: enrolled with "python wake_word.py --enroll 5", run() is ungated until then
+WAKE_WORD_TEMPLATE_PATH = os.path.join(CACHE_DIR, "wake_word.npz")
+WAKE_WORD_SAMPLE_RATE = 16000
+WAKE_WORD_SEARCH_SECONDS = 1.5  # Only the start of each phrase is searched for the wake word
+WAKE_WORD_MIN_COMMAND_SECONDS = 0.4  # Shorter remainders mean the wake word was said on its own
+
+# User settings file, see load_user_config()
+USER_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jarvis_config.json")
+# Speech recognition: "source" is "microphone" or "replay" (WAV files from replay_directory),
+# "backend" is one of speech_backends.BACKENDS
+DEFAULT_SPEECH_SETTINGS = {
+    "source": "microphone",
+    "backend": "google",
+    "language": "en-US",
+    "whisper_model": "base",
+    "vosk_model_path": "models/vosk-model-small-en-us-0.15",
+    "replay_directory": "recordings",
+    "streaming": False,  # Partial transcripts while the user speaks, vosk backend only
+    # Talking over the assistant cuts it off. Off by default: without echo cancellation
+    # (a headset, or a speakerphone that cancels its own output) replies interrupt themselves
+    "barge_in": False
+}
+
+DEFAULT_PREFERENCES = {
+    "wake_word": "jarvis",
+    "wake_word_sensitivity": 0.5  # 0 to 1, higher accepts more readily
+}
+
+
+def load_user_config(path=USER_CONFIG_PATH):
+    """Read jarvis_config.json, missing speech settings fall back to the defaults"""
+    config = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Config load error: {e}")
+    config["speech"] = {**DEFAULT_SPEECH_SETTINGS, **config.get("speech", {})}
+    config["preferences"] = {**DEFAULT_PREFERENCES, **config.get("preferences", {})}
+    return config
+
+# Partial transcripts: a partial nobody recognizes cheaply is classified in the background
+# once it has come back unchanged this many times
+SPECULATION_STABLE_PARTIALS = 2
+
+# Main loop: "async" overlaps the stages in async_runtime.py, "serial" handles one command at a time
+RUNTIME_MODE = "async"
+STAGE_QUEUE_SIZE = 4  # Bounded queue between consecutive stages
+CAPTURE_POLL_SECONDS = 1.0  # Longest the capture stage holds the microphone while nobody speaks
+RUNTIME_STATS_INTERVAL = 0  # Seconds between stage reports while running, 0 turns them off
+
+# Gesture camera: a webcam index, a video file path, or "synthetic" for a generated test pattern
+GESTURE_CAMERA_SOURCE = 0
+GESTURE_FRAME_WIDTH = 640
+GESTURE_FRAME_HEIGHT = 480
+GESTURE_CAMERA_FPS = 30
+# Hand tracking rate per situation, see inference_scheduler.py
+GESTURE_ACTIVE_FPS = 30  # Hand moving, or possibly entering the frame
+GESTURE_STILL_FPS = 15  # Hand visible but held still
+GESTURE_IDLE_FPS = 4  # No hand seen for GESTURE_IDLE_AFTER_FRAMES inferences and no motion
+GESTURE_IDLE_AFTER_FRAMES = 15
+GESTURE_MOTION_THRESHOLD = 4.0  # Mean grayscale difference between frames, 0 to 255
+GESTURE_LATENCY_BUDGET = 0.1  # Seconds from a hand movement to its detection
+GESTURE_CPU_BUDGET = 0.5  # Share of one core hand tracking may use
+# Gesture display: "window" draws every frame, "preview" shows every Nth frame scaled down on
+# its own thread, "headless" shows nothing and stops only when gesture control is turned off
+GESTURE_DISPLAY = "window"
+GESTURE_PREVIEW_EVERY = 3
+GESTURE_PREVIEW_SCALE = 0.5
+GESTURE_TRACE_PATH = None  # .npz file that records the landmarks of every frame, see gesture_trace.py
+# Gesture events, see gesture_events.py
+GESTURE_EVENT_QUEUE_SIZE = 64
+GESTURE_DEBOUNCE_SECONDS = 1.0  # A repeated thumbs up/down within this window is ignored
+GESTURE_VOLUME_INTERVAL = 0.2  # Palm height is applied to the volume at most this often
+
 # Default gesture state
 DEFAULT_GESTURE_STATE = {
     "active": False,
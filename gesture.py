@@ -1,356 +1,362 @@
-import cv2
-import mediapipe as mp
-import pyautogui
-import numpy as np
 import time
 import math
+from lazy_import import lazy_import
+from camera_capture import CameraCapture, open_camera
+from inference_scheduler import InferenceScheduler
+from landmark_features import HandFeatures, WRIST, THUMB_TIP, THUMB_IP, THUMB_MCP, INDEX_TIP
+from gesture_preview import GesturePreview, render
+from config import GESTURE_DISPLAY, GESTURE_PREVIEW_EVERY, GESTURE_PREVIEW_SCALE, GESTURE_TRACE_PATH
 
-# Declare mouse tracking variables as global here (to avoid the nonlocal SyntaxError)
-prev_mouse_x, prev_mouse_y = None, None
-smooth_mouse_x, smooth_mouse_y = None, None
-mouse_sensitivity = 2.0 # Can also be global if it's truly a constant
+# Imported by the gesture thread on first use instead of at assistant startup
+cv2 = lazy_import("cv2")
+mp = lazy_import("mediapipe")
+pyautogui = lazy_import("pyautogui")
 
-def gesture_recognition(gesture_state):
-    """Enhanced gesture recognition with scrolling, thumbs up/down, swipe left/right, and volume control."""
-    mp_hands = mp.solutions.hands
-    mp_drawing = mp.solutions.drawing_utils
 
-    # Configure camera
-    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-    cap.set(cv2.CAP_PROP_FPS, 30)   # Optimal balance between smoothness and performance
+class PyAutoGuiActuator:
+    """Sends the keyboard, scroll and mouse actions of detected gestures to the desktop"""
 
-    # Initialize gesture state (already done in main, but ensures local state for the thread)
-    gesture_state["active"] = True
+    def press(self, key):
+        pyautogui.press(key)
+
+    def scroll(self, amount):
+        pyautogui.scroll(amount)
+
+    def move_to(self, x, y):
+        pyautogui.moveTo(x, y)
+
+    def screen_size(self):
+        return pyautogui.size()
+
+
+class GestureProcessor:
+    """Thumbs, swipe, scroll, volume and mouse logic for one stream of frames.
+
+    process() takes the time of the frame instead of reading the clock and
+    sends every action through the actuator, so recorded landmark traces
+    replay through exactly the same logic as the live camera (see
+    gesture_trace.py). Gestures meant for the assistant are published to
+    the events bus as soon as they are detected.
+    """
 
     # Scroll control parameters
-    scroll_active = False
-    base_angle = None # Reference angle when scrolling starts
     angle_threshold = 5  # Degrees - Smaller to make it more sensitive
     scroll_sensitivity = 100 # Increased sensitivity for faster scrolling (adjust as needed, was 20)
-    last_scroll_time = time.time()
     scroll_cooldown = 0.2 # Faster response, allows more frequent scrolls (was 0.03)
-    last_valid_angle = None # To prevent errors from invalid angle calculations
-    scroll_buffer = 0    # Accumulates small scroll amounts for smoother increments
     smoothing_factor = 0.2 # Reduced smoothing for slightly quicker reaction (was 0.3)
 
     # Swipe control parameters
     swipe_threshold = 0.015 # Normalized distance to trigger swipe (was 0.05). Adjust this based on screen width
-    last_hand_x = None
-    last_swipe_time = time.time()
     swipe_cooldown = 0.2  # Prevents duplicate swipes
 
     # Gesture detection parameters
     gesture_cooldown = 0.7 # Time between gesture detections (e.g., thumbs up) (was 1.0)
-    last_gesture_time = time.time()
 
-    def calculate_angle(vec1, vec2):
+    def __init__(self, gesture_state, actuator=None, events=None):
+        self.gesture_state = gesture_state
+        self.actuator = actuator or PyAutoGuiActuator()
+        self.events = events
+
+        self.scroll_active = False
+        self.base_angle = None # Reference angle when scrolling starts
+        # Cooldown timers start at the first processed frame, the same for the camera and a replayed trace
+        self.last_scroll_time = None
+        self.last_valid_angle = None # To prevent errors from invalid angle calculations
+        self.scroll_buffer = 0    # Accumulates small scroll amounts for smoother increments
+
+        self.last_hand_x = None
+        self.last_swipe_time = None
+        self.last_gesture_time = None
+
+        # Mouse tracking, reset whenever the palm closes
+        self.smooth_mouse_x, self.smooth_mouse_y = None, None
+
+        # Visual feedback of the last frame
+        self.labels = []
+        self.volume_bar = None
+
+    def calculate_angle(self, dot_product, norm_product):
         """Optimized angle calculation with safety checks."""
-        nonlocal last_valid_angle
         try:
-            dot_product = np.dot(vec1, vec2)
-            norm_product = np.linalg.norm(vec1) * np.linalg.norm(vec2)
-
             if norm_product < 0.001:  # Prevent division by near-zero
-                return last_valid_angle or 0
+                return self.last_valid_angle or 0
 
             # Clamp cos_angle to ensure it's within valid range for acos
             cos_angle = max(-1.0, min(1.0, dot_product / norm_product))
             angle = math.degrees(math.acos(cos_angle))
-            last_valid_angle = angle
+            self.last_valid_angle = angle
             return angle
         except Exception: # Catch any other potential math errors
-            return last_valid_angle or 0
+            return self.last_valid_angle or 0
 
-    def detect_thumbs_gesture(hand_landmarks):
+    def detect_thumbs_gesture(self, features):
         """Detect thumbs up or thumbs down gesture."""
-        thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-        thumb_ip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_IP] # Intermediate Phalange
-        thumb_mcp = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_MCP] # Metacarpophalangeal
+        y = features.y
+        thumb_tip_y = y[THUMB_TIP]
 
         # Check if thumb is significantly extended (tip further from base than IP)
         # and generally pointing upwards or downwards relative to the MCP
-        thumb_extended_vertically = thumb_tip.y < thumb_ip.y and thumb_tip.y < thumb_mcp.y
-
-        # Check if other fingers are curled (tips are below their PIPs/MCPs)
-        fingers_curled = True
-        finger_check_points = [
-            (mp_hands.HandLandmark.INDEX_FINGER_TIP, mp_hands.HandLandmark.INDEX_FINGER_PIP),
-            (mp_hands.HandLandmark.MIDDLE_FINGER_TIP, mp_hands.HandLandmark.MIDDLE_FINGER_PIP),
-            (mp_hands.HandLandmark.RING_FINGER_TIP, mp_hands.HandLandmark.RING_FINGER_PIP),
-            (mp_hands.HandLandmark.PINKY_TIP, mp_hands.HandLandmark.PINKY_PIP)
-        ]
-        for tip, pip in finger_check_points:
-            # Check if tip is significantly below PIP (meaning curled)
-            if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[pip].y - 0.02: # Added small buffer
-                fingers_curled = False
-                break
-        
-        # Additional check: thumb tip x relative to thumb MCP x for horizontal extension (avoids false positives)
-        thumb_extended_horizontally = abs(thumb_tip.x - thumb_mcp.x) > 0.05 # Adjust threshold as needed
+        thumb_extended_vertically = thumb_tip_y < y[THUMB_IP] and thumb_tip_y < y[THUMB_MCP]
+
+        # Other fingers must be curled (no tip more than 0.02 above its PIP), and the thumb tip
+        # must stick out sideways from its MCP (avoids false positives)
+        thumb_extended_horizontally = features.thumb_spread > 0.05 # Adjust threshold as needed
 
-        if thumb_extended_vertically and fingers_curled and thumb_extended_horizontally:
-            wrist_y = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST].y
+        if thumb_extended_vertically and features.fingers_curled and thumb_extended_horizontally:
+            wrist_y = y[WRIST]
             # Thumbs up: thumb tip significantly above wrist, and not too far left/right of palm
-            if thumb_tip.y < wrist_y - 0.15: # More aggressive threshold
+            if thumb_tip_y < wrist_y - 0.15: # More aggressive threshold
                 return "thumbs_up"
             # Thumbs down: thumb tip significantly below wrist
-            elif thumb_tip.y > wrist_y + 0.15: # More aggressive threshold
+            elif thumb_tip_y > wrist_y + 0.15: # More aggressive threshold
                 return "thumbs_down"
 
         return None
 
-
-    def detect_swipe(hand_landmarks, frame_width):
+    def detect_swipe(self, features, now):
         """Detect horizontal swipes."""
-        nonlocal last_hand_x, last_swipe_time
-        current_time = time.time()
-
         # Get the hand center position (e.g., wrist x-coordinate)
         # Using normalized coordinates for current_x
-        current_x = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST].x # Normalized x-coord
+        current_x = features.x[WRIST] # Normalized x-coord
 
-        if last_hand_x is not None and current_time - last_swipe_time > swipe_cooldown:
-            # Calculate delta_x in proportion to screen width for consistent sensitivity
+        if self.last_hand_x is not None and now - self.last_swipe_time > self.swipe_cooldown:
             # MediaPipe coords are 0 to 1, so `delta_x` is already normalized
-            delta_x = current_x - last_hand_x
+            delta_x = current_x - self.last_hand_x
 
             # Swipe threshold is now based on normalized coordinates (e.g., 7% of screen width)
-            if delta_x > swipe_threshold: # Moved significantly right
-                last_swipe_time = current_time
+            if delta_x > self.swipe_threshold: # Moved significantly right
+                self.last_swipe_time = now
                 return "swipe_right"
-            elif delta_x < -swipe_threshold: # Moved significantly left
-                last_swipe_time = current_time
+            elif delta_x < -self.swipe_threshold: # Moved significantly left
+                self.last_swipe_time = now
                 return "swipe_left"
 
-        last_hand_x = current_x
+        self.last_hand_x = current_x
         return None
 
-    def detect_open_palm(hand_landmarks):
+    def detect_open_palm(self, features):
         """Detect open palm gesture for volume control and potentially mouse control."""
-        fingers_open = 0
-        finger_tips = [
-            mp_hands.HandLandmark.THUMB_TIP,
-            mp_hands.HandLandmark.INDEX_FINGER_TIP,
-            mp_hands.HandLandmark.MIDDLE_FINGER_TIP,
-            mp_hands.HandLandmark.RING_FINGER_TIP,
-            mp_hands.HandLandmark.PINKY_TIP
-        ]
-        finger_pips = [
-            mp_hands.HandLandmark.THUMB_IP, # For thumb, check IP
-            mp_hands.HandLandmark.INDEX_FINGER_PIP,
-            mp_hands.HandLandmark.MIDDLE_FINGER_PIP,
-            mp_hands.HandLandmark.RING_FINGER_PIP,
-            mp_hands.HandLandmark.PINKY_PIP
-        ]
-        finger_mcps = [
-            mp_hands.HandLandmark.THUMB_MCP, # For thumb, check MCP
-            mp_hands.HandLandmark.INDEX_FINGER_MCP,
-            mp_hands.HandLandmark.MIDDLE_FINGER_MCP,
-            mp_hands.HandLandmark.RING_FINGER_MCP,
-            mp_hands.HandLandmark.PINKY_MCP
-        ]
-
-        # Check if fingers are generally straight and tips are above their PIPs/MCPs
-        for i, (tip_idx, pip_idx, mcp_idx) in enumerate(zip(finger_tips, finger_pips, finger_mcps)):
-            # For thumb, check tip relative to IP or MCP base (horizontal for extension)
-            if i == 0: # Thumb
-                # Check if thumb tip is sufficiently to the side of the MCP (extended outward)
-                if abs(hand_landmarks.landmark[tip_idx].x - hand_landmarks.landmark[mcp_idx].x) > 0.05:
-                    fingers_open += 1
-            else: # Other fingers
-                # Check if tip is significantly above PIP (meaning open/straight)
-                if hand_landmarks.landmark[tip_idx].y < hand_landmarks.landmark[pip_idx].y - 0.01: # Small buffer
-                    fingers_open += 1
-        
-        # Check distance between thumb tip and pinky tip to ensure palm is open and spread
-        thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-        pinky_tip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_TIP]
-        distance = math.sqrt((thumb_tip.x - pinky_tip.x)**2 + (thumb_tip.y - pinky_tip.y)**2)
-        
-        # A threshold for open palm distance (normalized coords)
-        is_palm_spread = distance > 0.15 # Adjust if needed
+        # Thumb counts as open when its tip is sufficiently to the side of the MCP (extended outward),
+        # the other fingers when their tip is more than 0.01 above the PIP
+        fingers_open = features.fingers_open + (features.thumb_spread > 0.05)
+
+        # Thumb tip to pinky tip distance ensures the palm is open and spread (normalized coords)
+        is_palm_spread = features.thumb_pinky_distance > 0.15 # Adjust if needed
 
         return fingers_open >= 4 and is_palm_spread
 
+    def process(self, hands, now, frame_width):
+        """Run every detector on one frame.
+
+        hands yields an updated HandFeatures per tracked hand, now is the
+        capture time of the frame. Returns the gesture left in
+        gesture_state["detected"].
+        """
+        gesture_state = self.gesture_state
+        if self.last_gesture_time is None:
+            self.last_scroll_time = self.last_swipe_time = self.last_gesture_time = now
+        # Reset detected gesture for this frame, unless it's continuous like volume/mouse
+        gesture_state["detected"] = None
+        # Visual feedback is collected here and only drawn if a window or preview shows it
+        self.labels = labels = []
+        self.volume_bar = None
+
+        for features in hands:
+            # Check for thumbs up/down gestures
+            if now - self.last_gesture_time > self.gesture_cooldown:
+                thumb_gesture = self.detect_thumbs_gesture(features)
+                if thumb_gesture:
+                    gesture_state["detected"] = thumb_gesture
+                    self.last_gesture_time = now
+                    if self.events:
+                        self.events.publish(thumb_gesture, now)
+                    labels.append((thumb_gesture.upper(), (10, 90), (255, 0, 0)))
+
+            # Check for swipe gestures
+            swipe_gesture = self.detect_swipe(features, now)
+            if swipe_gesture and now - self.last_gesture_time > self.swipe_cooldown:
+                gesture_state["detected"] = swipe_gesture
+                self.last_gesture_time = now
+                labels.append((swipe_gesture.upper(), (10, 120), (0, 0, 255)))
+
+                # Simulate arrow key press for swipe gestures
+                if swipe_gesture == "swipe_left":
+                    self.actuator.press('left')
+                elif swipe_gesture == "swipe_right":
+                    self.actuator.press('right')
+
+            # Check for scroll gesture (index finger): angle between the mcp->pip and pip->tip segments
+            angle = self.calculate_angle(features.index_dot, features.index_norm_product)
+
+            # Scrolling logic: Only activate if the index finger is relatively straight (angle < 25 degrees)
+            # and the middle finger is curled (to distinguish from open palm for mouse control/volume)
+            is_middle_finger_curled = features.middle_curled # Tip more than 0.03 below PIP
+
+            if angle is not None and angle < 25 and is_middle_finger_curled: # Reduced angle for more precise trigger
+                if self.base_angle is None:
+                    self.base_angle = angle # Initialize base angle when gesture starts
+
+                angle_diff = angle - self.base_angle
+
+                # Adjust scroll_buffer more directly with sensitivity
+                self.scroll_buffer += angle_diff * self.scroll_sensitivity * self.smoothing_factor
+
+                if now - self.last_scroll_time > self.scroll_cooldown:
+                    if abs(self.scroll_buffer) >= 1: # Only scroll when buffer accumulates enough
+                        scroll_amount = int(self.scroll_buffer)
+                        # Positive angle_diff (finger bending more) means scroll DOWN.
+                        # Negative angle_diff (finger straightening) means scroll UP.
+                        self.actuator.scroll(scroll_amount) # Removed '-' to make bending scroll down
+                        self.scroll_buffer -= scroll_amount # Deduct scrolled amount from buffer
+                        self.last_scroll_time = now
+                        self.scroll_active = True
+
+                # Gradually adjust base_angle to prevent drift and make it relative to current position
+                self.base_angle = self.base_angle * (1 - self.smoothing_factor) + angle * self.smoothing_factor
+
+            else: # If index finger is not straight or middle finger not curled, reset scrolling
+                self.scroll_active = False
+                self.base_angle = None # Reset base angle for new gesture
+                self.scroll_buffer = 0   # Reset buffer when not scrolling
+
+            # Check for volume control/mouse control gesture (open palm)
+            if self.detect_open_palm(features):
+                # If mouse control is active, override volume control for this gesture
+                if gesture_state["mouse_control"]:
+                    gesture_state["detected"] = "mouse_move"
+                    # Convert normalized coordinates to screen coordinates
+                    screen = self.actuator.screen_size()
+                    screen_x = int(features.x[INDEX_TIP] * screen.width)
+                    screen_y = int(features.y[INDEX_TIP] * screen.height)
+
+                    # Smooth mouse movement
+                    if self.smooth_mouse_x is None: # Check for initial state with None
+                        self.smooth_mouse_x, self.smooth_mouse_y = float(screen_x), float(screen_y) # Initialize as float
+                    else:
+                        self.smooth_mouse_x = self.smooth_mouse_x * (1 - self.smoothing_factor) + screen_x * self.smoothing_factor
+                        self.smooth_mouse_y = self.smooth_mouse_y * (1 - self.smoothing_factor) + screen_y * self.smoothing_factor
+
+                    self.actuator.move_to(self.smooth_mouse_x, self.smooth_mouse_y)
+                    labels.append(("MOUSE CONTROL", (10, 150), (255, 255, 0)))
+                else: # If mouse control is not active, use for volume
+                    # Get the palm height (y-coordinate) for volume level
+                    palm_y = features.y[WRIST]
+                    # Value will be between 0-1 (inverted because y increases downward)
+                    volume_level = 1 - (palm_y * 1.3)  # Scale for better range
+                    volume_level = max(0, min(1, volume_level))  # Clamp between 0-1
+
+                    # Store the detected volume level in the gesture state
+                    gesture_state["volume_level"] = volume_level
+                    gesture_state["detected"] = "volume_control" # Signal volume control
+                    if self.events:
+                        self.events.publish("volume_control", now, volume_level)
+
+                    # Visual feedback for volume control
+                    self.volume_bar = volume_level
+                    labels.append((f"VOL: {int(volume_level * 100)}%", (frame_width - 150, 30), (0, 255, 0)))
+            else: # If palm not open, reset mouse tracking for smoother re-engagement
+                self.smooth_mouse_x, self.smooth_mouse_y = None, None # Reset to None
+
+        return gesture_state["detected"]
+
+
+def gesture_recognition(gesture_state, trace_path=GESTURE_TRACE_PATH, events=None):
+    """Enhanced gesture recognition with scrolling, thumbs up/down, swipe left/right, and volume control.
+
+    With a trace_path, the landmarks of every processed frame are also
+    recorded there for gesture_trace.py to replay. Detected gestures are
+    published to events, a GestureEventBus, when one is given.
+    """
+    mp_hands = mp.solutions.hands
+
+    # Configure camera, frames are read on their own thread and only the newest one is kept
+    camera = CameraCapture(open_camera()).start()
+
+    # Initialize gesture state (already done in main, but ensures local state for the thread)
+    gesture_state["active"] = True
+
+    processor = GestureProcessor(gesture_state, events=events)
+    recorder = None
+    if trace_path:
+        from gesture_trace import TraceRecorder
+        recorder = TraceRecorder(trace_path)
+
     with mp_hands.Hands(
         max_num_hands=1,
         min_detection_confidence=0.7,
         min_tracking_confidence=0.7,
         static_image_mode=False
     ) as hands:
-        prev_time = time.time()
+        last_seq = -1
         results = None  # Initialize results here
-
-        # --- GLOBAL DECLARATIONS FOR MOUSE TRACKING ---
-        # These variables are now declared global at the module level.
-        # We need to tell this function that it will be *modifying* the global versions.
-        global prev_mouse_x, prev_mouse_y, smooth_mouse_x, smooth_mouse_y
-        global mouse_sensitivity # If you want to modify this globally later
+        scheduler = InferenceScheduler()
+        features = HandFeatures()
+        # Headless and preview modes never call waitKey here, so the loop runs at camera speed
+        preview = None
+        if GESTURE_DISPLAY == "preview":
+            preview = GesturePreview(gesture_state, GESTURE_PREVIEW_EVERY, GESTURE_PREVIEW_SCALE).start()
 
         while gesture_state["active"]:
-            current_time = time.time()
-            ret, frame = cap.read()
-            if not ret:
-                continue
-
-            # Skip some processing if we're running behind
-            if current_time - prev_time < 0.025:   # Aim for closer to 40fps (1/40 = 0.025)
+            # Waits for the next frame only if the newest one was already processed
+            latest = camera.latest(last_seq, timeout=0.5)
+            if latest is None:
                 continue
-            prev_time = current_time
+            last_seq = latest.seq
+            current_time = latest.timestamp
 
-            frame = cv2.flip(frame, 1)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            frame = cv2.flip(latest.image, 1)
 
-            # Process only every other frame to reduce load (this is fine)
-            if int(current_time * 10) % 2 == 0:
+            # Track hands at a rate matched to motion, hand presence and measured inference cost
+            if scheduler.should_run(current_time, frame):
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                start = time.perf_counter()
                 results = hands.process(rgb_frame)
+                scheduler.record(current_time, time.perf_counter() - start, bool(results.multi_hand_landmarks))
             # Else: keep using the previous results
 
-            # Reset detected gesture for this frame, unless it's continuous like volume/mouse
-            gesture_state["detected"] = None
-
-            # Check if we have any results to process
-            if results is not None and results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    # Draw hand landmarks for visual feedback
-                    mp_drawing.draw_landmarks(
-                        frame,
-                        hand_landmarks,
-                        mp_hands.HAND_CONNECTIONS,
-                        mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=4),
-                        mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2)
-                    )
-
-                    # Check for thumbs up/down gestures
-                    if current_time - last_gesture_time > gesture_cooldown:
-                        thumb_gesture = detect_thumbs_gesture(hand_landmarks)
-                        if thumb_gesture:
-                            gesture_state["detected"] = thumb_gesture
-                            last_gesture_time = current_time
-                            cv2.putText(frame, thumb_gesture.upper(), (10, 90),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
-
-                    # Check for swipe gestures
-                    swipe_gesture = detect_swipe(hand_landmarks, frame.shape[1])
-                    if swipe_gesture and current_time - last_gesture_time > swipe_cooldown:
-                        gesture_state["detected"] = swipe_gesture
-                        last_gesture_time = current_time
-                        cv2.putText(frame, swipe_gesture.upper(), (10, 120),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-
-                        # Simulate arrow key press for swipe gestures
-                        if swipe_gesture == "swipe_left":
-                            pyautogui.press('left')
-                        elif swipe_gesture == "swipe_right":
-                            pyautogui.press('right')
-
-                    # Check for scroll gesture (index finger)
-                    mcp = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_MCP]
-                    pip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_PIP]
-                    tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-
-                    # Calculate vectors and angle
-                    vec1 = np.array([pip.x - mcp.x, pip.y - mcp.y])
-                    vec2 = np.array([tip.x - pip.x, tip.y - pip.y])
-                    angle = calculate_angle(vec1, vec2)
-
-                    # Scrolling logic: Only activate if the index finger is relatively straight (angle < 25 degrees)
-                    # and the middle finger is curled (to distinguish from open palm for mouse control/volume)
-                    middle_tip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-                    middle_pip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_PIP]
-                    is_middle_finger_curled = middle_tip.y > middle_pip.y + 0.03 # Tip below PIP
-
-                    if angle is not None and angle < 25 and is_middle_finger_curled: # Reduced angle for more precise trigger
-                        if base_angle is None:
-                            base_angle = angle # Initialize base angle when gesture starts
-
-                        angle_diff = angle - base_angle
-
-                        # Adjust scroll_buffer more directly with sensitivity
-                        scroll_buffer += angle_diff * scroll_sensitivity * smoothing_factor
-
-                        current_time = time.time()
-                        if current_time - last_scroll_time > scroll_cooldown:
-                            if abs(scroll_buffer) >= 1: # Only scroll when buffer accumulates enough
-                                scroll_amount = int(scroll_buffer)
-                                # Positive angle_diff (finger bending more) means scroll DOWN.
-                                # Negative angle_diff (finger straightening) means scroll UP.
-                                pyautogui.scroll(scroll_amount) # Removed '-' to make bending scroll down
-                                scroll_buffer -= scroll_amount # Deduct scrolled amount from buffer
-                                last_scroll_time = current_time
-                                scroll_active = True
-                        
-                        # Gradually adjust base_angle to prevent drift and make it relative to current position
-                        base_angle = base_angle * (1 - smoothing_factor) + angle * smoothing_factor
-
-                    else: # If index finger is not straight or middle finger not curled, reset scrolling
-                        scroll_active = False
-                        base_angle = None # Reset base angle for new gesture
-                        scroll_buffer = 0   # Reset buffer when not scrolling
-
-                    # Check for volume control/mouse control gesture (open palm)
-                    if detect_open_palm(hand_landmarks):
-                        # If mouse control is active, override volume control for this gesture
-                        if gesture_state["mouse_control"]:
-                            # These variables are now global, so just assign to them directly
-                            # No 'nonlocal' needed within this block anymore for these variables
-                            gesture_state["detected"] = "mouse_move"
-                            index_finger_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                            # Convert normalized coordinates to screen coordinates
-                            screen_x = int(index_finger_tip.x * pyautogui.size().width)
-                            screen_y = int(index_finger_tip.y * pyautogui.size().height)
-
-                            # Smooth mouse movement
-                            if smooth_mouse_x is None: # Check for initial state with None
-                                smooth_mouse_x, smooth_mouse_y = float(screen_x), float(screen_y) # Initialize as float
-                            else:
-                                smooth_mouse_x = smooth_mouse_x * (1 - smoothing_factor) + screen_x * smoothing_factor
-                                smooth_mouse_y = smooth_mouse_y * (1 - smoothing_factor) + screen_y * smoothing_factor
-
-                            pyautogui.moveTo(smooth_mouse_x, smooth_mouse_y)
-                            cv2.putText(frame, "MOUSE CONTROL", (10, 150),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-                        else: # If mouse control is not active, use for volume
-                            # Get the palm height (y-coordinate) for volume level
-                            palm_y = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST].y
-                            # Value will be between 0-1 (inverted because y increases downward)
-                            volume_level = 1 - (palm_y * 1.3)  # Scale for better range
-                            volume_level = max(0, min(1, volume_level))  # Clamp between 0-1
-
-                            # Store the detected volume level in the gesture state
-                            gesture_state["volume_level"] = volume_level
-                            gesture_state["detected"] = "volume_control" # Signal volume control
-
-                            # Visual feedback for volume control
-                            bar_height = int(frame.shape[0] * volume_level)
-                            cv2.rectangle(frame, (frame.shape[1] - 50, frame.shape[0] - bar_height),
-                                            (frame.shape[1] - 20, frame.shape[0]), (0, 255, 0), -1)
-                            cv2.putText(frame, f"VOL: {int(volume_level * 100)}%", (frame.shape[1] - 150, 30),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                    else: # If palm not open, reset mouse tracking for smoother re-engagement
-                        # These variables are now global, so just assign to them directly
-                        # No 'nonlocal' needed within this block anymore for these variables
-                        prev_mouse_x, prev_mouse_y = None, None # Reset to None
-                        smooth_mouse_x, smooth_mouse_y = None, None # Reset to None
+            # Landmarks are read once per frame, every detector uses these features
+            hand_list = results.multi_hand_landmarks if results is not None else None
+            processor.process((features.update(hand_landmarks) for hand_landmarks in hand_list or ()),
+                              current_time, frame.shape[1])
+            if recorder:
+                recorder.record(current_time, features.points if hand_list else None,
+                                gesture_state["mouse_control"], frame.shape[1])
+
+            if GESTURE_DISPLAY == "headless":
+                continue
 
             # Display status
-            if scroll_active:
-                cv2.putText(frame, "SCROLLING", (10, 30),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            labels = processor.labels
+            if processor.scroll_active:
+                labels.append(("SCROLLING", (10, 30), (0, 255, 0)))
 
             if gesture_state["mouse_control"]:
-                 cv2.putText(frame, "MOUSE ACTIVE", (10, 60),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 255), 2)
+                labels.append(("MOUSE ACTIVE", (10, 60), (255, 0, 255)))
 
-            cv2.putText(frame, "Press Q to quit", (10, 460),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            labels.append(("Press Q to quit", (10, 460), (255, 255, 255)))
+
+            if preview:
+                preview.submit(frame, hand_list, labels, processor.volume_bar)
+                continue
 
-            cv2.imshow("Gesture Control", frame)
+            cv2.imshow("Gesture Control", render(frame, hand_list, labels, processor.volume_bar))
             if cv2.waitKey(10) & 0xFF == ord('q'):
                 gesture_state["active"] = False
                 break
 
-    cap.release()
-    cv2.destroyAllWindows()
\ No newline at end of file
+    camera.stop()
+    if recorder:
+        recorder.close()
+    if preview:
+        preview.stop()
+        stats = preview.stats()
+        print(f"Gesture preview: {stats['rendered']} of {stats['frames']} frames shown, "
+              f"{stats['skipped']} replaced before display")
+    elif GESTURE_DISPLAY == "window":
+        cv2.destroyAllWindows()
+    stats = camera.stats()
+    print(f"Camera: {stats['captured']} frames captured, {stats['dropped']} dropped ({stats['drop_rate']:.1%}), "
+          f"{stats['read_failures']} read failures")
+    stats = scheduler.stats()
+    print(f"Hand tracking: {stats['inferences']} of {stats['frames']} frames ({stats['inference_share']:.0%}), "
+          f"{stats['mean_latency_ms']:.1f} ms per inference")
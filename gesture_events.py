@@ -0,0 +1,138 @@
+# gesture_events.py - Push-based delivery of detected gestures to the assistant
+
+import queue
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from benchmark_utils import LatencyStats
+from config import GESTURE_EVENT_QUEUE_SIZE
+
+# timestamp is the time.time() the camera frame showing the gesture was captured
+GestureEvent = namedtuple("GestureEvent", ["name", "timestamp", "value"])
+
+_STOP = GestureEvent("stop", 0.0, None)
+
+
+class Subscription:
+    def __init__(self, handler, debounce, trailing):
+        self.handler = handler
+        self.debounce = debounce
+        self.trailing = trailing
+        self.last_fired = None
+        self.held = None
+
+
+class EventStats(LatencyStats):
+    COUNTERS = ("published", "handled", "debounced", "dropped", "errors")
+
+
+class GestureEventBus:
+    """Gesture thread publishes, a dispatcher thread routes each event to its handlers.
+
+    publish() never blocks the gesture loop: when the queue is full the
+    event is dropped and counted. A subscription with a debounce runs its
+    handler at most once per debounce seconds. Repeats inside that window
+    are dropped, or with trailing=True the newest one is held back and
+    delivered when the window ends, which suits continuous values like a
+    volume level. wait_for() lets a handler prompt block until a gesture
+    shows up. Latency is measured from frame capture to handler start.
+    """
+
+    def __init__(self, maxsize=GESTURE_EVENT_QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.subscriptions = defaultdict(list)
+        self.stats_by_name = defaultdict(EventStats)
+        self._seen = {}
+        self._seen_condition = threading.Condition()
+        self.thread = None
+
+    def subscribe(self, name, handler, debounce=0.0, trailing=False):
+        """Call handler(event) for every event with this name"""
+        self.subscriptions[name].append(Subscription(handler, debounce, trailing))
+
+    def publish(self, name, timestamp=None, value=None):
+        event = GestureEvent(name, time.time() if timestamp is None else timestamp, value)
+        stats = self.stats_by_name[name]
+        stats.published += 1
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            stats.dropped += 1
+
+    def wait_for(self, name, since, timeout):
+        """True once an event with this name captured after since has been dispatched"""
+        with self._seen_condition:
+            return self._seen_condition.wait_for(lambda: self._seen.get(name, 0.0) > since, timeout)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        if self.thread:
+            self.queue.put(_STOP)
+            self.thread.join(timeout=1)
+
+    def _dispatch_loop(self):
+        while True:
+            try:
+                event = self.queue.get(timeout=self._next_release())
+            except queue.Empty:
+                event = None
+            if event is _STOP:
+                return
+            if event is not None:
+                with self._seen_condition:
+                    self._seen[event.name] = max(self._seen.get(event.name, 0.0), event.timestamp)
+                    self._seen_condition.notify_all()
+                for subscription in self.subscriptions.get(event.name, ()):
+                    self._deliver(subscription, event)
+            self._release_held()
+
+    def _deliver(self, subscription, event):
+        now = time.time()
+        if subscription.last_fired is not None and now - subscription.last_fired < subscription.debounce:
+            if subscription.trailing:
+                if subscription.held is not None:
+                    self.stats_by_name[event.name].debounced += 1
+                subscription.held = event
+            else:
+                self.stats_by_name[event.name].debounced += 1
+            return
+
+        subscription.last_fired = now
+        subscription.held = None
+        stats = self.stats_by_name[event.name]
+        stats.latencies.append(now - event.timestamp)
+        try:
+            subscription.handler(event)
+            stats.handled += 1
+        except Exception as e:
+            stats.errors += 1
+            print(f"Gesture handler error ({event.name}): {e}")
+
+    def _held(self):
+        return [(subscription, subscription.held) for subscriptions in self.subscriptions.values()
+                for subscription in subscriptions if subscription.held is not None]
+
+    def _next_release(self):
+        """Seconds until the first held-back event is due, None when nothing is held"""
+        due = [subscription.last_fired + subscription.debounce for subscription, _ in self._held()]
+        return max(0.0, min(due) - time.time()) if due else None
+
+    def _release_held(self):
+        now = time.time()
+        for subscription, event in self._held():
+            if now - subscription.last_fired >= subscription.debounce:
+                self._deliver(subscription, event)
+
+    def stats(self):
+        return {name: stats.summary() for name, stats in self.stats_by_name.items()}
+
+    def print_stats(self):
+        for name, row in sorted(self.stats().items()):
+            print(f"Gesture {name:<16} {row['published']:>5} published {row['handled']:>5} handled "
+                  f"{row['debounced']:>4} debounced {row['dropped']:>3} dropped "
+                  f"{row['mean_ms']:>7.1f} ms avg {row['p95_ms']:>7.1f} ms p95")
@@ -0,0 +1,111 @@
+# gesture_preview.py - Gesture overlay rendering, inline or on a decimated preview thread
+
+import threading
+
+from lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+mp = lazy_import("mediapipe")
+
+# Overlay labels are (text, (x, y), color) in pixels of the full camera frame
+
+
+def render(frame, hands, labels, volume_level=None, scale=1.0):
+    """Draw the hand landmarks, labels and volume bar onto a copy of frame resized by scale"""
+    if scale != 1.0:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    mp_hands = mp.solutions.hands
+    mp_drawing = mp.solutions.drawing_utils
+    for hand_landmarks in hands or ():
+        # Landmarks are normalized, so they land in the right place at any resolution
+        mp_drawing.draw_landmarks(
+            frame,
+            hand_landmarks,
+            mp_hands.HAND_CONNECTIONS,
+            mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=4),
+            mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2)
+        )
+
+    if volume_level is not None:
+        height, width = frame.shape[:2]
+        bar_height = int(height * volume_level)
+        cv2.rectangle(frame, (width - int(50 * scale), height - bar_height),
+                      (width - int(20 * scale), height), (0, 255, 0), -1)
+
+    for text, (x, y), color in labels:
+        cv2.putText(frame, text, (int(x * scale), int(y * scale)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7 * scale, color, 2 if scale >= 0.75 else 1)
+    return frame
+
+
+class GesturePreview:
+    """Shows every Nth gesture frame at reduced resolution on its own thread.
+
+    submit() only keeps a reference to the newest frame and returns, so the
+    gesture loop never waits for drawing, imshow or waitKey. A frame that
+    arrives before the previous one was shown replaces it. Pressing q in the
+    window turns gesture control off like the full window does.
+    """
+
+    def __init__(self, gesture_state, every=3, scale=0.5, title="Gesture Control"):
+        self.gesture_state = gesture_state
+        self.every = max(1, every)
+        self.scale = scale
+        self.title = title
+        self._pending = None
+        self._condition = threading.Condition()
+        self.frames = 0
+        self.rendered = 0
+        self.skipped = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._render_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1)
+
+    def submit(self, frame, hands, labels, volume_level=None):
+        """Hand over one processed frame, only every Nth one is kept for display"""
+        self.frames += 1
+        if self.frames % self.every:
+            return
+        with self._condition:
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = (frame, hands, labels, volume_level)
+            self._condition.notify()
+
+    def _render_loop(self):
+        try:
+            while self.running:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._pending is not None or not self.running)
+                    pending, self._pending = self._pending, None
+                if pending is None:
+                    continue
+                frame, hands, labels, volume_level = pending
+                try:
+                    cv2.imshow(self.title, render(frame, hands, labels, volume_level, self.scale))
+                    self.rendered += 1
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        self.gesture_state["active"] = False
+                except Exception as e:
+                    print(f"Gesture preview error: {e}")
+                    break
+        finally:
+            try:
+                cv2.destroyWindow(self.title)
+            except Exception:
+                pass
+
+    def stats(self):
+        return {"frames": self.frames, "rendered": self.rendered, "skipped": self.skipped}
@@ -0,0 +1,192 @@
+# gesture_trace.py - Record hand landmark traces and replay them through the gesture detectors
+
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from benchmark_utils import percentile
+from config import DEFAULT_GESTURE_STATE
+from gesture import GestureProcessor, gesture_recognition
+from landmark_features import HandFeatures
+
+
+class TraceRecorder:
+    """Collects the landmarks of every processed gesture frame and writes them as one .npz.
+
+    Per frame the trace holds the capture timestamp, whether a hand was
+    tracked, its 21 landmarks as float32 (zeros without a hand) and the
+    mouse_control flag, which decides between mouse and volume control.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.timestamps = []
+        self.landmarks = []
+        self.present = []
+        self.mouse_control = []
+        self.frame_width = 0
+
+    def record(self, timestamp, points, mouse_control, frame_width):
+        self.timestamps.append(timestamp)
+        self.present.append(points is not None)
+        self.landmarks.append(np.zeros((21, 3), dtype=np.float32) if points is None else points.copy())
+        self.mouse_control.append(bool(mouse_control))
+        self.frame_width = frame_width
+
+    def close(self):
+        if not self.timestamps:
+            return
+        try:
+            np.savez_compressed(
+                self.path,
+                timestamps=np.array(self.timestamps, dtype=np.float64),
+                landmarks=np.stack(self.landmarks),
+                present=np.array(self.present, dtype=bool),
+                mouse_control=np.array(self.mouse_control, dtype=bool),
+                frame_width=np.int32(self.frame_width)
+            )
+            print(f"Gesture trace: {len(self.timestamps)} frames saved to {self.path}")
+        except Exception as e:
+            print(f"Error saving gesture trace: {e}")
+
+
+def load_trace(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+class RecordingActuator:
+    """Actuator stand-in that logs actions instead of touching the desktop"""
+
+    class Size:
+        def __init__(self, width, height):
+            self.width, self.height = width, height
+
+    def __init__(self, width=1920, height=1080):
+        self.size = self.Size(width, height)
+        self.actions = []
+        self.now = 0.0
+
+    def press(self, key):
+        self.actions.append((self.now, "press", key))
+
+    def scroll(self, amount):
+        self.actions.append((self.now, "scroll", amount))
+
+    def move_to(self, x, y):
+        self.actions.append((self.now, "move_to", [round(x, 1), round(y, 1)]))
+
+    def screen_size(self):
+        return self.size
+
+
+def replay(trace):
+    """Feed a loaded trace through GestureProcessor once, timing every frame"""
+    timestamps = trace["timestamps"]
+    start_time = float(timestamps[0]) if len(timestamps) else 0.0
+    gesture_state = DEFAULT_GESTURE_STATE.copy()
+    gesture_state["active"] = True
+    actuator = RecordingActuator()
+    processor = GestureProcessor(gesture_state, actuator)
+    features = HandFeatures()
+    frame_width = int(trace["frame_width"])
+
+    latencies, events = [], []
+    previous = None
+    for i, now in enumerate(timestamps.tolist()):
+        gesture_state["mouse_control"] = bool(trace["mouse_control"][i])
+        actuator.now = now - start_time
+        start = time.perf_counter()
+        hands = (features.update_points(trace["landmarks"][i]),) if trace["present"][i] else ()
+        detected = processor.process(hands, now, frame_width)
+        latencies.append(time.perf_counter() - start)
+        # Continuous gestures (volume, mouse) are reported once per run of frames
+        if detected and detected != previous:
+            events.append({"frame": i, "time": round(now - start_time, 4), "gesture": detected})
+        previous = detected
+
+    actions = [{"time": round(at, 4), "action": name, "value": value} for at, name, value in actuator.actions]
+    return latencies, events, actions
+
+
+def benchmark(path, repeat=5):
+    """Replay a trace repeat times; throughput and latency over all runs, events of the first"""
+    trace = load_trace(path)
+    frames = len(trace["timestamps"])
+    latencies, events, actions = [], None, None
+    for _ in range(repeat):
+        run_latencies, run_events, run_actions = replay(trace)
+        latencies.extend(run_latencies)
+        if events is None:
+            events, actions = run_events, run_actions
+        elif run_events != events or run_actions != actions:
+            print("Warning: replay runs emitted different events")
+
+    total = sum(latencies)
+    return {
+        "trace": path,
+        "frames": frames,
+        "hand_frames": int(trace["present"].sum()),
+        "trace_seconds": float(trace["timestamps"][-1] - trace["timestamps"][0]) if frames else 0.0,
+        "runs": repeat,
+        "frames_per_second": len(latencies) / total if total else 0.0,
+        "latency_us": {
+            "mean": total / len(latencies) * 1e6 if latencies else 0.0,
+            "p50": percentile(latencies, 0.5) * 1e6 if latencies else 0.0,
+            "p95": percentile(latencies, 0.95) * 1e6 if latencies else 0.0,
+            "max": max(latencies) * 1e6 if latencies else 0.0
+        },
+        "event_counts": dict(Counter(event["gesture"] for event in events or ())),
+        "action_counts": dict(Counter(action["action"] for action in actions or ())),
+        "events": events or [],
+        "actions": actions or []
+    }
+
+
+def record(path, seconds):
+    """Run live gesture recognition and record its trace until Ctrl+C, q or the time limit"""
+    gesture_state = DEFAULT_GESTURE_STATE.copy()
+    thread = threading.Thread(target=gesture_recognition, args=(gesture_state, path))
+    thread.start()
+    started = time.time()
+    try:
+        while thread.is_alive() and (not seconds or time.time() - started < seconds):
+            thread.join(timeout=0.2)
+    except KeyboardInterrupt:
+        pass
+    gesture_state["active"] = False
+    thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record hand landmark traces or replay them through the gesture detectors")
+    parser.add_argument("trace", help="Trace file (.npz)")
+    parser.add_argument("--record", action="store_true", help="Record a new trace from the camera")
+    parser.add_argument("--seconds", type=float, default=0, help="Recording length, 0 records until q or Ctrl+C")
+    parser.add_argument("--repeat", type=int, default=5, help="Replay runs to time")
+    parser.add_argument("--output", help="Write the replay report as JSON to this file")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.trace, args.seconds)
+        return
+
+    report = benchmark(args.trace, max(1, args.repeat))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+    print(f"{report['frames']} frames ({report['hand_frames']} with a hand), "
+          f"{report['frames_per_second']:.0f} frames/s, "
+          f"{report['latency_us']['mean']:.1f} us mean / {report['latency_us']['p95']:.1f} us p95 per frame, "
+          f"{len(report['events'])} gesture events, {len(report['actions'])} actions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# import_profile.py - Per-module import-time breakdown checked against a cold-start budget
+
+import argparse
+import re
+import subprocess
+import sys
+
+from config import STARTUP_IMPORT_BUDGET
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_imports(module="app"):
+    """Import the module in a fresh interpreter with -X importtime.
+
+    Returns (total seconds, [(package, seconds, module count)]) where the
+    self time of every imported module is charged to its root package,
+    largest first.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr.strip().splitlines()[-1]}")
+
+    packages = {}
+    total = 0.0
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        # -X importtime indents nested imports, top-level entries add up to the total
+        if len(indent) == 1:
+            total += int(cumulative_us) / 1e6
+        package = name.split(".")[0]
+        seconds, count = packages.get(package, (0.0, 0))
+        packages[package] = (seconds + int(self_us) / 1e6, count + 1)
+
+    rows = sorted(((name, seconds, count) for name, (seconds, count) in packages.items()),
+                  key=lambda row: row[1], reverse=True)
+    return total, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show which imports dominate assistant startup")
+    parser.add_argument("module", nargs="?", default="app")
+    parser.add_argument("--top", type=int, default=20, help="Number of packages to list")
+    parser.add_argument("--budget", type=float, default=STARTUP_IMPORT_BUDGET,
+                        help="Cold-start import budget in seconds")
+    args = parser.parse_args()
+
+    total, rows = profile_imports(args.module)
+    print(f"{'package':<32} {'modules':>8} {'time (ms)':>10} {'share':>7}")
+    for name, seconds, count in rows[:args.top]:
+        print(f"{name:<32} {count:>8} {seconds * 1000:>10.1f} {seconds / total if total else 0:>7.1%}")
+    print(f"Total import time for '{args.module}': {total:.2f}s (budget {args.budget:.2f}s)")
+
+    if total > args.budget:
+        print("Startup import budget exceeded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# inference_backends.py - CPU inference backends for the zero-shot classifier
+
+import os
+
+from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+from config import ZERO_SHOT_MODEL, CLASSIFIER_BACKEND, BACKEND_CACHE_DIR
+
+BACKENDS = ("fp32", "int8", "onnx")
+
+
+def _backend_dir(cache_dir, model_name, backend):
+    path = os.path.join(cache_dir, model_name.replace("/", "--"), backend)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _load_fp32(model_name, cache_dir):
+    return pipeline("zero-shot-classification", model=model_name)
+
+
+def _load_int8(model_name, cache_dir):
+    """Dynamically quantized Linear layers.
+
+    Quantization runs at load time on the fp32 weights. It takes a few
+    seconds, and nothing pickled is ever loaded back from the cache
+    directory, so there is nothing to break across torch versions.
+    """
+    import torch
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+
+def _load_onnx(model_name, cache_dir):
+    """ONNX Runtime session, the graph is exported once and reused from disk"""
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    export_dir = _backend_dir(cache_dir, model_name, "onnx")
+    if os.path.exists(os.path.join(export_dir, "model.onnx")):
+        model = ORTModelForSequenceClassification.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+
+_LOADERS = {
+    "fp32": _load_fp32,
+    "int8": _load_int8,
+    "onnx": _load_onnx
+}
+
+
+def load_zero_shot_pipeline(model_name=ZERO_SHOT_MODEL, backend=CLASSIFIER_BACKEND,
+                            cache_dir=BACKEND_CACHE_DIR):
+    """Build a zero-shot-classification pipeline on the requested backend.
+
+    The pipeline's backend attribute names the backend it actually runs on.
+    """
+    if backend not in _LOADERS:
+        raise ValueError(f"Unknown classifier backend '{backend}', expected one of {BACKENDS}")
+    classifier = _LOADERS[backend](model_name, cache_dir)
+    classifier.backend = backend
+    return classifier
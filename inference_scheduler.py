@@ -0,0 +1,85 @@
+# inference_scheduler.py - Decides which camera frames go through MediaPipe hand tracking
+
+import numpy as np
+
+from config import (GESTURE_ACTIVE_FPS, GESTURE_STILL_FPS, GESTURE_IDLE_FPS, GESTURE_IDLE_AFTER_FRAMES,
+                    GESTURE_MOTION_THRESHOLD, GESTURE_LATENCY_BUDGET, GESTURE_CPU_BUDGET)
+
+
+def motion_score(previous, current):
+    """Mean absolute difference of two small grayscale thumbnails, 0 to 255"""
+    return float(np.mean(np.abs(current - previous)))
+
+
+def thumbnail(frame, step=16):
+    """Every step-th pixel of the frame averaged over the color channels"""
+    return frame[::step, ::step].mean(axis=2, dtype=np.float32)
+
+
+class InferenceScheduler:
+    """Runs hand tracking at a rate that follows what is in front of the camera.
+
+    A moving hand gets GESTURE_ACTIVE_FPS, a hand held still
+    GESTURE_STILL_FPS, and after GESTURE_IDLE_AFTER_FRAMES inferences without
+    a hand the rate drops to GESTURE_IDLE_FPS until motion shows up again.
+    The measured inference latency bounds the rate from both sides: it may
+    use at most GESTURE_CPU_BUDGET of a core, and a visible hand is tracked
+    often enough that a gesture shows up within GESTURE_LATENCY_BUDGET.
+    """
+
+    def __init__(self):
+        self.previous = None
+        self.last_run = None
+        self.latency = None  # Moving average of hands.process time
+        self.misses = GESTURE_IDLE_AFTER_FRAMES  # Start idle until something moves
+        self.hand_visible = False
+        self.motion = 0.0
+        self.frames = 0
+        self.inferences = 0
+        self.total_latency = 0.0
+        self.mode = "idle"
+
+    def target_interval(self):
+        if self.hand_visible:
+            self.mode = "active" if self.motion >= GESTURE_MOTION_THRESHOLD else "still"
+        elif self.misses < GESTURE_IDLE_AFTER_FRAMES or self.motion >= GESTURE_MOTION_THRESHOLD:
+            # A hand may be entering, keep looking closely
+            self.mode = "searching"
+        else:
+            self.mode = "idle"
+        fps = {"active": GESTURE_ACTIVE_FPS, "still": GESTURE_STILL_FPS,
+               "searching": GESTURE_ACTIVE_FPS, "idle": GESTURE_IDLE_FPS}[self.mode]
+
+        interval = 1 / fps
+        if self.latency is not None:
+            if self.hand_visible:
+                interval = min(interval, max(0.0, GESTURE_LATENCY_BUDGET - self.latency))
+            interval = max(interval, self.latency / GESTURE_CPU_BUDGET)
+        return interval
+
+    def should_run(self, now, frame):
+        """Whether hands.process should run on this frame"""
+        self.frames += 1
+        small = thumbnail(frame)
+        if self.previous is not None and self.previous.shape == small.shape:
+            self.motion = motion_score(self.previous, small)
+        self.previous = small
+        return self.last_run is None or now - self.last_run >= self.target_interval()
+
+    def record(self, now, latency, hand_found):
+        """Report one hands.process call"""
+        self.last_run = now
+        self.inferences += 1
+        self.total_latency += latency
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.hand_visible = hand_found
+        self.misses = 0 if hand_found else self.misses + 1
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "inferences": self.inferences,
+            "inference_share": self.inferences / self.frames if self.frames else 0.0,
+            "mean_latency_ms": self.total_latency / self.inferences * 1000 if self.inferences else 0.0,
+            "mode": self.mode
+        }
@@ -0,0 +1,124 @@
+# intent_cache.py - Persistent LRU cache of intent classifications
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from config import FILLER_WORDS, INTENT_CACHE_PATH, INTENT_CACHE_SIZE, INTENT_CACHE_SAVE_EVERY
+
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s']")
+
+
+def normalize(text):
+    """Lowercase, drop punctuation and filler words, collapse whitespace"""
+    words = PUNCTUATION_PATTERN.sub(" ", text.lower()).split()
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+def fingerprint(*parts):
+    """Stable hash of everything that can change a classification result"""
+    return hashlib.sha1(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class IntentCache:
+    """Bounded LRU map from normalized utterances to (intent, confidence).
+
+    Entries are written to disk together with a fingerprint of the labels
+    and models they came from; a cache file with a different fingerprint
+    is discarded on load.
+    """
+
+    def __init__(self, key, path=INTENT_CACHE_PATH, max_size=INTENT_CACHE_SIZE):
+        self.key = key
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def get(self, command):
+        """Return the cached (intent, confidence) for the command, or None"""
+        key = normalize(command)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def peek(self, command):
+        """Like get, but leaves the LRU order and hit/miss counters alone"""
+        with self._lock:
+            return self._entries.get(normalize(command))
+
+    def put(self, command, intent, confidence):
+        key = normalize(command)
+        if not key:
+            return
+        with self._lock:
+            self._entries[key] = (intent, confidence)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._unsaved += 1
+            save_now = self._unsaved >= INTENT_CACHE_SAVE_EVERY
+        if save_now:
+            self.save()
+
+    def rekey(self, key):
+        """Switch to another fingerprint, entries made under the old one are dropped"""
+        if key == self.key:
+            return
+        with self._lock:
+            self.key = key
+            self._entries.clear()
+            self._unsaved = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Intent cache load error: {e}")
+            return
+
+        if data.get("key") != self.key:
+            # Labels or model changed since the cache was written
+            return
+        with self._lock:
+            for utterance, intent, confidence in data.get("entries", [])[-self.max_size:]:
+                self._entries[utterance] = (intent, confidence)
+
+    def save(self):
+        with self._lock:
+            entries = [[utterance, intent, confidence]
+                       for utterance, (intent, confidence) in self._entries.items()]
+            self._unsaved = 0
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": self.key, "entries": entries}, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Intent cache save error: {e}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
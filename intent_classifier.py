@@ -0,0 +1,254 @@
+# intent_classifier.py - Intent classification behind a single classify() call
+
+import threading
+import time
+from collections import namedtuple
+
+from model_registry import get_zero_shot_classifier, registry
+from intent_cache import IntentCache, fingerprint
+from intent_matcher import IntentMatcher
+from intent_prefilter import IntentPrefilter
+from config import (CANDIDATE_INTENTS, INTENT_ALIASES, INTENT_SYNONYMS, ROUTER_MODE,
+                    ZERO_SHOT_MODEL, CLASSIFIER_BACKEND, EMBEDDING_MODEL, ROUTER_MARGIN_THRESHOLD,
+                    ROUTER_MIN_SIMILARITY, INTENT_CONFIDENCE_THRESHOLD, CLASSIFIER_WAIT_TIMEOUT, PREFILTER_ENABLED, PREFILTER_TOP_K, PREFILTER_MIN_SCORE,
+                    INTENT_CACHE_PATH)
+
+# path is how the intent was resolved: "keyword", "cache", "router", "model" or None
+Classification = namedtuple("Classification", ["utterance", "intent", "score", "path"])
+
+
+def router_confidence(similarity, margin):
+    """Confidence on the INTENT_CONFIDENCE_THRESHOLD scale for a routed label, None if NLI should decide.
+
+    Cosine similarity is not a probability, so a route that clears both the
+    margin and the similarity floor is mapped linearly from
+    (ROUTER_MIN_SIMILARITY, 1] onto (INTENT_CONFIDENCE_THRESHOLD, 1].
+    """
+    if margin < ROUTER_MARGIN_THRESHOLD or similarity <= ROUTER_MIN_SIMILARITY:
+        return None
+    share = (min(similarity, 1.0) - ROUTER_MIN_SIMILARITY) / (1.0 - ROUTER_MIN_SIMILARITY)
+    return INTENT_CONFIDENCE_THRESHOLD + (1.0 - INTENT_CONFIDENCE_THRESHOLD) * share
+
+
+class IntentClassifier:
+    """Keyword matcher in front of the embedding router and the zero-shot model.
+
+    The models load on a background thread when warmup is enabled, so
+    keyword commands work immediately while the heavy models come up.
+    Model results are cached per normalized utterance across sessions, in
+    the file at cache_path.
+    """
+
+    def __init__(self, labels=CANDIDATE_INTENTS, aliases=INTENT_ALIASES, warmup=True,
+                 cache_path=INTENT_CACHE_PATH):
+        self.labels = list(labels)
+        self.keyword_matcher = IntentMatcher(self.labels, aliases)
+        self.prefilter = IntentPrefilter(self.labels) if PREFILTER_ENABLED else None
+        self.cache = IntentCache(self._cache_key(CLASSIFIER_BACKEND, ROUTER_MODE), cache_path)
+        self.classifier = None
+        self.router = None
+        self.load_time = None
+        self.ready = threading.Event()
+
+        if warmup:
+            self.warmup_thread = threading.Thread(target=self._load_models, daemon=True)
+            self.warmup_thread.start()
+        else:
+            self.warmup_thread = None
+            self._load_models()
+
+    def _cache_key(self, backend, router_mode):
+        return fingerprint(
+            self.labels, ZERO_SHOT_MODEL, backend, router_mode, EMBEDDING_MODEL,
+            ROUTER_MARGIN_THRESHOLD, ROUTER_MIN_SIMILARITY, PREFILTER_ENABLED and
+            [PREFILTER_TOP_K, PREFILTER_MIN_SCORE, INTENT_SYNONYMS])
+
+    def _load_models(self):
+        start = time.perf_counter()
+        try:
+            self.classifier = self._initialize_classifier()
+            self.router = self._initialize_router()
+            # A backend that fell back to fp32, or a router that failed to load, gives
+            # different results than the configured ones, so they get their own cache entries
+            backend = getattr(self.classifier, "backend", CLASSIFIER_BACKEND)
+            router_mode = ROUTER_MODE if self.router or ROUTER_MODE != "embedding" else "zero-shot"
+            self.cache.rekey(self._cache_key(backend, router_mode))
+        finally:
+            self.load_time = time.perf_counter() - start
+            self.ready.set()
+
+    def _initialize_classifier(self):
+        try:
+            # transformers is imported here, on the warm-up thread, not at startup
+            from transformers import logging
+            # Suppress transformer warnings
+            logging.set_verbosity_error()
+            return get_zero_shot_classifier(ZERO_SHOT_MODEL, CLASSIFIER_BACKEND)
+        except Exception as e:
+            print(f"Model loading error: {e}")
+            return None
+
+    def _initialize_router(self):
+        if ROUTER_MODE != "embedding":
+            return None
+        try:
+            from intent_router import EmbeddingRouter
+            return EmbeddingRouter(self.labels)
+        except Exception as e:
+            print(f"Router loading error: {e}")
+            return None
+
+    @property
+    def is_ready(self):
+        return self.ready.is_set()
+
+    def wait_until_ready(self, timeout=None):
+        """Block until the models are loaded, returns False on timeout"""
+        return self.ready.wait(timeout)
+
+    def classify(self, command):
+        """Return (intent, confidence), intent is None when nothing matched"""
+        result = self.resolve(command)
+        return result.intent, result.score
+
+    def lookup(self, command):
+        """Keyword matcher and cache only, None if neither knows the utterance.
+
+        Cheap enough to run on every partial transcript, it leaves the cache
+        order and hit counters alone.
+        """
+        keyword_intent = self.keyword_matcher.match(command)
+        if keyword_intent:
+            return Classification(command, keyword_intent, 1.0, "keyword")
+        cached = self.cache.peek(command)
+        if cached:
+            return Classification(command, cached[0], cached[1], "cache")
+        return None
+
+    def resolve(self, command, store=True):
+        """Classify one utterance and report which path produced the intent"""
+        keyword_intent = self.keyword_matcher.match(command)
+        if keyword_intent:
+            return Classification(command, keyword_intent, 1.0, "keyword")
+
+        cached = self.cache.get(command)
+        if cached:
+            return Classification(command, cached[0], cached[1], "cache")
+
+        if not self.ready.wait(CLASSIFIER_WAIT_TIMEOUT):
+            print("Intent models are still loading, only keyword commands are available")
+            return Classification(command, None, 0, None)
+
+        result = self._classify_with_models(command)
+        if result.intent and store:
+            self.cache.put(command, result.intent, result.score)
+        return result
+
+    def _classify_with_models(self, command):
+        if self.router:
+            try:
+                intent, similarity, margin = self.router.route(command)
+                # Too close to call or too far from every label, let the NLI model decide
+                confidence = router_confidence(similarity, margin)
+                if confidence is not None:
+                    return Classification(command, intent, confidence, "router")
+            except Exception as e:
+                print(f"Routing error: {e}")
+
+        if self.classifier:
+            try:
+                result = self.classifier(command, self._candidate_labels(command))
+                return Classification(command, result['labels'][0], result['scores'][0], "model")
+            except Exception as e:
+                print(f"Classification error: {e}")
+
+        return Classification(command, None, 0, None)
+
+    def _candidate_labels(self, utterance):
+        """Labels worth scoring with NLI, the utterance's prefilter top-k in label order"""
+        if not self.prefilter:
+            return self.labels
+        wanted = set(self.prefilter.candidates(utterance))
+        return [label for label in self.labels if label in wanted]
+
+    def classify_many(self, utterances, batch_size=16, use_cache=True):
+        """Yield a Classification for every utterance, in input order.
+
+        Unlike execute_command this has no side effects: nothing is spoken
+        or executed and the intent cache is only read, never updated.
+        Utterances that need the model are batched through the pipeline.
+        """
+        self.wait_until_ready()
+        chunk = []
+        for utterance in utterances:
+            chunk.append(utterance)
+            if len(chunk) >= batch_size:
+                yield from self._classify_chunk(chunk, batch_size, use_cache)
+                chunk = []
+        if chunk:
+            yield from self._classify_chunk(chunk, batch_size, use_cache)
+
+    def _classify_chunk(self, utterances, batch_size, use_cache):
+        results = [None] * len(utterances)
+        pending = []
+        for index, utterance in enumerate(utterances):
+            keyword_intent = self.keyword_matcher.match(utterance)
+            cached = self.cache.peek(utterance) if use_cache and not keyword_intent else None
+            if keyword_intent:
+                results[index] = Classification(utterance, keyword_intent, 1.0, "keyword")
+            elif cached:
+                results[index] = Classification(utterance, cached[0], cached[1], "cache")
+            else:
+                pending.append(index)
+
+        if pending and self.router:
+            try:
+                routed = self.router.route_many([utterances[index] for index in pending])
+                unresolved = []
+                for index, (intent, similarity, margin) in zip(pending, routed):
+                    confidence = router_confidence(similarity, margin)
+                    if confidence is not None:
+                        results[index] = Classification(utterances[index], intent, confidence, "router")
+                    else:
+                        unresolved.append(index)
+                pending = unresolved
+            except Exception as e:
+                print(f"Routing error: {e}")
+
+        if pending and self.classifier:
+            # Each utterance is scored against its own candidates, exactly as resolve() would,
+            # so utterances are batched per candidate set
+            groups = {}
+            for index in pending:
+                groups.setdefault(tuple(self._candidate_labels(utterances[index])), []).append(index)
+            unresolved = []
+            for labels, indexes in groups.items():
+                try:
+                    outputs = self.classifier([utterances[index] for index in indexes], list(labels),
+                                              batch_size=batch_size)
+                    if isinstance(outputs, dict):
+                        outputs = [outputs]
+                    for index, output in zip(indexes, outputs):
+                        results[index] = Classification(utterances[index], output['labels'][0],
+                                                        output['scores'][0], "model")
+                except Exception as e:
+                    print(f"Classification error: {e}")
+                    unresolved.extend(indexes)
+            pending = unresolved
+
+        for index in pending:
+            results[index] = Classification(utterances[index], None, 0, None)
+        return results
+
+    def close(self, save_cache=True):
+        """Persist the intent cache and release the shared models"""
+        if self.classifier:
+            registry.release("zero-shot-classification", ZERO_SHOT_MODEL)
+            self.classifier = None
+        if self.router:
+            self.router.close()
+            self.router = None
+        if save_cache:
+            self.cache.save()
+        stats = self.cache.stats()
+        print(f"Intent cache: {stats['hits']} hits, {stats['misses']} misses, {stats['size']} entries")
@@ -0,0 +1,84 @@
+# intent_matcher.py - Keyword matching of intent phrases
+
+import re
+from collections import deque
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text):
+    """Lowercase word tokens, punctuation is dropped"""
+    return WORD_PATTERN.findall(text.lower())
+
+
+class IntentMatcher:
+    """Word-level Aho-Corasick automaton over intent phrases and their aliases.
+
+    Matching works on whole words, so "open mail" never fires inside
+    "open mailbox", and all phrases are found in a single pass over the
+    utterance regardless of how many intents are registered.
+    """
+
+    def __init__(self, intents, aliases=None):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for intent in intents:
+            self._add_phrase(intent, intent)
+        for alias, intent in (aliases or {}).items():
+            self._add_phrase(alias, intent)
+        self._build_failure_links()
+
+    def _add_phrase(self, phrase, intent):
+        words = tokenize(phrase)
+        if not words:
+            return
+
+        node = 0
+        for word in words:
+            next_node = self._goto[node].get(word)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][word] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+
+        # Keep the first intent registered for a phrase
+        if not self._output[node]:
+            self._output[node].append((len(words), intent))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(word, 0)
+                # Shorter phrases ending here are matches too
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text):
+        """Return every (start, end, intent) match, as word offsets into the text"""
+        matches = []
+        node = 0
+        for position, word in enumerate(tokenize(text)):
+            while node and word not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(word, 0)
+            for length, intent in self._output[node]:
+                matches.append((position - length + 1, position + 1, intent))
+        return matches
+
+    def match(self, text):
+        """Return the intent of the longest phrase in the text, or None"""
+        best = None
+        for start, end, intent in self.find_all(text):
+            if best is None or (end - start, -start) > (best[1] - best[0], -best[0]):
+                best = (start, end, intent)
+        return best[2] if best else None
@@ -0,0 +1,74 @@
+# intent_prefilter.py - Cheap lexical ranking of intent labels ahead of zero-shot NLI
+
+import math
+from collections import Counter, defaultdict
+
+from intent_matcher import tokenize
+from config import INTENT_SYNONYMS, PREFILTER_TOP_K, PREFILTER_MIN_SCORE
+
+
+def char_ngrams(text, n=3):
+    """Character n-grams of every word, padded so word starts and ends count"""
+    grams = Counter()
+    for word in tokenize(text):
+        padded = f" {word} "
+        for i in range(max(1, len(padded) - n + 1)):
+            grams[padded[i:i + n]] += 1
+    return grams
+
+
+class IntentPrefilter:
+    """TF-IDF index over character n-grams of intent labels and their synonyms.
+
+    Ranking an utterance only touches the postings of its own n-grams, so
+    the cost grows with the utterance length rather than the label count.
+    """
+
+    def __init__(self, labels, synonyms=INTENT_SYNONYMS, top_k=PREFILTER_TOP_K,
+                 min_score=PREFILTER_MIN_SCORE):
+        self.labels = list(labels)
+        self.top_k = top_k
+        self.min_score = min_score
+
+        documents = [char_ngrams(" ".join([label] + list(synonyms.get(label, ()))))
+                     for label in self.labels]
+        document_frequency = Counter(gram for document in documents for gram in document)
+        count = len(documents)
+        self._idf = {gram: math.log((1 + count) / (1 + frequency)) + 1
+                     for gram, frequency in document_frequency.items()}
+
+        self._postings = defaultdict(list)
+        self._norms = []
+        for index, document in enumerate(documents):
+            weights = {gram: (1 + math.log(tf)) * self._idf[gram] for gram, tf in document.items()}
+            for gram, weight in weights.items():
+                self._postings[gram].append((index, weight))
+            self._norms.append(math.sqrt(sum(w * w for w in weights.values())) or 1.0)
+
+    def rank(self, command):
+        """Return (label, cosine score) pairs, best first, for labels sharing any n-gram"""
+        query = {gram: (1 + math.log(tf)) * self._idf[gram]
+                 for gram, tf in char_ngrams(command).items() if gram in self._idf}
+        query_norm = math.sqrt(sum(w * w for w in query.values()))
+        if not query_norm:
+            return []
+
+        scores = defaultdict(float)
+        for gram, query_weight in query.items():
+            for index, weight in self._postings[gram]:
+                scores[index] += query_weight * weight
+
+        ranked = [(self.labels[index], score / (self._norms[index] * query_norm))
+                  for index, score in scores.items()]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked
+
+    def candidates(self, command, top_k=None):
+        """Top-k labels for the NLI model, or the full label list when the ranking is unsure"""
+        top_k = top_k or self.top_k
+        ranked = self.rank(command)
+        if len(ranked) < top_k or ranked[0][1] < self.min_score:
+            return self.labels
+        # Labels tied with the last kept one stay in, so cut-offs are not arbitrary
+        cutoff = ranked[top_k - 1][1]
+        return [label for label, score in ranked if score >= cutoff]
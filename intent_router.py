@@ -0,0 +1,80 @@
+# intent_router.py - Embedding-based intent routing
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import torch
+
+from model_registry import get_sentence_encoder, registry
+from config import EMBEDDING_MODEL, EMBEDDING_CACHE_DIR
+
+
+class EmbeddingRouter:
+    """Bi-encoder router that scores an utterance against a precomputed label matrix"""
+
+    def __init__(self, labels, model_name=EMBEDDING_MODEL, cache_dir=EMBEDDING_CACHE_DIR):
+        self.labels = list(labels)
+        self.model_name = model_name
+        self.tokenizer, self.model = get_sentence_encoder(model_name)
+        self.label_matrix = self._load_label_matrix(cache_dir)
+
+    def _cache_path(self, cache_dir):
+        """Matrix file name is keyed by the model and the exact label list"""
+        key = json.dumps([self.model_name, self.labels]).encode("utf-8")
+        return os.path.join(cache_dir, f"intents_{hashlib.sha1(key).hexdigest()[:16]}.npy")
+
+    def _load_label_matrix(self, cache_dir):
+        """Load the label embeddings from disk, computing them on first use"""
+        path = self._cache_path(cache_dir)
+        if os.path.exists(path):
+            try:
+                matrix = np.load(path)
+                if matrix.shape[0] == len(self.labels):
+                    return matrix
+            except Exception as e:
+                print(f"Embedding cache error: {e}")
+
+        matrix = self.embed(self.labels)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(path, matrix)
+        except OSError as e:
+            print(f"Could not save embedding cache: {e}")
+        return matrix
+
+    def embed(self, texts):
+        """Mean-pooled, L2-normalized sentence embeddings as a float32 matrix"""
+        with torch.no_grad():
+            encoded = self.tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
+            hidden = self.model(**encoded).last_hidden_state
+            mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+
+        vectors = pooled.numpy().astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        return vectors
+
+    def close(self):
+        registry.release("sentence-embedding", self.model_name)
+
+    def route(self, command):
+        """Return (intent, score, margin) where margin is the gap to the runner-up label"""
+        return self.route_many([command])[0]
+
+    def route_many(self, commands):
+        """Route a batch of utterances with one encoder pass and one matrix product"""
+        scores = self.embed(list(commands)) @ self.label_matrix.T
+        if scores.shape[1] < 2:
+            return [(self.labels[0], float(row[0]), float(row[0])) for row in scores]
+
+        rows = np.arange(len(scores))
+        top_two = np.argpartition(-scores, 1, axis=1)[:, :2]
+        swap = scores[rows, top_two[:, 1]] > scores[rows, top_two[:, 0]]
+        best = np.where(swap, top_two[:, 1], top_two[:, 0])
+        second = np.where(swap, top_two[:, 0], top_two[:, 1])
+        best_scores = scores[rows, best]
+        margins = best_scores - scores[rows, second]
+        return [(self.labels[label], float(score), float(margin))
+                for label, score, margin in zip(best, best_scores, margins)]
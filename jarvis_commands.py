@@ -1,102 +1,55 @@
 import os
 import time
-import cv2
-import pyautogui
-import psutil
 import webbrowser
 import shutil
-import pyjokes
-import requests
 import json
-import screen_brightness_control as sbc
-import win32gui
-import win32con
 import subprocess
 import datetime
 import platform
 import socket
-from pycaw.pycaw import AudioUtilities, ISimpleAudioVolume
-from comtypes import CLSCTX_ALL
-import wmi
+import threading
+from lazy_import import lazy_import
 from config import (CANDIDATE_INTENTS, SYSTEM_COMMANDS, APP_PATHS, 
                    WEB_URLS, SPECIAL_FOLDERS, DEFAULT_GESTURE_STATE)
+from command_registry import CommandRegistry
+from slots import extract_duration, extract_time
+
+
+# Heavy dependencies are only imported when a handler first uses them
+cv2 = lazy_import("cv2")
+pyautogui = lazy_import("pyautogui")
+psutil = lazy_import("psutil")
+pyjokes = lazy_import("pyjokes")
+requests = lazy_import("requests")
+pycaw = lazy_import("pycaw.pycaw")
+comtypes = lazy_import("comtypes")
+
+# Threads that have called CoInitialize, see _init_com()
+_com_state = threading.local()
+
+# Intent -> handler registry, filled in by the @handlers.handler decorators below
+handlers = CommandRegistry()
 
 
 def execute_specific_command(assistant, intent, command=None):
     """Execute specific commands based on intent"""
-    # System Commands
-    if intent in SYSTEM_COMMANDS:
-        assistant.control_system(intent)
-    elif intent == "system info":
-        get_system_info(assistant)
-    elif intent == "battery status":
-        get_battery_status(assistant)
-    
-    # Application Commands
-    elif intent.startswith("open ") and intent[5:] in APP_PATHS:
-        open_application(assistant, intent[5:])
-    elif intent.startswith("open ") and intent[5:] in SPECIAL_FOLDERS:
-        open_special_folder(assistant, intent[5:])
-    elif intent.startswith("open ") and intent[5:] in WEB_URLS:
-        open_website(assistant, intent[5:])
-    
-    # Media Commands
-    elif intent in ["play music", "pause music", "next track", "previous track"]:
-        action = intent.split()[0]
-        media_control(assistant, action)
-    elif intent in ["increase volume", "decrease volume", "mute volume", "unmute volume"]:
-        action = intent.split()[0]
-        adjust_volume(assistant, action)
-    elif intent == "take screenshot":
-        take_screenshot(assistant)
-    elif intent in ["start recording", "record screen"]:
-        start_recording(assistant)
-    elif intent in ["stop recording"]:
-        stop_recording(assistant)
-    
-    # File Operations
-    elif intent == "list files":
-        list_files(assistant)
-    elif intent == "create folder":
-        create_folder(assistant)
-    elif intent == "delete file":
-        delete_file(assistant)
-    
-    # Productivity
-    elif intent == "current time":
-        get_current_time(assistant)
-    elif intent == "current date":
-        get_current_date(assistant)
-    elif intent == "set timer":
-        set_timer(assistant)
-    elif intent == "tell joke":
-        tell_joke(assistant)
-    elif intent == "ip address":
-        get_ip_address(assistant)
-    
-    # Utilities
-    elif intent == "what can you do":
-        show_capabilities(assistant)
-    elif intent == "help":
-        show_help(assistant)
-    
-    # Gesture Controls
-    elif intent == "enable gestures":
-        assistant.toggle_gestures(True)
-    elif intent == "disable gestures":
-        assistant.toggle_gestures(False)
-    elif intent == "gesture help":
-        assistant.speak("Supported gestures: thumbs up/down, volume up/down, brightness up/down")
-    
-    else:
+    if not handlers.dispatch(intent, command, assistant):
         assistant.speak("I understood the command but haven't implemented that yet")
 
+def validate_handlers(intents=CANDIDATE_INTENTS):
+    """Report intents that have no handler, returns the missing ones"""
+    missing = handlers.missing(intents)
+    if missing:
+        print(f"No handler for {len(missing)} intents: {', '.join(missing)}")
+    return missing
+
 # =============== SYSTEM COMMANDS ===============
 def control_system(assistant, action):
     if action not in SYSTEM_COMMANDS:
         return
         
     try:
+        asked_at = time.time()
         assistant.speak(f"Please confirm {action} with voice or thumbs up gesture")
         start_time = time.time()
         
@@ -106,17 +59,20 @@ def control_system(assistant, action):
                 subprocess.run(SYSTEM_COMMANDS[action])
                 return
             
-            if assistant.gesture_state.get("detected") == "thumbs_up":
+            # A thumbs up counts even if it was shown while we were listening
+            if assistant.gesture_events.wait_for("thumbs_up", asked_at, timeout=0.1):
                 subprocess.run(SYSTEM_COMMANDS[action])
                 return
-            
-            time.sleep(0.1)
         
         assistant.speak(f"{action} cancelled")
     except Exception as e:
         print(f"System control error: {e}")
         assistant.speak(f"Sorry, I couldn't {action} the system")
 
+for _action in SYSTEM_COMMANDS:
+    handlers.register(_action, control_system, action=_action)
+
+@handlers.handler("system info")
 def get_system_info(assistant):
     """Enhanced system information with more details"""
     try:
@@ -149,6 +105,7 @@ def get_system_info(assistant):
         print(f"System info error: {e}")
         assistant.speak("Sorry, I couldn't get system information")
 
+@handlers.handler("battery status")
 def get_battery_status(assistant):
     """Detailed battery information"""
     try:
@@ -177,6 +134,9 @@ def open_application(assistant, app_name):
         print(f"Error opening {app_name}: {e}")
         assistant.speak(f"Sorry, I couldn't open {app_name}")
 
+for _app_name in APP_PATHS:
+    handlers.register(f"open {_app_name}", open_application, app_name=_app_name)
+
 def open_special_folder(assistant, folder_name):
     """Open special system folders"""
     try:
@@ -189,6 +149,9 @@ def open_special_folder(assistant, folder_name):
         print(f"Folder error: {e}")
         assistant.speak(f"Sorry, I couldn't open {folder_name} folder")
 
+for _folder_name in SPECIAL_FOLDERS:
+    handlers.register(f"open {_folder_name}", open_special_folder, folder_name=_folder_name)
+
 # =============== WEB CONTROLS ===============
 def open_website(assistant, site_name):
     """Open websites with error handling"""
@@ -202,6 +165,10 @@ def open_website(assistant, site_name):
         print(f"Error opening {site_name}: {e}")
         assistant.speak(f"Sorry, I couldn't open {site_name}")
 
+for _site_name in WEB_URLS:
+    handlers.register(f"open {_site_name}", open_website, site_name=_site_name)
+
+@handlers.handler("search web", slots=("query",))
 def search_web(assistant, query=None):
     """Search the web with Google"""
     try:
@@ -219,6 +186,10 @@ def search_web(assistant, query=None):
         assistant.speak("Sorry, I couldn't perform the search")
 
 # =============== MEDIA CONTROLS ===============
+@handlers.handler("play music", action="play")
+@handlers.handler("pause music", action="pause")
+@handlers.handler("next track", action="next")
+@handlers.handler("previous track", action="previous")
 def media_control(assistant, action):
     """Control media playback"""
     try:
@@ -238,12 +209,28 @@ def media_control(assistant, action):
         print(f"Media control error: {e}")
         assistant.speak("Sorry, I couldn't control the media")
 
-def adjust_volume(assistant, action=None, level=None):
-    """Enhanced volume control with gesture support"""
+def _init_com():
+    """Initialize COM once per thread, comtypes only does it for the thread that imports it.
+
+    pycaw is called from the gesture dispatcher, the execute stage and the
+    main thread, while comtypes is usually first imported by the speech
+    thread.
+    """
+    if not getattr(_com_state, "initialized", False):
+        comtypes.CoInitialize()
+        _com_state.initialized = True
+
+@handlers.handler("increase volume", action="increase")
+@handlers.handler("decrease volume", action="decrease")
+@handlers.handler("mute volume", action="mute")
+@handlers.handler("unmute volume", action="unmute")
+def adjust_volume(assistant, action=None, level=None, quiet=False):
+    """Enhanced volume control with gesture support, quiet skips the spoken confirmation"""
     try:
-        sessions = AudioUtilities.GetAllSessions()
+        _init_com()
+        sessions = pycaw.AudioUtilities.GetAllSessions()
         for session in sessions:
-            volume = session._ctl.QueryInterface(ISimpleAudioVolume)
+            volume = session._ctl.QueryInterface(pycaw.ISimpleAudioVolume)
             if level is not None:
                 volume.SetMasterVolume(level, None)
             elif action == "increase":
@@ -257,6 +244,8 @@ def adjust_volume(assistant, action=None, level=None):
             elif action == "unmute":
                 volume.SetMute(0, None)
         
+        if quiet:
+            return
         if level is not None:
             assistant.speak(f"Volume set to {int(level*100)}%")
         elif action in ["increase", "decrease"]:
@@ -267,6 +256,15 @@ def adjust_volume(assistant, action=None, level=None):
         print(f"Volume adjustment error: {e}")
         assistant.speak("Sorry, I couldn't adjust the volume")
 
+@handlers.handler("set volume to", slots=("percentage",))
+def set_volume_level(assistant, percentage=None):
+    """Set the volume to a spoken percentage"""
+    if percentage is None:
+        assistant.speak("Please specify a volume level between 0 and 100")
+        return
+    adjust_volume(assistant, level=percentage / 100)
+
+@handlers.handler("take screenshot")
 def take_screenshot(assistant):
     """Take and save screenshot"""
     try:
@@ -278,6 +276,7 @@ def take_screenshot(assistant):
         print(f"Screenshot error: {e}")
         assistant.speak("Sorry, I couldn't take a screenshot")
 
+@handlers.handler("start recording", "record screen")
 def start_recording(assistant):
     """Start screen recording"""
     try:
@@ -295,6 +294,7 @@ def start_recording(assistant):
         print(f"Recording error: {e}")
         assistant.speak("Sorry, I couldn't start recording")
 
+@handlers.handler("stop recording")
 def stop_recording(assistant):
     """Stop screen recording"""
     try:
@@ -310,6 +310,7 @@ def stop_recording(assistant):
         assistant.speak("Sorry, I couldn't stop recording")
 
 # =============== FILE OPERATIONS ===============
+@handlers.handler("list files")
 def list_files(assistant, directory="."):
     """List files in a directory"""
     try:
@@ -326,6 +327,7 @@ def list_files(assistant, directory="."):
         print(f"Error listing files: {e}")
         assistant.speak("Sorry, I couldn't list the files")
 
+@handlers.handler("create folder", slots=("folder_name",))
 def create_folder(assistant, folder_name=None):
     """Create a new folder"""
     try:
@@ -341,65 +343,98 @@ def create_folder(assistant, folder_name=None):
         print(f"Error creating folder: {e}")
         assistant.speak(f"Sorry, I couldn't create the folder {folder_name}")
 
-def delete_file(assistant, filename=None):
+@handlers.handler("delete file", slots=("file_name",))
+def delete_file(assistant, file_name=None):
     """Delete a file"""
     try:
-        if not filename:
+        if not file_name:
             assistant.speak("Which file should I delete?")
-            filename = assistant.listen()
-            if not filename:
+            file_name = assistant.listen()
+            if not file_name:
                 return
         
-        if os.path.exists(filename):
-            os.remove(filename)
-            assistant.speak(f"Deleted file: {filename}")
+        if os.path.exists(file_name):
+            os.remove(file_name)
+            assistant.speak(f"Deleted file: {file_name}")
         else:
-            assistant.speak(f"File {filename} not found")
+            assistant.speak(f"File {file_name} not found")
     except Exception as e:
         print(f"Error deleting file: {e}")
-        assistant.speak(f"Sorry, I couldn't delete {filename}")
+        assistant.speak(f"Sorry, I couldn't delete {file_name}")
 
 # =============== PRODUCTIVITY ===============
+@handlers.handler("current time")
 def get_current_time(assistant):
     """Get current time with timezone"""
     now = datetime.datetime.now()
     assistant.speak(f"The current time is {now.strftime('%I:%M %p')}")
 
+@handlers.handler("current date")
 def get_current_date(assistant):
     """Get current date with day"""
     now = datetime.datetime.now()
     assistant.speak(f"Today is {now.strftime('%A, %B %d, %Y')}")
 
+@handlers.handler("set timer", slots=("duration",))
 def set_timer(assistant, duration=None):
-    """Set a timer"""
+    """Set a timer, duration is in seconds; the timer waits on its own thread"""
     try:
         if not duration:
             assistant.speak("For how many minutes?")
-            duration = assistant.listen()
-            if not duration:
+            answer = assistant.listen()
+            if not answer:
                 return
             
-            # Extract numbers from spoken duration
-            try:
-                minutes = int(''.join(filter(str.isdigit, duration)))
-            except:
-                minutes = 1
-        else:
-            minutes = int(duration)
+            # A bare number in the answer counts as minutes
+            duration = extract_duration(answer) or 60
         
-        assistant.speak(f"Timer set for {minutes} minutes")
-        time.sleep(minutes * 60)
-        assistant.speak("Time's up! Your timer has finished")
+        minutes, seconds = divmod(int(duration), 60)
+        if seconds:
+            assistant.speak(f"Timer set for {minutes} minutes and {seconds} seconds")
+        else:
+            assistant.speak(f"Timer set for {minutes} minutes")
+        timer = threading.Timer(duration, assistant.speak, args=("Time's up! Your timer has finished",))
+        timer.daemon = True
+        timer.start()
     except Exception as e:
         print(f"Timer error: {e}")
         assistant.speak("Sorry, I couldn't set the timer")
 
+@handlers.handler("set alarm", slots=("time",))
+def set_alarm(assistant, time=None):
+    """Ring at the next occurrence of a clock time, the alarm waits on its own thread"""
+    try:
+        if time is None:
+            assistant.speak("For what time?")
+            answer = assistant.listen()
+            time = extract_time(answer) if answer else None
+            if time is None:
+                assistant.speak("I didn't catch a time for the alarm")
+                return
+
+        now = datetime.datetime.now()
+        ring_at = datetime.datetime.combine(now.date(), time)
+        if ring_at <= now:
+            ring_at += datetime.timedelta(days=1)
+
+        alarm = threading.Timer((ring_at - now).total_seconds(), assistant.speak,
+                                args=(f"Wake up! It's {ring_at.strftime('%I:%M %p')}",))
+        alarm.daemon = True
+        alarm.start()
+        day = "today" if ring_at.date() == now.date() else "tomorrow"
+        assistant.speak(f"Alarm set for {ring_at.strftime('%I:%M %p')} {day}")
+    except Exception as e:
+        print(f"Alarm error: {e}")
+        assistant.speak("Sorry, I couldn't set the alarm")
+
+@handlers.handler("tell joke")
 def tell_joke(assistant):
     """Tell a random joke"""
     joke = pyjokes.get_joke()
     assistant.speak(joke)
 
 # =============== UTILITIES ===============
+@handlers.handler("ip address")
 def get_ip_address(assistant):
     """Get public IP address"""
     try:
@@ -410,6 +445,7 @@ def get_ip_address(assistant):
         print(f"IP address error: {e}")
         assistant.speak("Sorry, I couldn't retrieve your IP address")
 
+@handlers.handler("help")
 def show_help(assistant):
     """Show help information"""
     categories = {
@@ -417,7 +453,7 @@ def show_help(assistant):
         "Apps": ["open calculator", "open notepad", "open command prompt"],
         "Web": ["open youtube", "open google", "search web"],
         "Media": ["play music", "increase volume", "take screenshot"],
-        "Productivity": ["current time", "current date", "set timer"],
+        "Productivity": ["current time", "current date", "set timer", "set alarm"],
         "Utilities": ["tell joke", "ip address", "what can you do"]
     }
     
@@ -426,6 +462,7 @@ def show_help(assistant):
         assistant.speak(f"{category}: {', '.join(commands[:3])}...")
     assistant.speak("Say 'what can you do' for full command list")
 
+@handlers.handler("what can you do")
 def show_capabilities(assistant):
     """Show all capabilities"""
     assistant.speak("I can perform these actions:")
@@ -433,4 +470,17 @@ def show_capabilities(assistant):
         if i % 5 == 0:  # Pause every 5 commands
             time.sleep(1)
         print(f"- {intent}")
-    assistant.speak("That's all I can do for now!")
\ No newline at end of file
+    assistant.speak("That's all I can do for now!")
+
+# =============== GESTURE CONTROLS ===============
+@handlers.handler("enable gestures", enable=True)
+@handlers.handler("disable gestures", enable=False)
+def toggle_gestures(assistant, enable):
+    """Enable or disable gesture control"""
+    assistant.toggle_gestures(enable)
+
+@handlers.handler("gesture help")
+def gesture_help(assistant):
+    """List supported gestures"""
+    assistant.speak("Supported gestures: thumbs up/down, open palm for volume or the mouse, "
+                    "index finger to scroll, swipe left/right")
@@ -0,0 +1,42 @@
+# lazy_import.py - Defer heavy imports until a module is first used
+
+import importlib
+import threading
+import time
+
+# Module name -> seconds spent importing it on first use
+IMPORT_TIMES = {}
+
+
+class LazyModule:
+    """Stand-in for a module that imports the real one on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                start = time.perf_counter()
+                self._module = importlib.import_module(self._name)
+                IMPORT_TIMES[self._name] = time.perf_counter() - start
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._module or self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def print_import_times():
+    """Modules imported on first use this session, slowest first"""
+    for name, seconds in sorted(IMPORT_TIMES.items(), key=lambda item: item[1], reverse=True):
+        print(f"Lazy import {name:<24} {seconds:>6.2f} s")
@@ -0,0 +1,173 @@
+# model_registry.py - Process-wide registry of shared models and engines
+
+import gc
+import threading
+import time
+
+from config import (ZERO_SHOT_MODEL, CLASSIFIER_BACKEND, EMBEDDING_MODEL,
+                    VOICE_INDEX, VOICE_RATE, VOICE_VOLUME)
+
+
+class _Entry:
+    def __init__(self):
+        self.instance = None
+        self.refcount = 0
+        self.load_time = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Hands out one lazily created instance per (task, model) pair.
+
+    Callers acquire() an instance and release() it when done; the instance
+    is dropped once the last reference is released.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, task, model, factory):
+        """Return the shared instance, calling factory() only on first use"""
+        key = (task, model)
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            entry.refcount += 1
+
+        # Per-entry lock, so loading one model doesn't block lookups of another
+        try:
+            with entry.lock:
+                if entry.instance is None:
+                    start = time.perf_counter()
+                    entry.instance = factory()
+                    entry.load_time = time.perf_counter() - start
+                return entry.instance
+        except Exception:
+            self.release(task, model)
+            raise
+
+    def release(self, task, model):
+        key = (task, model)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refcount -= 1
+            if entry.refcount > 0:
+                return
+            del self._entries[key]
+        entry.instance = None
+        gc.collect()
+
+    def memory_report(self):
+        """Return one dict per resident instance with its reference count and size"""
+        with self._lock:
+            items = list(self._entries.items())
+        return [{
+            "task": task,
+            "model": model,
+            "refs": entry.refcount,
+            "load_time": entry.load_time,
+            "size_mb": _estimate_size_mb(entry.instance)
+        } for (task, model), entry in items]
+
+    def print_report(self):
+        print(f"{'task':<26} {'model':<40} {'refs':>4} {'load (s)':>9} {'size (MB)':>10}")
+        for row in self.memory_report():
+            load_time = f"{row['load_time']:.2f}" if row["load_time"] is not None else "-"
+            size = f"{row['size_mb']:.0f}" if row["size_mb"] is not None else "-"
+            print(f"{row['task']:<26} {row['model']:<40} {row['refs']:>4} {load_time:>9} {size:>10}")
+        try:
+            import psutil
+            print(f"Process RSS: {psutil.Process().memory_info().rss / (1024 ** 2):.0f} MB")
+        except ImportError:
+            pass
+
+
+def _estimate_size_mb(instance):
+    """Parameter memory of a PyTorch model, pipeline or (tokenizer, model) pair"""
+    if isinstance(instance, tuple):
+        sizes = [_estimate_size_mb(part) for part in instance]
+        sizes = [size for size in sizes if size is not None]
+        return sum(sizes) if sizes else None
+
+    model = getattr(instance, "model", instance)
+    parameters = getattr(model, "parameters", None)
+    if not callable(parameters):
+        return None
+    try:
+        return sum(p.numel() * p.element_size() for p in parameters()) / (1024 ** 2)
+    except Exception:
+        return None
+
+
+registry = ModelRegistry()
+
+
+def get_zero_shot_classifier(model=ZERO_SHOT_MODEL, backend=CLASSIFIER_BACKEND):
+    """Shared zero-shot pipeline, falling back to fp32 if the backend fails to load"""
+    def factory():
+        from inference_backends import load_zero_shot_pipeline
+        try:
+            return load_zero_shot_pipeline(model, backend)
+        except Exception as e:
+            if backend == "fp32":
+                raise
+            print(f"Model loading error ({backend} backend): {e}")
+            return load_zero_shot_pipeline(model, "fp32")
+
+    return registry.acquire("zero-shot-classification", model, factory)
+
+
+def get_sentence_encoder(model=EMBEDDING_MODEL):
+    """Shared (tokenizer, model) pair for sentence embeddings"""
+    def factory():
+        from transformers import AutoModel, AutoTokenizer
+        encoder = AutoModel.from_pretrained(model)
+        encoder.eval()
+        return AutoTokenizer.from_pretrained(model), encoder
+
+    return registry.acquire("sentence-embedding", model, factory)
+
+
+def get_speech_engine():
+    """Shared pyttsx3 engine configured from config.py"""
+    def factory():
+        import pyttsx3
+        engine = pyttsx3.init()
+        voices = engine.getProperty('voices')
+        if len(voices) > VOICE_INDEX:
+            engine.setProperty('voice', voices[VOICE_INDEX].id)
+        engine.setProperty('rate', VOICE_RATE)
+        engine.setProperty('volume', VOICE_VOLUME)
+        return engine
+
+    return registry.acquire("text-to-speech", "pyttsx3", factory)
+
+
+def get_speech_queue():
+    """Shared speech thread, see speech_output.SpeechQueue"""
+    def factory():
+        from speech_output import SpeechQueue
+        return SpeechQueue()
+
+    return registry.acquire("text-to-speech", "speech-queue", factory)
+
+
+def get_whisper_model(model="base"):
+    """Shared openai-whisper model"""
+    def factory():
+        import whisper
+        return whisper.load_model(model)
+
+    return registry.acquire("speech-recognition", f"whisper-{model}", factory)
+
+
+def get_vosk_model(path):
+    """Shared Vosk model loaded from a local model directory"""
+    def factory():
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+        return Model(path)
+
+    return registry.acquire("speech-recognition", f"vosk-{path}", factory)
@@ -0,0 +1,195 @@
+# phrase_cache.py - Pre-rendered audio for the assistant's fixed responses
+
+import argparse
+import ast
+import json
+import os
+import threading
+import wave
+from collections import Counter, OrderedDict
+
+from config import PHRASE_CACHE_DIR, PHRASE_CACHE_MAX_MB, PHRASE_CACHE_MAX_CHARS
+from intent_cache import fingerprint
+
+INDEX_FILE = "index.json"
+# Files whose speak() calls are scanned for static responses by --warmup
+SOURCE_FILES = ("app.py", "jarvis_commands.py", "commands.py")
+
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+
+def static_phrases(paths=SOURCE_FILES):
+    """Every string literal passed straight to a speak() call in the given files"""
+    base = os.path.dirname(os.path.abspath(__file__))
+    phrases = set()
+    for path in paths:
+        with open(os.path.join(base, path), "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call) or not node.args:
+                continue
+            name = getattr(node.func, "attr", None) or getattr(node.func, "id", None)
+            text = node.args[0]
+            if name == "speak" and isinstance(text, ast.Constant) and isinstance(text.value, str):
+                phrases.add(text.value)
+    return sorted(phrases)
+
+
+def wav_duration(path):
+    with wave.open(path, "rb") as f:
+        return f.getnframes() / f.getframerate()
+
+
+class PhraseCache:
+    """Disk cache of rendered phrases, least recently played evicted first.
+
+    Files are keyed on the text and the voice, rate and volume the engine
+    had when it rendered them, so changing voice settings never plays a
+    stale recording. Dynamic text is rendered only once it has been said
+    twice, everything else falls back to live synthesis.
+    """
+
+    def __init__(self, engine, directory=PHRASE_CACHE_DIR, max_bytes=PHRASE_CACHE_MAX_MB * 1024 ** 2):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.voice = [engine.getProperty("voice"), engine.getProperty("rate"), engine.getProperty("volume")]
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (text, bytes)
+        self._seen = Counter()
+        self._pending = []
+        self._lock = threading.Lock()
+        self.load()
+
+    @property
+    def playable(self):
+        return winsound is not None
+
+    def key(self, text):
+        return fingerprint(text, *self.voice)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".wav")
+
+    def lookup(self, text):
+        """Path of the rendered phrase, or None; a second miss queues it for rendering"""
+        key = self.key(text)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self.path(key)
+            self.misses += 1
+            self._seen[text] += 1
+            if self._seen[text] == 2 and len(text) <= PHRASE_CACHE_MAX_CHARS:
+                self._pending.append(text)
+        return None
+
+    def render_pending(self, engine):
+        with self._lock:
+            texts, self._pending = self._pending, []
+        if texts:
+            self.render(engine, texts)
+
+    def render(self, engine, texts):
+        """Render the phrases to WAV files with a single runAndWait"""
+        os.makedirs(self.directory, exist_ok=True)
+        keys = {}
+        for text in texts:
+            key = self.key(text)
+            if key not in self._entries and key not in keys:
+                keys[key] = text
+                engine.save_to_file(text, self.path(key))
+        if not keys:
+            return 0
+        engine.runAndWait()
+
+        with self._lock:
+            for key, text in keys.items():
+                if os.path.exists(self.path(key)):
+                    self._entries[key] = (text, os.path.getsize(self.path(key)))
+            self._evict()
+        self.save()
+        return len(keys)
+
+    def _evict(self):
+        total = sum(size for _, size in self._entries.values())
+        while total > self.max_bytes and self._entries:
+            key, (_, size) = self._entries.popitem(last=False)
+            total -= size
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def play(self, path, interrupted):
+        """Play a rendered phrase, stops early once the interrupted Event is set"""
+        winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT)
+        if interrupted.wait(wav_duration(path)):
+            winsound.PlaySound(None, 0)
+
+    def load(self):
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Phrase cache load error: {e}")
+            return
+        with self._lock:
+            for key, text, size in entries:
+                if os.path.exists(self.path(key)):
+                    self._entries[key] = (text, size)
+
+    def save(self):
+        with self._lock:
+            entries = [[key, text, size] for key, (text, size) in self._entries.items()]
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            index_path = os.path.join(self.directory, INDEX_FILE)
+            with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(index_path + ".tmp", index_path)
+        except OSError as e:
+            print(f"Phrase cache save error: {e}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "phrases": len(self._entries),
+            "bytes": sum(size for _, size in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage pre-rendered assistant responses")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Render every static speak() response found in the handlers")
+    parser.add_argument("--list", action="store_true", help="Only print the static responses found")
+    args = parser.parse_args()
+
+    phrases = static_phrases()
+    if args.list or not args.warmup:
+        for phrase in phrases:
+            print(phrase)
+        print(f"{len(phrases)} static responses")
+        return
+
+    from model_registry import get_speech_engine
+
+    engine = get_speech_engine()
+    cache = PhraseCache(engine)
+    rendered = cache.render(engine, phrases)
+    stats = cache.stats()
+    print(f"Rendered {rendered} new phrases, {stats['phrases']} cached ({stats['bytes'] / 1024 ** 2:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# slots.py - Parameter (slot) extraction from recognized commands
+
+import datetime
+import re
+
+from config import WEB_URLS
+
+UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19
+}
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90
+}
+SCALES = {"hundred": 100, "thousand": 1000}
+
+_NUMBER_WORD = "|".join(sorted(list(UNITS) + list(TENS) + list(SCALES), key=len, reverse=True))
+SPELLED_NUMBER_PATTERN = re.compile(
+    rf"\b(?:a\s+)?(?:{_NUMBER_WORD})(?:[\s-]+(?:and[\s-]+)?(?:{_NUMBER_WORD}))*\b")
+NUMBER_PATTERN = re.compile(r"(?<![\w.])\d+(?:\.\d+)?(?![\w.])")
+PERCENTAGE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(?:%|percent\b)?")
+_DURATION_UNIT = r"seconds?|secs?|minutes?|mins?|hours?|hrs?"
+# "2 minutes", "an hour and a half", "2 and a half minutes", "half an hour"
+DURATION_PATTERN = re.compile(
+    rf"\b(\d+(?:\.\d+)?|an?|half an?)(\s+and a half)?\s*({_DURATION_UNIT})\b(\s+and a half)?")
+# A number followed by a duration unit or "percent" is not a clock time
+TIME_PATTERN = re.compile(
+    r"\b(\d{1,2})(?:[:.\s](\d{2}))?\s*(a\.?m\.?|p\.?m\.?|o'?clock)?"
+    rf"(?!\s*(?:{_DURATION_UNIT}|percent)\b)(?=\W|$)")
+NAME_PATTERN = re.compile(r"\b(?:named|called|name it|call it)\s+(.+)$")
+QUERY_PATTERN = re.compile(
+    r"\b(?:search|look up|google|find)(?:\s+(?:the\s+)?(?:web|internet|online|google|youtube))?"
+    r"(?:\s+for)?\s+(.+)$")
+SONG_PATTERN = re.compile(r"\bplay\s+(?:the\s+song\s+)?(.+)$")
+SITE_PATTERN = re.compile(r"\b(" + "|".join(re.escape(site) for site in WEB_URLS) + r")\b")
+
+UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600}
+
+
+def _spelled_to_digits(phrase):
+    """ "one hundred and five" -> "105"; a unit before a tens word starts a new number,
+    so "six thirty" -> "6 30" """
+    numbers = []
+    total, current, previous = 0, 0, None
+    for word in re.split(r"[\s-]+", phrase):
+        if word == "a":
+            current = current or 1
+        elif word in UNITS or word in TENS:
+            if word in TENS and previous in UNITS:
+                numbers.append(total + current)
+                total, current = 0, 0
+            current += UNITS.get(word, TENS.get(word))
+        elif word == "hundred":
+            current = (current or 1) * 100
+        elif word == "thousand":
+            total += (current or 1) * 1000
+            current = 0
+        previous = word
+    numbers.append(total + current)
+    return " ".join(str(number) for number in numbers)
+
+
+def normalize_numbers(command):
+    """Replace spelled-out numbers with digits, "twenty five" -> "25" """
+    return SPELLED_NUMBER_PATTERN.sub(lambda m: _spelled_to_digits(m.group(0)), command.lower())
+
+
+def _to_number(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def extract_number(command):
+    match = NUMBER_PATTERN.search(normalize_numbers(command))
+    return _to_number(match.group(0)) if match else None
+
+
+def extract_percentage(command):
+    """First number in the command clamped to 0-100"""
+    match = PERCENTAGE_PATTERN.search(normalize_numbers(command))
+    return max(0, min(100, _to_number(match.group(1)))) if match else None
+
+
+def extract_duration(command):
+    """Total duration in seconds, "1 hour 30 minutes" -> 5400; a bare number counts as minutes"""
+    text = normalize_numbers(command)
+    seconds = 0
+    for amount, half_before, unit, half_after in DURATION_PATTERN.findall(text):
+        if amount.startswith("half"):
+            value = 0.5
+        elif amount in ("a", "an"):
+            value = 1
+        else:
+            value = float(amount)
+        if half_before or half_after:
+            value += 0.5
+        seconds += value * UNIT_SECONDS[unit[0]]
+    if seconds:
+        return int(seconds)
+
+    number = extract_number(text)
+    return int(number * 60) if number is not None else None
+
+
+def extract_time(command):
+    """Clock time as a datetime.time, understands "7 am", "7:30 pm", "19:45", "noon", "midnight".
+
+    Numbers that belong to a duration ("in five minutes") are skipped.
+    """
+    text = normalize_numbers(command)
+    if "noon" in text:
+        return datetime.time(12, 0)
+    if "midnight" in text:
+        return datetime.time(0, 0)
+
+    for hour, minute, suffix in TIME_PATTERN.findall(text):
+        hour, minute = int(hour), int(minute or 0)
+        suffix = suffix.replace(".", "")
+        if suffix == "pm" and hour < 12:
+            hour += 12
+        elif suffix == "am" and hour == 12:
+            hour = 0
+        if hour < 24 and minute < 60:
+            return datetime.time(hour, minute)
+    return None
+
+
+def extract_name(command):
+    """Text following "named" or "called", used for file and folder names"""
+    match = NAME_PATTERN.search(command.lower())
+    return match.group(1).strip(" .") if match else None
+
+
+def extract_query(command):
+    match = QUERY_PATTERN.search(command.lower())
+    return match.group(1).strip(" .?") if match else None
+
+
+def extract_song(command):
+    match = SONG_PATTERN.search(command.lower())
+    return match.group(1).strip(" .") if match else None
+
+
+def extract_site(command):
+    match = SITE_PATTERN.search(command.lower())
+    return match.group(1) if match else None
+
+
+SLOT_EXTRACTORS = {
+    "number": extract_number,
+    "percentage": extract_percentage,
+    "duration": extract_duration,
+    "time": extract_time,
+    "file_name": extract_name,
+    "folder_name": extract_name,
+    "query": extract_query,
+    "song": extract_song,
+    "site": extract_site
+}
+
+
+def extract_slots(command, slot_names):
+    """Return {slot: value} for the requested slots that were found in the command"""
+    slots = {}
+    for name in slot_names:
+        value = SLOT_EXTRACTORS[name](command)
+        if value is not None:
+            slots[name] = value
+    return slots
@@ -0,0 +1,127 @@
+# speculative.py - Classify partial transcripts while the user is still speaking
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from config import SPECULATION_STABLE_PARTIALS
+from intent_cache import normalize
+from intent_classifier import Classification
+
+
+class Speculation:
+    """What has been guessed so far for one utterance"""
+
+    def __init__(self):
+        self.key = None
+        self.stable = 0
+        self.result = None
+        self.future = None
+        self.work_time = 0.0
+        self.last_frame = None  # perf_counter() when the last audio frame of the utterance arrived
+
+
+class SpeculativeClassifier:
+    """Runs the cheap classifier paths on every partial transcript.
+
+    Each partial goes through the keyword matcher and the intent cache.
+    When neither knows it and the same partial comes back
+    SPECULATION_STABLE_PARTIALS times in a row, the full models classify it
+    on a background thread. commit() hands out the speculated result if the
+    final transcript normalizes to the same text, otherwise the caller
+    classifies the final transcript as usual.
+    """
+
+    def __init__(self, classifier):
+        self.classifier = classifier
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculation")
+        self.lock = threading.Lock()
+        self.utterances = 0
+        self.hits = Counter()
+        self.misses = 0
+        self.wasted = 0
+        self.saved_time = 0.0
+
+    def begin(self):
+        return Speculation()
+
+    def on_partial(self, speculation, text):
+        key = normalize(text)
+        if not key:
+            return
+        if key == speculation.key:
+            speculation.stable += 1
+        else:
+            if speculation.future:
+                speculation.future.cancel()
+            speculation.key, speculation.stable, speculation.future = key, 1, None
+            start = time.perf_counter()
+            speculation.result = self.classifier.lookup(text)
+            speculation.work_time = time.perf_counter() - start
+
+        if (speculation.result is None and speculation.future is None and self.classifier.is_ready
+                and speculation.stable >= SPECULATION_STABLE_PARTIALS):
+            speculation.future = self.executor.submit(self._classify, text)
+
+    def _classify(self, text):
+        start = time.perf_counter()
+        result = self.classifier.resolve(text, store=False)
+        finished = time.perf_counter()
+        return result, finished - start, finished
+
+    def commit(self, speculation, text):
+        """Speculated Classification for the final transcript, None on a miss"""
+        end_of_speech = time.perf_counter()
+        if speculation is not None and speculation.last_frame is not None:
+            end_of_speech = speculation.last_frame
+        with self.lock:
+            self.utterances += 1
+        if speculation is None or speculation.key is None or speculation.key != normalize(text):
+            if speculation is not None and speculation.future:
+                speculation.future.cancel()
+                with self.lock:
+                    self.wasted += 1
+            with self.lock:
+                self.misses += 1
+            return None
+
+        result, saved = speculation.result, speculation.work_time
+        if result is None and speculation.future:
+            result, duration, finished = speculation.future.result()
+            # Only the part of the inference that ran before the final transcript is saved
+            saved = duration - max(0.0, finished - end_of_speech)
+            if result.intent:
+                self.classifier.cache.put(text, result.intent, result.score)
+        if result is None or not result.intent:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits[result.path] += 1
+            self.saved_time += saved
+        return Classification(text, result.intent, result.score, result.path)
+
+    def stats(self):
+        with self.lock:
+            hits = sum(self.hits.values())
+            return {
+                "utterances": self.utterances,
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "wasted": self.wasted,
+                "hit_rate": hits / self.utterances if self.utterances else 0.0,
+                "saved_time": self.saved_time,
+                "mean_saved_ms": self.saved_time / hits * 1000 if hits else 0.0
+            }
+
+    def print_stats(self):
+        stats = self.stats()
+        paths = ", ".join(f"{count} {path}" for path, count in stats["hits"].items()) or "none"
+        print(f"Speculation: {stats['hit_rate']:.0%} hit rate over {stats['utterances']} utterances "
+              f"({paths}), {stats['wasted']} background runs wasted, "
+              f"{stats['saved_time']:.2f}s saved ({stats['mean_saved_ms']:.1f} ms per hit)")
+
+    def close(self):
+        self.executor.shutdown(wait=False)
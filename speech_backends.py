@@ -0,0 +1,179 @@
+# speech_backends.py - Interchangeable speech-to-text engines behind one interface
+
+import abc
+import hashlib
+import json
+import os
+
+import speech_recognition as sr
+
+from audio_stream import load_transcripts, read_wav
+from model_registry import get_vosk_model, get_whisper_model, registry
+
+
+class SpeechBackend(abc.ABC):
+    """Turns sr.AudioData into text.
+
+    recognize() raises sr.UnknownValueError when nothing was understood and
+    sr.RequestError when the engine itself failed, same as speech_recognition.
+    """
+
+    name = None
+    offline = True
+    streaming = False
+
+    def __init__(self, settings):
+        self.settings = settings
+
+    @abc.abstractmethod
+    def recognize(self, audio):
+        """Transcript of one phrase"""
+
+    def stream(self, sample_rate):
+        """Incremental recognizer for one phrase, None if the engine cannot stream"""
+        return None
+
+    def close(self):
+        pass
+
+
+class GoogleBackend(SpeechBackend):
+    name = "google"
+    offline = False
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio, language=self.settings["language"])
+
+
+class SphinxBackend(SpeechBackend):
+    name = "sphinx"
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_sphinx(audio, language=self.settings["language"])
+
+
+class WhisperBackend(SpeechBackend):
+    name = "whisper"
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.model_name = settings["whisper_model"]
+        self.model = get_whisper_model(self.model_name)
+
+    def recognize(self, audio):
+        import numpy as np
+
+        samples = np.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2), dtype=np.int16)
+        try:
+            result = self.model.transcribe(samples.astype(np.float32) / 32768.0, fp16=False,
+                                           language=self.settings["language"].split("-")[0])
+        except Exception as e:
+            raise sr.RequestError(f"Whisper error: {e}")
+        text = result["text"].strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def close(self):
+        registry.release("speech-recognition", f"whisper-{self.model_name}")
+
+
+class VoskBackend(SpeechBackend):
+    name = "vosk"
+    streaming = True
+    sample_rate = 16000
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.model_path = settings["vosk_model_path"]
+        self.model = get_vosk_model(self.model_path)
+
+    def recognizer(self):
+        from vosk import KaldiRecognizer
+        return KaldiRecognizer(self.model, self.sample_rate)
+
+    def stream(self, sample_rate):
+        from vosk import KaldiRecognizer
+        return VoskStream(KaldiRecognizer(self.model, sample_rate))
+
+    def recognize(self, audio):
+        recognizer = self.recognizer()
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def close(self):
+        registry.release("speech-recognition", f"vosk-{self.model_path}")
+
+
+class VoskStream:
+    """Feeds a phrase to Vosk chunk by chunk, returning the hypothesis so far"""
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.segments = []
+
+    def feed(self, data):
+        """Partial transcript after this chunk, empty while nothing is recognized"""
+        if self.recognizer.AcceptWaveform(data):
+            # Vosk found a pause inside the phrase and finalized the words before it
+            self.segments.append(json.loads(self.recognizer.Result()).get("text", ""))
+            partial = ""
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(filter(None, self.segments + [partial]))
+
+    def finish(self):
+        """Final transcript of the phrase"""
+        self.segments.append(json.loads(self.recognizer.FinalResult()).get("text", ""))
+        return " ".join(filter(None, self.segments))
+
+
+class ReplayBackend(SpeechBackend):
+    """Deterministic stand-in that looks recordings up in a transcript manifest.
+
+    Audio is matched on a hash of its PCM data, so anything read from the
+    replay directory gets its reference transcript back with no model and
+    no network involved.
+    """
+
+    name = "replay"
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        directory = settings["replay_directory"]
+        self.transcripts = {}
+        for file_name, text in load_transcripts(directory).items():
+            audio = read_wav(os.path.join(directory, file_name))
+            self.transcripts[self.audio_key(audio)] = text
+
+    @staticmethod
+    def audio_key(audio):
+        return hashlib.sha1(audio.get_raw_data()).hexdigest()
+
+    def recognize(self, audio):
+        text = self.transcripts.get(self.audio_key(audio))
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+BACKENDS = {backend.name: backend for backend in
+            (GoogleBackend, SphinxBackend, WhisperBackend, VoskBackend, ReplayBackend)}
+
+
+def create_backend(settings):
+    """Speech backend named by the "speech" section of jarvis_config.json"""
+    if settings["backend"] not in BACKENDS:
+        raise ValueError(f"Unknown speech backend '{settings['backend']}', expected one of {list(BACKENDS)}")
+    return BACKENDS[settings["backend"]](settings)
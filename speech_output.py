@@ -0,0 +1,188 @@
+# speech_output.py - Text-to-speech on a dedicated thread with coalescing and barge-in
+
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+
+from config import SPEECH_COALESCE_WINDOW, PHRASE_CACHE_ENABLED
+from phrase_cache import PhraseCache
+
+URGENT = 0
+NORMAL = 1
+_STOP = float("inf")
+
+
+class SpeechQueue:
+    """Owns the pyttsx3 engine and speaks queued messages one batch at a time.
+
+    say() returns immediately with an Event that is set once the message has
+    been spoken (or dropped by an interruption). Messages that pile up while
+    the engine is busy, like the lines of the help text, are joined into a
+    single runAndWait call, except for phrases already rendered by the
+    phrase cache, which are played from disk. interrupt() stops the current sentence at the
+    next word boundary, a more urgent message interrupts on its own.
+    """
+
+    def __init__(self):
+        self.queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._interrupt = threading.Event()
+        self._idle = threading.Condition()
+        self._pending = 0
+        self.current_priority = None
+        self.engine = None
+        self.phrases = None
+        self.requests = 0
+        self.syntheses = 0
+        self.interruptions = 0
+        self.speaking_time = 0.0
+        self.latencies = deque(maxlen=200)  # Seconds from say() until spoken
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def say(self, text, priority=NORMAL):
+        done = threading.Event()
+        with self._idle:
+            self._pending += 1
+            self.requests += 1
+            if self.current_priority is not None and priority < self.current_priority:
+                self.interrupt()
+        self.queue.put((priority, next(self._order), text, done, time.perf_counter()))
+        return done
+
+    def interrupt(self):
+        """Cut off the sentence being spoken, queued messages are kept"""
+        if self.current_priority is not None:
+            self._interrupt.set()
+
+    @property
+    def speaking(self):
+        return self.current_priority is not None
+
+    def wait_until_idle(self, timeout=None):
+        """Block until every queued message has been spoken, returns False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout=5):
+        self.queue.put((_STOP, next(self._order), None, None, None))
+        self.thread.join(timeout)
+
+    def _on_word(self, name, location, length):
+        # pyttsx3 only honours stop() reliably from inside its own callbacks
+        if self._interrupt.is_set():
+            self.engine.stop()
+
+    def _next_batch(self):
+        """Block for a message, then gather what arrives within the coalesce window"""
+        batch = [self.queue.get()]
+        if batch[0][0] == _STOP:
+            return batch
+        deadline = time.monotonic() + SPEECH_COALESCE_WINDOW
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                return batch
+            if item[0] != batch[0][0]:
+                # Only same-priority messages are merged, the rest waits its turn
+                self.queue.put(item)
+                return batch
+            batch.append(item)
+
+    def _run(self):
+        from model_registry import get_speech_engine, registry
+
+        # The engine is created on this thread, SAPI5 does not like being driven from another one
+        try:
+            self.engine = get_speech_engine()
+            self.engine.connect('started-word', self._on_word)
+        except Exception as e:
+            # Messages are still drained so callers waiting on them never hang
+            print(f"Speech engine error: {e}")
+        if self.engine is not None and PHRASE_CACHE_ENABLED:
+            try:
+                phrases = PhraseCache(self.engine)
+                # Playback needs winsound, elsewhere every message is synthesized live
+                self.phrases = phrases if phrases.playable else None
+            except Exception as e:
+                print(f"Phrase cache error: {e}")
+        while True:
+            batch = self._next_batch()
+            priority = batch[0][0]
+            if priority == _STOP:
+                break
+
+            self._interrupt.clear()
+            self.current_priority = priority
+            start = time.perf_counter()
+            try:
+                if self.engine is None:
+                    continue
+                self._speak([text for _, _, text, _, _ in batch])
+            except Exception as e:
+                print(f"Speech error: {e}")
+            finally:
+                self.speaking_time += time.perf_counter() - start
+                self.current_priority = None
+                self.syntheses += 1
+                self.interruptions += self._interrupt.is_set()
+                finished = time.perf_counter()
+                for _, _, _, done, queued in batch:
+                    self.latencies.append(finished - queued)
+                    done.set()
+                with self._idle:
+                    self._pending -= len(batch)
+                    self._idle.notify_all()
+            if self.phrases and self.queue.empty():
+                # Render repeated phrases while there is nothing to say
+                try:
+                    self.phrases.render_pending(self.engine)
+                except Exception as e:
+                    print(f"Phrase cache error: {e}")
+        if self.engine is not None:
+            registry.release("text-to-speech", "pyttsx3")
+
+    def _speak(self, texts):
+        """Play cached phrases, synthesize each run of uncached text in one call"""
+        live = []
+        for text in texts:
+            path = self.phrases.lookup(text) if self.phrases else None
+            if path is None:
+                live.append(text)
+                continue
+            self._synthesize(live)
+            live = []
+            if self._interrupt.is_set():
+                return
+            self.phrases.play(path, self._interrupt)
+        self._synthesize(live)
+
+    def _synthesize(self, texts):
+        if texts and not self._interrupt.is_set():
+            self.engine.say(" ".join(texts))
+            self.engine.runAndWait()
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "syntheses": self.syntheses,
+            "coalesced": self.requests - self._pending - self.syntheses,
+            "interruptions": self.interruptions,
+            "speaking_time": self.speaking_time,
+            "pending": self._pending,
+            "mean_latency": sum(self.latencies) / len(self.latencies) if self.latencies else 0.0,
+            "phrase_cache": self.phrases.stats() if self.phrases else None
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"Speech: {stats['requests']} messages in {stats['syntheses']} syntheses "
+              f"({stats['coalesced']} coalesced), {stats['interruptions']} interrupted, "
+              f"{stats['speaking_time']:.1f}s speaking")
+        if stats["phrase_cache"]:
+            cache = stats["phrase_cache"]
+            print(f"Phrase cache: {cache['hits']} played from disk, {cache['misses']} synthesized live, "
+                  f"{cache['phrases']} phrases cached")
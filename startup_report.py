@@ -0,0 +1,57 @@
+# startup_report.py - Time-to-first-command with and without background warm-up
+
+import os
+import tempfile
+import time
+
+from benchmark_utils import run_worker
+
+KEYWORD_COMMAND = "open notepad"
+MODEL_COMMAND = "could you make the sound a bit louder"
+
+
+def _measure(warmup, command, results):
+    """Seconds from a cold import to a constructed classifier, the first answered command and ready models"""
+    # A fresh cache, so the model command is never a cache hit and the user's cache is left alone
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        from intent_classifier import IntentClassifier
+
+        classifier = IntentClassifier(warmup=warmup, cache_path=os.path.join(cache_dir, "intent_cache.json"))
+        constructed = time.perf_counter() - start
+        intent, confidence = classifier.classify(command)
+        first_command = time.perf_counter() - start
+        classifier.wait_until_ready()
+        ready = time.perf_counter() - start
+
+    results.put({
+        "constructed": constructed,
+        "first_command": first_command,
+        "ready": ready,
+        "intent": intent,
+        "confidence": confidence
+    })
+
+
+def run_report():
+    rows = []
+    for warmup in (False, True):
+        for label, command in (("keyword", KEYWORD_COMMAND), ("model", MODEL_COMMAND)):
+            try:
+                row = run_worker(_measure, (warmup, command))
+            except RuntimeError as e:
+                print(f"Startup measurement failed (warm-up {'on' if warmup else 'off'}, {label}): {e}")
+                continue
+            row.update({"warmup": "on" if warmup else "off", "path": label})
+            rows.append(row)
+
+    print(f"{'warm-up':<8} {'path':<8} {'init (s)':>9} {'first cmd (s)':>14} {'ready (s)':>10}  intent")
+    for row in rows:
+        print(f"{row['warmup']:<8} {row['path']:<8} {row['constructed']:>9.2f} "
+              f"{row['first_command']:>14.2f} {row['ready']:>10.2f}  "
+              f"{row['intent']} ({row['confidence']:.2f})")
+    return rows
+
+
+if __name__ == "__main__":
+    run_report()
@@ -0,0 +1,114 @@
+# test_async_runtime.py - Wake word gating and stage executors of the async main loop
+
+import threading
+import unittest
+
+try:
+    from async_runtime import AsyncRuntime, StageExecutor, Turn
+except ImportError:
+    AsyncRuntime = None
+
+
+class FakeSpeech:
+    def wait_until_idle(self, timeout=None):
+        return True
+
+
+class FakeAssistant:
+    """Captures the named phrases in order, recognize() answers from a script"""
+
+    def __init__(self, phrases, answers):
+        self.wake_word = object()
+        self.speech = FakeSpeech()
+        self.listen_lock = threading.Lock()
+        self.phrases = list(phrases)
+        self.answers = answers
+        self.captured = []
+        self.recognized = []
+        self.spoken = []
+
+    def capture(self, timeout, gated=False):
+        phrase = self.phrases.pop(0)
+        self.captured.append((phrase, gated))
+        return phrase, None, None, None
+
+    def recognize(self, audio, gated=False, transcript=None, wake=None):
+        self.recognized.append((audio, gated))
+        return self.answers[audio](gated)
+
+    def speak(self, text):
+        self.spoken.append(text)
+
+
+def with_wake_word(command):
+    """Gated phrases must start with the wake word, ungated ones are taken as they are"""
+    return lambda gated: None if gated and not command.startswith("jarvis") else command.replace("jarvis ", "")
+
+
+@unittest.skipIf(AsyncRuntime is None, "speech_recognition is not installed")
+class GatingTests(unittest.TestCase):
+    def test_gate_is_decided_at_capture(self):
+        assistant = FakeAssistant(["wake", "echo", "command", "chatter"], {
+            "wake": lambda gated: "",  # The wake word on its own
+            "echo": with_wake_word("yes"),
+            "command": with_wake_word("open notepad"),
+            "chatter": with_wake_word("what a day")
+        })
+        runtime = AsyncRuntime(assistant)
+
+        # "echo" is captured before "wake" has been recognized, so it stays gated
+        wake = Turn(*runtime._listen_once())
+        echo = Turn(*runtime._listen_once())
+        self.assertIsNone(runtime._recognize(wake))
+        self.assertEqual(assistant.spoken, ["Yes?"])
+
+        # The next capture is ungated and keeps that even though "echo" is recognized after it
+        command = Turn(*runtime._listen_once())
+        self.assertIsNone(runtime._recognize(echo))
+        self.assertEqual(runtime._recognize(command).text, "open notepad")
+
+        # Only one phrase is let through without the wake word
+        chatter = Turn(*runtime._listen_once())
+        self.assertIsNone(runtime._recognize(chatter))
+
+        self.assertEqual(assistant.captured, [("wake", True), ("echo", True), ("command", False),
+                                              ("chatter", True)])
+        self.assertEqual(assistant.recognized, [("wake", True), ("echo", True), ("command", False),
+                                                ("chatter", True)])
+
+    def test_no_wake_word_never_gates(self):
+        assistant = FakeAssistant(["command"], {"command": with_wake_word("open notepad")})
+        assistant.wake_word = None
+        runtime = AsyncRuntime(assistant)
+        self.assertEqual(runtime._recognize(Turn(*runtime._listen_once())).text, "open notepad")
+
+
+@unittest.skipIf(AsyncRuntime is None, "speech_recognition is not installed")
+class StageExecutorTests(unittest.TestCase):
+    def test_runs_calls_in_order_on_a_daemon_thread(self):
+        executor = StageExecutor("stage-test")
+        self.addCleanup(executor.shutdown)
+        order = []
+        futures = [executor.submit(order.append, i) for i in range(5)]
+        for future in futures:
+            future.result(timeout=1)
+        self.assertEqual(order, list(range(5)))
+        self.assertTrue(executor.submit(lambda: threading.current_thread().daemon).result(timeout=1))
+
+    def test_exceptions_reach_the_future(self):
+        executor = StageExecutor("stage-test")
+        self.addCleanup(executor.shutdown)
+        with self.assertRaises(ZeroDivisionError):
+            executor.submit(lambda: 1 / 0).result(timeout=1)
+
+    def test_shutdown_does_not_wait_for_a_blocked_call(self):
+        executor = StageExecutor("stage-test")
+        release = threading.Event()
+        self.addCleanup(release.set)
+        executor.submit(release.wait)
+        executor.shutdown(wait=False)
+        self.assertFalse(release.is_set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# test_gesture_trace.py - Record synthetic landmark traces and replay them through the gesture detectors
+
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+    from gesture_trace import TraceRecorder, load_trace, replay
+except ImportError:
+    np = None
+
+FRAME_SECONDS = 0.04
+FRAME_WIDTH = 640
+
+
+def thumbs_up():
+    """Fingers curled, thumb pointing up and out to the side"""
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[:, 0] = 0.5
+    points[0, :2] = (0.5, 0.8)  # Wrist
+    points[2, :2] = (0.45, 0.6)  # Thumb MCP, IP and tip
+    points[3, :2] = (0.42, 0.5)
+    points[4, :2] = (0.38, 0.4)
+    points[[5, 9, 13, 17], 1] = 0.55  # Finger MCPs, PIPs and tips
+    points[[6, 10, 14, 18], 1] = 0.6
+    points[[8, 12, 16, 20], 1] = 0.65
+    return points
+
+
+def open_palm():
+    """Every finger stretched, thumb and pinky spread wide"""
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[:, 0] = 0.5
+    points[0, :2] = (0.5, 0.6)
+    points[2:5, 1] = 0.5
+    points[4, 0] = 0.3
+    points[[6, 10, 14, 18], 1] = 0.5
+    points[[7, 11, 15, 19], 1] = 0.4
+    points[[8, 12, 16, 20], 1] = 0.3
+    points[20, 0] = 0.7
+    return points
+
+
+def write_trace(directory, frames, mouse_control=False):
+    """frames is a list of landmark arrays, None where no hand was tracked"""
+    path = os.path.join(directory, "trace.npz")
+    recorder = TraceRecorder(path)
+    for i, points in enumerate(frames):
+        recorder.record(1000.0 + i * FRAME_SECONDS, points, mouse_control, FRAME_WIDTH)
+    recorder.close()
+    return load_trace(path)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TraceTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_round_trip(self):
+        frames = [None, thumbs_up(), None, open_palm()]
+        trace = write_trace(self.directory.name, frames)
+        self.assertEqual(trace["present"].tolist(), [False, True, False, True])
+        self.assertEqual(trace["landmarks"].dtype, np.float32)
+        np.testing.assert_array_equal(trace["landmarks"][1], frames[1])
+        np.testing.assert_array_equal(trace["landmarks"][2], np.zeros((21, 3)))
+        self.assertEqual(int(trace["frame_width"]), FRAME_WIDTH)
+        self.assertAlmostEqual(float(trace["timestamps"][3] - trace["timestamps"][0]), 3 * FRAME_SECONDS)
+
+    def test_cooldown_starts_at_first_frame(self):
+        # One second without a hand, then a held thumbs up: fires at once, then once per cooldown
+        trace = write_trace(self.directory.name, [None] * 25 + [thumbs_up()] * 35)
+        _, events, actions = replay(trace)
+        self.assertEqual([(event["frame"], event["gesture"]) for event in events],
+                         [(25, "thumbs_up"), (43, "thumbs_up")])
+        self.assertEqual(actions, [])
+
+    def test_held_thumbs_up_waits_for_cooldown(self):
+        trace = write_trace(self.directory.name, [thumbs_up()] * 20)
+        _, events, _ = replay(trace)
+        self.assertEqual([event["frame"] for event in events], [18])
+
+    def test_open_palm_controls_volume_or_mouse(self):
+        _, events, actions = replay(write_trace(self.directory.name, [open_palm()] * 5))
+        self.assertEqual([event["gesture"] for event in events], ["volume_control"])
+        self.assertEqual(actions, [])
+
+        _, events, actions = replay(write_trace(self.directory.name, [open_palm()] * 5, mouse_control=True))
+        self.assertEqual([event["gesture"] for event in events], ["mouse_move"])
+        self.assertEqual([action["action"] for action in actions], ["move_to"] * 5)
+        self.assertEqual(actions[0]["value"], [960.0, 324.0])
+
+    def test_replay_is_deterministic(self):
+        trace = write_trace(self.directory.name, [None, open_palm(), thumbs_up()] * 20)
+        _, first_events, first_actions = replay(trace)
+        _, events, actions = replay(trace)
+        self.assertEqual(events, first_events)
+        self.assertEqual(actions, first_actions)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# test_slots.py - Unit tests for the slot extractors in slots.py
+
+import datetime
+import unittest
+
+from slots import (extract_duration, extract_name, extract_number, extract_percentage, extract_query,
+                   extract_site, extract_slots, extract_song, extract_time, normalize_numbers)
+
+
+class NumberTests(unittest.TestCase):
+    def test_spelled_numbers(self):
+        self.assertEqual(normalize_numbers("twenty five"), "25")
+        self.assertEqual(normalize_numbers("one hundred and five"), "105")
+        self.assertEqual(normalize_numbers("six thirty"), "6 30")
+
+    def test_extract_number(self):
+        self.assertEqual(extract_number("set volume to forty"), 40)
+        self.assertEqual(extract_number("wait 2.5"), 2.5)
+        self.assertIsNone(extract_number("no digits here"))
+
+    def test_extract_percentage(self):
+        self.assertEqual(extract_percentage("set volume to fifty percent"), 50)
+        self.assertEqual(extract_percentage("volume 150%"), 100)
+        self.assertIsNone(extract_percentage("louder please"))
+
+
+class DurationTests(unittest.TestCase):
+    def test_units(self):
+        self.assertEqual(extract_duration("set a timer for 5 minutes"), 300)
+        self.assertEqual(extract_duration("1 hour 30 minutes"), 5400)
+        self.assertEqual(extract_duration("ten seconds"), 10)
+        self.assertEqual(extract_duration("an hour"), 3600)
+
+    def test_halves(self):
+        self.assertEqual(extract_duration("two and a half minutes"), 150)
+        self.assertEqual(extract_duration("an hour and a half"), 5400)
+        self.assertEqual(extract_duration("half an hour"), 1800)
+        self.assertEqual(extract_duration("1.5 hours"), 5400)
+
+    def test_bare_number_is_minutes(self):
+        self.assertEqual(extract_duration("twenty"), 1200)
+        self.assertIsNone(extract_duration("soon"))
+
+
+class TimeTests(unittest.TestCase):
+    def test_clock_times(self):
+        self.assertEqual(extract_time("set alarm for 7 am"), datetime.time(7, 0))
+        self.assertEqual(extract_time("wake me at 7:30 pm"), datetime.time(19, 30))
+        self.assertEqual(extract_time("alarm at 19:45"), datetime.time(19, 45))
+        self.assertEqual(extract_time("twelve am"), datetime.time(0, 0))
+        self.assertEqual(extract_time("six thirty"), datetime.time(6, 30))
+        self.assertEqual(extract_time("at noon"), datetime.time(12, 0))
+        self.assertEqual(extract_time("midnight"), datetime.time(0, 0))
+
+    def test_durations_are_not_times(self):
+        self.assertIsNone(extract_time("in five minutes"))
+        self.assertIsNone(extract_time("for 2 hours"))
+        self.assertIsNone(extract_time("set volume to 40 percent"))
+        self.assertIsNone(extract_time("at 99"))
+
+
+class TextSlotTests(unittest.TestCase):
+    def test_name(self):
+        self.assertEqual(extract_name("create a folder called Projects."), "projects")
+        self.assertIsNone(extract_name("create a folder"))
+
+    def test_query(self):
+        self.assertEqual(extract_query("search the web for python tutorials?"), "python tutorials")
+        self.assertEqual(extract_query("look up the tallest building"), "the tallest building")
+
+    def test_song(self):
+        self.assertEqual(extract_song("play the song yesterday"), "yesterday")
+
+    def test_site(self):
+        self.assertEqual(extract_site("go to youtube now"), "youtube")
+        self.assertIsNone(extract_site("go somewhere"))
+
+    def test_extract_slots_skips_missing(self):
+        self.assertEqual(extract_slots("set volume to 30", ("percentage", "file_name")), {"percentage": 30})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+# wake_word.py - Template-based wake-word spotting on MFCC frames
+
+import argparse
+import os
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from config import (WAKE_WORD_TEMPLATE_PATH, WAKE_WORD_SEARCH_SECONDS, WAKE_WORD_SAMPLE_RATE,
+                    load_user_config)
+
+
+@lru_cache(maxsize=4)
+def _mel_filterbank(n_mels, n_fft, sample_rate):
+    def hz_to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def mel_to_hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    mel_points = np.linspace(hz_to_mel(0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+    filters = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            filters[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filters[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filters
+
+
+@lru_cache(maxsize=4)
+def _dct_matrix(n_mels, n_coeffs):
+    n = np.arange(n_mels)
+    k = np.arange(n_coeffs)[:, None]
+    return (np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2 / n_mels)).astype(np.float32)
+
+
+def mfcc(samples, sample_rate=WAKE_WORD_SAMPLE_RATE, n_mfcc=13, n_mels=26, n_fft=512,
+         frame_length=0.025, frame_step=0.010):
+    """MFCC frames of a float signal as an (n_frames, n_mfcc - 1) array.
+
+    The 0th coefficient only tracks loudness and is dropped, so templates
+    match regardless of how close the speaker is to the microphone.
+    """
+    signal = np.append(samples[0], samples[1:] - 0.97 * samples[:-1]).astype(np.float32)
+    length, step = int(round(frame_length * sample_rate)), int(round(frame_step * sample_rate))
+    if len(signal) < length:
+        signal = np.pad(signal, (0, length - len(signal)))
+    n_frames = 1 + (len(signal) - length) // step
+    indices = np.arange(length)[None, :] + step * np.arange(n_frames)[:, None]
+    frames = signal[indices] * np.hamming(length).astype(np.float32)
+
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+    energies = np.log(power @ _mel_filterbank(n_mels, n_fft, sample_rate).T + 1e-10)
+    return (energies @ _dct_matrix(n_mels, n_mfcc).T)[:, 1:]
+
+
+def trim_silence(samples, frame=160, ratio=0.1):
+    """Cut leading and trailing 10 ms frames quieter than ratio times the loudest one"""
+    n_frames = len(samples) // frame
+    if not n_frames:
+        return samples
+    rms = np.sqrt(np.mean(samples[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+    voiced = np.flatnonzero(rms >= rms.max() * ratio)
+    return samples[voiced[0] * frame:(voiced[-1] + 1) * frame]
+
+
+def audio_features(audio, max_seconds=None, trim=False):
+    """MFCC frames of sr.AudioData, optionally only its first max_seconds"""
+    raw = audio.get_raw_data(convert_rate=WAKE_WORD_SAMPLE_RATE, convert_width=2)
+    samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    if max_seconds:
+        samples = samples[:int(max_seconds * WAKE_WORD_SAMPLE_RATE)]
+    if trim:
+        samples = trim_silence(samples)
+    return mfcc(samples)
+
+
+def subsequence_dtw(template, query):
+    """Best match of template anywhere inside query.
+
+    Returns (mean frame distance along the path, last query frame of the
+    match). Each template frame advances the query by one or two frames, or
+    two template frames share one query frame, which allows speaking rates
+    from half to double the template's. One row is computed per template
+    frame with numpy, the query axis is never looped over in Python.
+    """
+    distances = (np.sum(template ** 2, axis=1)[:, None] + np.sum(query ** 2, axis=1)[None, :]
+                 - 2 * template @ query.T)
+    cost = np.sqrt(np.maximum(distances, 0))
+    n, m = cost.shape
+
+    two_back = np.full(m, np.inf)
+    previous = cost[0].copy()  # A match may start at any query frame
+    for i in range(1, n):
+        best = np.full(m, np.inf)
+        best[1:] = previous[:-1]
+        best[2:] = np.minimum(best[2:], previous[:-2])
+        current = cost[i] + best
+        if i > 1:
+            current[1:] = np.minimum(current[1:], two_back[:-1] + cost[i - 1, 1:] + cost[i, 1:])
+        two_back, previous = previous, current
+
+    end = int(np.argmin(previous))
+    return float(previous[end]) / n, end
+
+
+class WakeWordDetector:
+    """Accepts a phrase only if it starts with the enrolled wake word.
+
+    sensitivity runs from 0 to 1, 0.5 accepts anything at least as close to
+    a template as the enrolled templates are to each other. Transcripts of
+    accepted phrases are reported back so accepts without the wake word in
+    them can be counted as suspected false accepts.
+    """
+
+    def __init__(self, word, templates, reference_distance, sensitivity=0.5):
+        self.word = word.lower()
+        self.templates = templates
+        self.reference_distance = reference_distance
+        self.sensitivity = sensitivity
+        self.threshold = reference_distance * (0.5 + sensitivity)
+        self.lock = threading.Lock()
+        self.created = time.monotonic()
+        self.checked = 0
+        self.accepted = 0
+        self.false_accepts = 0
+        self.cpu_time = 0.0
+
+    @classmethod
+    def load(cls, path=WAKE_WORD_TEMPLATE_PATH, sensitivity=None):
+        """Detector from enrolled templates, None when nothing has been enrolled"""
+        if not os.path.exists(path):
+            return None
+        try:
+            data = np.load(path)
+            boundaries = np.cumsum(data["lengths"])[:-1]
+            templates = np.split(data["frames"], boundaries)
+            if sensitivity is None:
+                sensitivity = load_user_config()["preferences"]["wake_word_sensitivity"]
+            return cls(str(data["word"]), templates, float(data["reference_distance"]), sensitivity)
+        except Exception as e:
+            print(f"Wake word template error: {e}")
+            return None
+
+    def score(self, audio):
+        """(distance to the closest template, seconds into the audio where the wake word ends)"""
+        query = audio_features(audio, WAKE_WORD_SEARCH_SECONDS)
+        best, end = min(subsequence_dtw(template, query) for template in self.templates)
+        return best, (end + 1) * 0.010
+
+    def detect(self, audio):
+        """Return (accepted, seconds where the wake word ends)"""
+        start = time.thread_time()
+        distance, end = self.score(audio)
+        accepted = distance <= self.threshold
+        with self.lock:
+            self.cpu_time += time.thread_time() - start
+            self.checked += 1
+            self.accepted += accepted
+        return accepted, end
+
+    def report_transcript(self, text):
+        """Count an accept whose transcript does not contain the wake word"""
+        if self.word not in text.lower():
+            with self.lock:
+                self.false_accepts += 1
+
+    def stats(self):
+        with self.lock:
+            elapsed = time.monotonic() - self.created
+            return {
+                "checked": self.checked,
+                "accepted": self.accepted,
+                "rejected": self.checked - self.accepted,
+                "suspected_false_accepts": self.false_accepts,
+                "cpu_time_s": self.cpu_time,
+                "cpu_ms_per_check": self.cpu_time / self.checked * 1000 if self.checked else 0.0,
+                "cpu_share": self.cpu_time / elapsed if elapsed else 0.0
+            }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"Wake word: {stats['checked']} phrases checked, {stats['accepted']} accepted, "
+              f"{stats['rejected']} skipped recognition, {stats['suspected_false_accepts']} suspected false accepts, "
+              f"{stats['cpu_ms_per_check']:.1f} ms CPU per check ({stats['cpu_share']:.2%} of wall time)")
+
+
+def enroll(recordings, word, path=WAKE_WORD_TEMPLATE_PATH):
+    """Save MFCC templates of the wake word recordings (sr.AudioData)"""
+    if len(recordings) < 2:
+        raise ValueError("At least two recordings of the wake word are needed")
+    # Recordings carry the stream's pre-roll and trailing pause, only the word itself is kept
+    templates = [audio_features(audio, trim=True) for audio in recordings]
+
+    # Spread between the user's own recordings, the detector threshold is relative to it
+    pairwise = [subsequence_dtw(a, b)[0] for i, a in enumerate(templates)
+                for j, b in enumerate(templates) if i != j]
+    reference_distance = float(np.mean(pairwise))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, word=word, reference_distance=reference_distance,
+             frames=np.concatenate(templates), lengths=np.array([len(t) for t in templates]))
+    return reference_distance
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enroll or test the wake word")
+    parser.add_argument("--enroll", type=int, metavar="N", help="Record N samples of the wake word")
+    parser.add_argument("--wav", nargs="+", help="Enroll from WAV recordings instead of the microphone")
+    parser.add_argument("--test", action="store_true", help="Print the match score of each phrase heard")
+    args = parser.parse_args()
+
+    from audio_stream import MicrophoneStream, read_wav
+    word = load_user_config()["preferences"]["wake_word"]
+
+    if args.wav or args.enroll:
+        if args.wav:
+            recordings = [read_wav(path) for path in args.wav]
+        else:
+            microphone = MicrophoneStream().start()
+            recordings = []
+            try:
+                while len(recordings) < args.enroll:
+                    print(f"Say '{word}' ({len(recordings) + 1}/{args.enroll})")
+                    try:
+                        recordings.append(microphone.listen(timeout=10, phrase_time_limit=2))
+                    except Exception as e:
+                        print(f"Recording error: {e}")
+            finally:
+                microphone.close()
+        reference = enroll(recordings, word)
+        print(f"Enrolled {len(recordings)} samples of '{word}' (template spread {reference:.2f})")
+
+    if args.test:
+        detector = WakeWordDetector.load()
+        if detector is None:
+            print("No wake word enrolled, run with --enroll first")
+            return
+        microphone = MicrophoneStream().start()
+        try:
+            while True:
+                try:
+                    audio = microphone.listen(timeout=10)
+                except Exception:
+                    continue
+                distance, end = detector.score(audio)
+                verdict = "accept" if distance <= detector.threshold else "reject"
+                print(f"{verdict}: distance {distance:.2f} (threshold {detector.threshold:.2f}), ends at {end:.2f}s")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            microphone.close()
+
+
+if __name__ == "__main__":
+    main()